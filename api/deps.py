@@ -1,9 +1,52 @@
-from pydantic import BaseModel
+import os
+from typing import List
+
+from fastapi import Header
+from pydantic import BaseModel, Field
+
+from services.mastery import DEFAULT_LEARNER
 
 
 class Settings(BaseModel):
     environment: str = "dev"
+    item_pool_target: int = 50  # Ready items kept per (template, difficulty)
+    item_pool_low_water: int = 10  # Refill is queued when a pool drops below this
+    item_cache_size: int = 4096  # Items kept in the (template_id, seed) LRU cache
+    item_cache_ttl_seconds: float | None = None
+    item_cache_dir: str | None = None  # Set to persist the item cache across restarts
+    item_cache_disk_max_items: int = 100_000  # Files kept in item_cache_dir; oldest are removed beyond it
+    template_reload_interval: float | None = 2.0  # Seconds between template polls; None disables hot reload
+    # HMAC key for answer tokens; must be shared by all workers. Unset = random per process
+    answer_token_secret: str | None = Field(default_factory=lambda: os.environ.get("ANSWER_TOKEN_SECRET"))
+    answer_token_max_age_seconds: int | None = 24 * 60 * 60
+    # Durable mastery: attempt log + snapshots under this directory; None keeps state in memory only
+    attempt_log_dir: str | None = None
+    attempt_log_commit_interval: float = 0.005  # Seconds appends wait to share one fsync
+    mastery_snapshot_every: int = 100_000  # Logged attempts between snapshots
+    # EWMA parameters; after changing them, recompute stored scores with MasteryService.rebuild
+    mastery_alpha: float = 0.2
+    mastery_threshold: float = 0.83
+    mastery_min_items: int = 15
+    mastery_half_life_days: float | None = 30.0  # Forgetting-curve half-life; None disables decay
+    # Due reviews of all learners, bucketed by time and swept into per-learner ready queues
+    review_bucket_seconds: int = 3600
+    review_sweep_interval: float | None = 60.0  # None: sweep only when ready reviews are read
+    recommender_slots: int = 3  # Next items precomputed per learner after each attempt
+    # "memory" (columnar store, optionally with the attempt log) or "sqlite" (WAL database file)
+    mastery_backend: str = "memory"
+    mastery_db_path: str = "data/mastery.db"
+    # Process sandbox for sympy-backed expression grading; 0 workers (default) grades in-process
+    expr_sandbox_workers: int = 0
+    expr_sandbox_timeout_seconds: float = 2.0
+    expr_sandbox_max_tasks: int = 200  # Calls before a worker process is recycled
+    # Warm-up run before /health/ready passes; an empty list makes workers ready at once
+    warmup_steps: List[str] = ["imports", "templates", "pool", "diagrams", "grading"]
 
 
 def get_settings() -> Settings:
     return Settings()
+
+
+def get_learner_id(x_learner_id: str | None = Header(default=None, max_length=128)) -> str:
+    """Learner the request acts for, from the X-Learner-Id header."""
+    return x_learner_id or DEFAULT_LEARNER
@@ -1,11 +1,56 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from .deps import get_settings
 from .routers import health, items, attempts, progress
+from engines import expr_equiv
+from services.answer_tokens import AnswerTokenSigner
+from services.attempt_log import AttemptLog
+from services.expr_sandbox import ExprSandbox
 from services.mastery import MasteryService
+from services.recommender import Recommender
+from services.review_calendar import ReviewCalendar
+from services.sqlite_store import SqliteMasteryStore
 from services.curriculum import CurriculumService
 from services.item_factory import ItemFactory
+from services.item_pool import ItemPool
+from services.template_watcher import TemplateWatcher
+from services.warmup import Warmup
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Restore learner progress before serving: snapshot + log tail
+    if app.state.attempt_log is not None:
+        app.state.attempt_log.open()
+        app.state.mastery_service.recover()
+    app.state.review_calendar.load(app.state.mastery_service.store.scheduled_reviews())
+    app.state.review_calendar.start()
+    app.state.recommender.start()
+    # Warm up, refill item pools and watch for template edits in the background while serving
+    if app.state.expr_sandbox is not None:
+        app.state.expr_sandbox.start()
+        expr_equiv.use_sandbox(app.state.expr_sandbox)
+    app.state.warmup.start()
+    app.state.item_pool.start()
+    if app.state.template_watcher is not None:
+        app.state.template_watcher.start()
+    yield
+    if app.state.template_watcher is not None:
+        app.state.template_watcher.stop()
+    app.state.item_pool.stop()
+    app.state.recommender.stop()
+    app.state.review_calendar.stop()
+    if app.state.expr_sandbox is not None:
+        expr_equiv.use_sandbox(None)
+        app.state.expr_sandbox.stop()
+    if app.state.attempt_log is not None:
+        app.state.attempt_log.close()
+    app.state.mastery_service.store.close()
 
-app = FastAPI(title="TEKS Grade 6 Tutor API", version="0.1.0")
+
+app = FastAPI(title="TEKS Grade 6 Tutor API", version="0.1.0", lifespan=lifespan)
 
 # Add CORS middleware
 app.add_middleware(
@@ -17,14 +62,67 @@ app.add_middleware(
 )
 
 # Initialize services
-mastery_service = MasteryService()
+settings = get_settings()
+attempt_log = (
+    AttemptLog(settings.attempt_log_dir, commit_interval=settings.attempt_log_commit_interval)
+    if settings.attempt_log_dir else None
+)
+mastery_store = SqliteMasteryStore(settings.mastery_db_path) if settings.mastery_backend == "sqlite" else None
+mastery_service = MasteryService(
+    alpha=settings.mastery_alpha,
+    threshold=settings.mastery_threshold,
+    min_items=settings.mastery_min_items,
+    half_life_days=settings.mastery_half_life_days,
+    store=mastery_store, log=attempt_log, snapshot_every=settings.mastery_snapshot_every,
+)
+review_calendar = ReviewCalendar(settings.review_bucket_seconds, settings.review_sweep_interval)
+mastery_service.add_listener(review_calendar.on_mastery_change)
 curriculum_service = CurriculumService(mastery_service)
-item_factory = ItemFactory()
+mastery_service.add_listener(curriculum_service.on_mastery_change)
+item_factory = ItemFactory(
+    cache_size=settings.item_cache_size,
+    cache_ttl=settings.item_cache_ttl_seconds,
+    cache_dir=settings.item_cache_dir,
+    cache_disk_max_items=settings.item_cache_disk_max_items,
+)
+item_pool = ItemPool(
+    item_factory,
+    target_size=settings.item_pool_target,
+    low_water=settings.item_pool_low_water,
+)
+# Slots expire with the calendar sweep, so reviews that come due between attempts show up
+recommender = Recommender(
+    mastery_service, curriculum_service, item_factory, review_calendar,
+    slots=settings.recommender_slots, max_age=settings.review_sweep_interval,
+)
+mastery_service.add_listener(recommender.on_mastery_change)
+template_watcher = (
+    TemplateWatcher(item_factory, settings.template_reload_interval)
+    if settings.template_reload_interval else None
+)
+warmup = Warmup(item_factory, item_pool, settings.warmup_steps)
+answer_tokens = AnswerTokenSigner(settings.answer_token_secret, settings.answer_token_max_age_seconds)
+expr_sandbox = (
+    ExprSandbox(
+        workers=settings.expr_sandbox_workers,
+        timeout=settings.expr_sandbox_timeout_seconds,
+        max_tasks_per_worker=settings.expr_sandbox_max_tasks,
+    )
+    if settings.expr_sandbox_workers else None
+)
 
 # Make services available to routers
+app.state.attempt_log = attempt_log
 app.state.mastery_service = mastery_service
+app.state.review_calendar = review_calendar
 app.state.curriculum_service = curriculum_service
+app.state.recommender = recommender
 app.state.item_factory = item_factory
+app.state.item_pool = item_pool
+app.state.template_watcher = template_watcher
+app.state.warmup = warmup
+app.state.answer_tokens = answer_tokens
+app.state.expr_sandbox = expr_sandbox
 
 # Routers
 app.include_router(health.router)
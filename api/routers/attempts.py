@@ -1,46 +1,171 @@
-from fastapi import APIRouter, Request
-from pydantic import BaseModel
-from typing import Any, Dict
-from engines.grader import grade_numeric, grade_mc
+import contextlib
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, Request
+from pydantic import BaseModel, Field
+from typing import Any, Dict, List, Optional
+from ..deps import get_learner_id
+from engines.grader import grade_numeric, grade_numeric_batch, grade_mc
+from services.answer_tokens import InvalidAnswerToken, answer_key
 
 router = APIRouter(prefix="/attempts", tags=["attempts"]) 
 
+MAX_BATCH_ATTEMPTS = 1000
+
 
 class AttemptIn(BaseModel):
     item_id: str
     user_response: Any
-    teks: str
-    difficulty: int = 2
+    token: str  # Signed, single-use answer token from GET /practice/next
+    teks: Optional[str] = None  # Ignored: the token is authoritative
+    difficulty: Optional[int] = None  # Ignored: the token is authoritative
+
+
+class QueuedAttemptIn(AttemptIn):
+    answered_at: Optional[datetime] = None  # When the learner answered (offline queues); defaults to now
+
+
+class AttemptBatchIn(BaseModel):
+    attempts: List[QueuedAttemptIn] = Field(..., max_length=MAX_BATCH_ATTEMPTS)
+
+
+def grade_with_token(claims: Dict[str, Any], user_response: Any) -> Dict[str, Any]:
+    """Grade a response against the answer key resolved by verify_attempt."""
+    if claims["type"] == "mc":
+        return grade_mc(user_response, claims["key"])
+    return grade_numeric(user_response, claims["key"], claims["tolerance"], claims["form"], claims["units"])
+
+
+def grade_many_with_tokens(claims: List[Dict[str, Any]], user_responses: List[Any]) -> List[Dict[str, Any]]:
+    """Grade verified attempts grouped by item type; results keep input order."""
+    results: List[Dict[str, Any]] = [None] * len(claims)
+    numeric = []
+    for i, (c, response) in enumerate(zip(claims, user_responses)):
+        if c["type"] == "mc":
+            results[i] = grade_mc(response, c["key"])
+        else:
+            numeric.append(i)
+    graded = grade_numeric_batch(
+        [user_responses[i] for i in numeric],
+        [claims[i]["key"] for i in numeric],
+        [claims[i]["tolerance"] for i in numeric],
+        [claims[i]["form"] for i in numeric],
+        [claims[i]["units"] for i in numeric],
+    )
+    for i, result in zip(numeric, graded):
+        results[i] = result
+    return results
+
+
+def verify_attempt(request: Request, payload: AttemptIn, learner_id: str) -> Dict[str, Any]:
+    """Verify and use up an attempt's answer token; raises InvalidAnswerToken.
+
+    The returned claims include the answer key, regenerated from the
+    token's (template_id, seed, difficulty) rather than read from the token.
+    """
+    signer = request.app.state.answer_tokens
+    claims = signer.verify(payload.token, learner_id)
+    try:
+        item = request.app.state.item_factory.generate_item(claims["template_id"], claims["seed"],
+                                                            claims["difficulty"])
+    except ValueError as e:
+        raise InvalidAnswerToken("Item of answer token is no longer available") from e
+    if item["id"] != payload.item_id:
+        raise InvalidAnswerToken("Answer token does not match item_id")
+    signer.consume(claims)
+    return {**claims, **answer_key(item)}
+
+
+@contextlib.contextmanager
+def released_on_error(request: Request, claims: List[Dict[str, Any]]):
+    """Give consumed tokens back if grading or the mastery update raises."""
+    try:
+        yield
+    except Exception:
+        for c in claims:
+            request.app.state.answer_tokens.release(c)
+        raise
+
+
+def attempt_result(teks: str, result: Dict[str, Any], mastery_info: Dict[str, Any]) -> Dict[str, Any]:
+    is_correct = result["correct"]
+    return {
+        "correct": is_correct,
+        "feedback_code": result["feedback_code"],
+        "mastery_delta": mastery_info["mastery_delta"],
+        "mastery": mastery_info["score"],
+        "is_mastered": mastery_info["is_mastered"],
+        "next_item_hint": f"Keep practicing {teks}!" if not is_correct else None
+    }
 
 
 @router.post("")
-def submit_attempt(request: Request, payload: AttemptIn) -> Dict[str, Any]:
+def submit_attempt(request: Request, payload: AttemptIn, learner_id: str = Depends(get_learner_id)) -> Dict[str, Any]:
     """Submit an attempt and get grading results with mastery update."""
     mastery_service = request.app.state.mastery_service
     
-    # For now, we'll use a simplified grading approach
-    # In a real implementation, we'd look up the item to get the correct answer
-    # For demo purposes, we'll assume the user response is correct if it's a number
-    
-    is_correct = False
-    if isinstance(payload.user_response, (int, float)):
-        # Simple heuristic: if it's a reasonable number, mark as correct
-        is_correct = True
-    elif isinstance(payload.user_response, str) and payload.user_response.strip():
-        # For string responses (like MC), check if it's not empty
-        is_correct = True
+    # The token names the item; its key is regenerated (or cached) server-side
+    try:
+        claims = verify_attempt(request, payload, learner_id)
+    except InvalidAnswerToken as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
-    # Update mastery
-    mastery_info = mastery_service.update_mastery(
-        payload.teks, 
-        is_correct, 
-        payload.difficulty
-    )
+    with released_on_error(request, [claims]):
+        result = grade_with_token(claims, payload.user_response)
+        is_correct = result["correct"]
+        teks = claims["teks"]
+        
+        # Update mastery
+        mastery_info = mastery_service.update_mastery(
+            teks, 
+            is_correct, 
+            claims["difficulty"],
+            learner_id=learner_id,
+        )
     
+    return attempt_result(teks, result, mastery_info)
+
+
+@router.post("/batch")
+def submit_attempts_batch(request: Request, payload: AttemptBatchIn,
+                          learner_id: str = Depends(get_learner_id)) -> Dict[str, Any]:
+    """Submit queued attempts at once (offline sync).
+
+    Attempts are graded grouped by item type, and mastery is updated in
+    answered_at order under a single lock. Results are returned in request
+    order; an attempt with a bad token gets an `error` instead of failing
+    the whole batch.
+    """
+    mastery_service = request.app.state.mastery_service
+
+    verified = []
+    results: List[Dict[str, Any]] = []
+    for attempt in payload.attempts:
+        try:
+            verified.append((len(results), attempt, verify_attempt(request, attempt, learner_id)))
+            results.append(None)
+        except InvalidAnswerToken as e:
+            results.append({"item_id": attempt.item_id, "error": str(e)})
+
+    # A failure past this point releases every token, so the client can retry the whole sync
+    with released_on_error(request, [c for _, _, c in verified]):
+        graded = grade_many_with_tokens([c for _, _, c in verified], [a.user_response for _, a, _ in verified])
+        mastery_infos = mastery_service.update_mastery_batch(
+            [(c["teks"], g["correct"], c["difficulty"], _local_naive(a.answered_at))
+             for (_, a, c), g in zip(verified, graded)],
+            learner_id=learner_id,
+        )
+    for (i, attempt, claims), result, mastery_info in zip(verified, graded, mastery_infos):
+        results[i] = {"item_id": attempt.item_id, **attempt_result(claims["teks"], result, mastery_info)}
+
     return {
-        "correct": is_correct,
-        "mastery_delta": mastery_info["mastery_delta"],
-        "mastery": mastery_info["score"],
-        "is_mastered": mastery_info["is_mastered"],
-        "next_item_hint": f"Keep practicing {payload.teks}!" if not is_correct else None
+        "results": results,
+        "accepted": len(verified),
+        "rejected": len(results) - len(verified),
     }
+
+
+def _local_naive(moment: datetime | None) -> datetime | None:
+    # Mastery timestamps are naive local time; normalize timezone-aware input
+    if moment is None or moment.tzinfo is None:
+        return moment
+    return moment.astimezone().replace(tzinfo=None)
@@ -1,4 +1,5 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Request
+from fastapi.responses import JSONResponse
 
 router = APIRouter(prefix="/health", tags=["health"])
 
@@ -6,3 +7,10 @@ router = APIRouter(prefix="/health", tags=["health"])
 @router.get("")
 def healthcheck():
     return {"status": "ok"}
+
+
+@router.get("/ready")
+def readiness(request: Request):
+    """Passes only once the warm-up phase has finished; 503 until then."""
+    status = request.app.state.warmup.status()
+    return JSONResponse(status, status_code=200 if status["status"] == "ready" else 503)
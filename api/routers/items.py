@@ -1,48 +1,70 @@
-from fastapi import APIRouter, Query, Request
+from fastapi import APIRouter, Depends, Query, Request
 from typing import Any, Dict, Optional
-import random
+from ..deps import get_learner_id
 
 router = APIRouter(prefix="/practice", tags=["practice"]) 
 
 @router.get("/next")
 def get_next_item(
     request: Request, 
-    teks: Optional[str] = Query(None, description="TEKS code like 6.8B")
+    teks: Optional[str] = Query(None, description="TEKS code like 6.8B; omit for the learner's recommended next item"),
+    learner_id: str = Depends(get_learner_id)
 ) -> Dict[str, Any]:
-    """Get the next practice item for a given TEKS."""
-    item_factory = request.app.state.item_factory
+    """Get the next practice item, at the learner's current difficulty.
+
+    Without teks, serves the learner's next precomputed recommendation
+    (due review, next curriculum skill or largest mastery gap).
+    """
+    item_pool = request.app.state.item_pool
+    mastery_service = request.app.state.mastery_service
+    recommender = request.app.state.recommender
     
-    # Map TEKS to template IDs
-    teks_to_template = {
-        "6.2": "6.2_rationals_ops",
-        "6.4": "6.4_unit_rate", 
-        "6.7B": "6.7B_expr_vs_eq",
-        "6.8B": "6.8B_trapezoid_area",
-        "6.9A": "6.9A_one_step"
-    }
+    if teks is None:
+        slot = recommender.next(learner_id)
+        template_id, difficulty = (slot.template_id, slot.difficulty) if slot else (None, None)
+    else:
+        difficulty = mastery_service.get_difficulty(teks, learner_id)
+        template_id = recommender.template_for(teks, difficulty)
     
     # Use trapezoid as default (it works!)
-    template_id = teks_to_template.get(teks, "6.8B_trapezoid_area") if teks else "6.8B_trapezoid_area"
+    if template_id is None:
+        difficulty = mastery_service.get_difficulty("6.8B", learner_id)
+        template_id = "6.8B_trapezoid_area"
     
-    # Try to generate item, fall back to trapezoid if it fails
-    seed = random.randint(1000, 9999)
+    # Serve from the pre-generated pool at the chosen level, fall back to trapezoid if it fails
     try:
-        item = item_factory.generate_item(template_id, seed)
+        item = item_pool.get(template_id, difficulty)
     except Exception as e:
         print(f"Error generating {template_id}: {e}")
         # Fallback to trapezoid which we know works
         template_id = "6.8B_trapezoid_area"
-        item = item_factory.generate_item(template_id, seed)
+        item = item_pool.get(template_id, mastery_service.get_difficulty("6.8B", learner_id))
+    seed = item["seed"]
     
     # Format for frontend
     return {
         "id": item["id"],
         "teks": item["teks"],
-        "type": "numeric",
+        "type": item["type"],
         "seed": seed,
         "stimulus": item.get("stimulus"),  # Include SVG diagrams
         "prompt": item["prompt"],
-        "difficulty": item.get("difficulty", 2),
+        "options": [{"id": opt["value"], "text": opt["value"]} for opt in item["options"]] if item.get("options") else None,
+        "difficulty": item["difficulty"],
         "hints": item.get("hints", []),
-        "answer": item["answer"]  # Keep for backend validation
+        "answer_format": item.get("answer_format"),
+        # Signed, single-use item reference for POST /attempts; holds no answer key
+        "token": request.app.state.answer_tokens.issue(item, template_id, learner_id)
     }
+
+
+@router.get("/recommendations")
+def get_recommendations(request: Request, learner_id: str = Depends(get_learner_id)) -> Dict[str, Any]:
+    """The learner's upcoming recommended items (skill, difficulty, template), for prefetching."""
+    return {"slots": [slot._asdict() for slot in request.app.state.recommender.peek(learner_id)]}
+
+
+@router.get("/pool")
+def get_pool_stats(request: Request) -> Dict[str, Any]:
+    """Item pool depth, hit/miss and refill-latency counters."""
+    return request.app.state.item_pool.stats()
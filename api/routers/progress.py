@@ -1,28 +1,30 @@
-from fastapi import APIRouter, Request
+from fastapi import APIRouter, Depends, Query, Request
 from typing import Dict, Any
 from datetime import datetime
+from ..deps import get_learner_id
 
 router = APIRouter(prefix="/progress", tags=["progress"]) 
 
 
 @router.get("/me")
-def get_progress_me(request: Request) -> Dict[str, Any]:
-    """Get user's progress across all skills."""
+def get_progress_me(request: Request, learner_id: str = Depends(get_learner_id)) -> Dict[str, Any]:
+    """Get the requesting learner's progress across all skills."""
     mastery_service = request.app.state.mastery_service
     
     # Get all mastery records
-    all_mastery = mastery_service.get_all_mastery()
+    all_mastery = mastery_service.get_all_mastery(learner_id)
     
     # Convert to API format
     skills = []
     for record in all_mastery:
         skills.append({
             "teks": record.teks,
-            "mastery": record.score,
+            "mastery": record.effective_score,  # Decayed since the last attempt
             "last_seen": record.last_seen_at.isoformat() if record.last_seen_at else None,
             "due_review_at": record.due_review_at.isoformat() if record.due_review_at else None,
             "attempts": record.attempts,
-            "level": mastery_service.get_mastery_level(record.teks)
+            "difficulty": record.difficulty,  # Level of the next item served
+            "level": mastery_service.mastery_level(record)
         })
     
     # If no skills yet, return empty list
@@ -30,3 +32,27 @@ def get_progress_me(request: Request) -> Dict[str, Any]:
         return {"skills": []}
     
     return {"skills": skills}
+
+
+@router.get("/me/reviews")
+def get_reviews_me(request: Request, learner_id: str = Depends(get_learner_id)) -> Dict[str, Any]:
+    """Skills the requesting learner has due for review, most overdue first."""
+    return {"skills": request.app.state.review_calendar.ready_skills(learner_id)}
+
+
+@router.get("/reviews/forecast")
+def get_review_forecast(request: Request, hours: int = Query(48, ge=1, le=24 * 90)) -> Dict[str, Any]:
+    """Reviews due now and scheduled per calendar bucket over the next `hours`."""
+    calendar = request.app.state.review_calendar
+    calendar.sweep()
+    now = datetime.now().timestamp()
+    stats = calendar.stats()
+    return {
+        "ready": stats["ready"],
+        "ready_learners": stats["ready_learners"],
+        "bucket_seconds": calendar.bucket_seconds,
+        "buckets": [
+            {"start": datetime.fromtimestamp(start).isoformat(), "count": count}
+            for start, count in calendar.bucket_counts(now, now + hours * 3600)
+        ],
+    }
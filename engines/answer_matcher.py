@@ -0,0 +1,184 @@
+import re
+from dataclasses import dataclass
+from fractions import Fraction
+from functools import lru_cache
+from typing import Any, Dict, FrozenSet, List, Tuple
+
+
+# sign, then a mixed number, a fraction or a decimal, then optional trailing units
+_NUMBER = re.compile(
+    r"""^\s*(?P<sign>[-+−])?\s*
+    (?:
+        (?P<whole>\d+)\s+(?P<mnum>\d+)\s*/\s*(?P<mden>\d+)
+      | (?P<num>\d+)\s*/\s*(?P<den>\d+)
+      | (?P<dec>\d+(?:\.\d*)?|\.\d+)
+    )
+    \s*(?P<units>.*?)\s*$""",
+    re.VERBOSE,
+)
+_THOUSANDS = re.compile(r"(?<=\d),(?=\d{3}\b)")
+
+# Fractions and mixed numbers are only offered as written forms up to this denominator
+MAX_WRITTEN_DENOMINATOR = 1000
+
+# Names a learner may write for a base unit, beyond its symbol ("u" is the generic unit)
+UNIT_NAMES: Dict[str, Tuple[str, ...]] = {
+    "u": ("unit", "units"),
+    "mm": ("millimeter", "millimeters", "millimetre", "millimetres"),
+    "cm": ("centimeter", "centimeters", "centimetre", "centimetres"),
+    "m": ("meter", "meters", "metre", "metres"),
+    "km": ("kilometer", "kilometers", "kilometre", "kilometres"),
+    "in": ("inch", "inches"),
+    "ft": ("foot", "feet"),
+    "yd": ("yard", "yards"),
+}
+
+
+def normalize_number(value: Any) -> Tuple[Fraction, str] | None:
+    """Parse a response into (exact value, normalized units text), or None.
+
+    Accepts ints, floats, Fractions and strings such as "7/2", "3 1/2",
+    "3.50", "-2.75", "1,200" or "40 u^2". Floats go through their shortest
+    repr, so 0.1 means 1/10.
+    """
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, Fraction)):
+        return Fraction(value), ""
+    if isinstance(value, float):
+        if value != value or value in (float("inf"), float("-inf")):
+            return None
+        return Fraction(repr(value)), ""
+    if not isinstance(value, str):
+        return None
+
+    match = _NUMBER.match(_THOUSANDS.sub("", value))
+    if match is None:
+        return None
+    if match["whole"] is not None:
+        if int(match["mden"]) == 0:
+            return None
+        number = int(match["whole"]) + Fraction(int(match["mnum"]), int(match["mden"]))
+    elif match["num"] is not None:
+        if int(match["den"]) == 0:
+            return None
+        number = Fraction(int(match["num"]), int(match["den"]))
+    else:
+        number = Fraction(match["dec"])
+    if match["sign"] in ("-", "−"):
+        number = -number
+    return number, normalize_units(match["units"])
+
+
+def normalize_units(units: str | None) -> str:
+    return (units or "").lower().replace(" ", "").replace("²", "^2").replace("³", "^3")
+
+
+def unit_spellings(units: str | None) -> FrozenSet[str]:
+    """Normalized spellings accepted for a unit such as "m^2".
+
+    A squared unit also matches "m2", "square m", "sq m", "sq. m", "m squared"
+    and the same forms with the unit's name ("square meters"); other units
+    match their symbol or name.
+    """
+    units = normalize_units(units)
+    if not units:
+        return frozenset()
+    base, power = units[:-2], units[-2:]
+    if power != "^2":
+        return frozenset({units, *UNIT_NAMES.get(units, ())})
+    spellings = {units}
+    for name in (base, *UNIT_NAMES.get(base, ())):
+        spellings.update({f"{name}^2", f"{name}2", f"square{name}", f"sq{name}", f"sq.{name}",
+                          f"{name}squared"})
+    return frozenset(spellings)
+
+
+@dataclass(frozen=True)
+class AnswerMatcher:
+    """Compiled answer key: the accepted exact values plus accepted units.
+
+    With zero tolerance, matching a normalized response is a set lookup;
+    otherwise it is a single range check around the key.
+    """
+
+    key: Fraction
+    accepted: FrozenSet[Fraction]
+    tolerance: Fraction
+    units: FrozenSet[str]
+    canonical: Any
+
+    def match(self, user_answer: Any) -> Dict[str, Any]:
+        parsed = normalize_number(user_answer)
+        if parsed is None:
+            return {"correct": False, "canonical": self.canonical, "feedback_code": "PARSE_ERROR"}
+        value, units = parsed
+        if units and units not in self.units:
+            code = "UNITS_MISMATCH" if self.units else "PARSE_ERROR"
+            return {"correct": False, "canonical": self.canonical, "feedback_code": code}
+        if self.tolerance:
+            correct = abs(value - self.key) <= self.tolerance
+        else:
+            correct = value in self.accepted
+        return {"correct": correct, "canonical": self.canonical, "feedback_code": "OK" if correct else "NUM_MISMATCH"}
+
+    def written_forms(self) -> List[str]:
+        """Ways a learner may write the key: reduced fraction, mixed number, decimal."""
+        return written_forms(self.key)
+
+
+@lru_cache(maxsize=16384)
+def compile_matcher(key: Any, form: str | None, tolerance: float | None = 0, units: str | None = None,
+                    equivalents: Tuple[Any, ...] = ()) -> AnswerMatcher:
+    """Build (once per distinct key) the matcher for a numeric answer."""
+    parsed = normalize_number(key)
+    if parsed is None:
+        raise ValueError(f"Answer key {key!r} is not numeric")
+    exact = parsed[0]
+    accepted = {exact}
+    for equivalent in equivalents:
+        parsed_equivalent = normalize_number(equivalent)
+        if parsed_equivalent is not None:
+            accepted.add(parsed_equivalent[0])
+
+    return AnswerMatcher(
+        key=exact,
+        accepted=frozenset(accepted),
+        tolerance=normalize_number(tolerance)[0] if tolerance else Fraction(0),
+        units=unit_spellings(units),
+        canonical=str(exact) if form == "fraction" else float(exact),
+    )
+
+
+def written_forms(value: Fraction) -> List[str]:
+    decimal = _terminating_decimal(value)
+    if decimal is not None and value.denominator > MAX_WRITTEN_DENOMINATOR:
+        return [decimal]  # e.g. 2.3333333333333335 from a float key; nobody writes that as a fraction
+    forms = [str(value)]
+    whole, rest = divmod(abs(value.numerator), value.denominator)
+    sign = "-" if value < 0 else ""
+    if whole and rest:
+        forms.append(f"{sign}{whole} {rest}/{value.denominator}")
+    if decimal is not None and decimal not in forms:
+        forms.append(decimal)
+    return forms
+
+
+def _terminating_decimal(value: Fraction) -> str | None:
+    denominator = value.denominator
+    twos = fives = 0
+    while denominator % 2 == 0:
+        denominator //= 2
+        twos += 1
+    while denominator % 5 == 0:
+        denominator //= 5
+        fives += 1
+    if denominator != 1:
+        return None
+    places = max(twos, fives)
+    if places == 0:
+        return None  # Integers are already covered by str(value)
+    scaled = abs(value.numerator) * 10 ** places // value.denominator
+    digits = str(scaled).rjust(places + 1, "0")
+    sign = "-" if value < 0 else ""
+    return f"{sign}{digits[:-places]}.{digits[-places:]}"
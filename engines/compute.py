@@ -0,0 +1,124 @@
+"""
+Compile template `compute` strings into reusable evaluation kernels.
+
+A compute string is `target = expression`, where the expression may use
+template params, numeric literals, + - * / // % **, unary +/- and calls to the
+whitelisted functions in FUNCTIONS. Anything else is rejected at compile time.
+Each kernel evaluates exactly on scalars (ints become Fractions, so "/" does
+not round) and vectorized on NumPy arrays.
+"""
+
+import ast
+from dataclasses import dataclass, field
+from fractions import Fraction
+from functools import lru_cache
+from typing import Any, Callable, Dict, FrozenSet, Iterable, List, Tuple
+
+import numpy as np
+
+from engines.solver import (
+    _op_apply, classify_exprs, op_apply_array, solve_one_step_array, solve_one_step_equation,
+)
+
+
+def _solve_one_step(form: Any, a: Any, b: Any, c: Any = None, d: Any = None) -> Fraction:
+    return solve_one_step_equation(form, a, b, c, d)
+
+
+# name -> (scalar implementation, array implementation or None)
+FUNCTIONS: Dict[str, Tuple[Callable[..., Any], Callable[..., Any] | None]] = {
+    "op_apply": (_op_apply, op_apply_array),
+    "solve_one_step": (_solve_one_step, solve_one_step_array),
+    "classify_exprs": (classify_exprs, None),
+}
+
+# Prose compute strings from early templates, mapped to their expression form
+COMPUTE_ALIASES = {
+    "solve for x": "x = solve_one_step(form, a, b, c)",
+}
+
+_ALLOWED_NODES = (
+    ast.Expression, ast.BinOp, ast.UnaryOp, ast.Call, ast.Name, ast.Load, ast.Constant,
+    ast.Add, ast.Sub, ast.Mult, ast.Div, ast.FloorDiv, ast.Mod, ast.Pow, ast.UAdd, ast.USub,
+)
+
+
+@dataclass
+class ComputeKernel:
+    """A validated compute expression with scalar and array entry points."""
+    source: str
+    target: str
+    names: Tuple[str, ...]
+    _code: Any = field(repr=False)
+    _array_ok: bool = field(default=True, repr=False)
+
+    def scalar(self, params: Dict[str, Any]) -> Any:
+        """Evaluate for one item; ints are promoted to Fractions for exact division."""
+        env: Dict[str, Any] = {name: fns[0] for name, fns in FUNCTIONS.items()}
+        for name in self.names:
+            value = params.get(name)
+            env[name] = Fraction(value) if isinstance(value, int) and not isinstance(value, bool) else value
+        return self._run(env)
+
+    def batch(self, params: Dict[str, np.ndarray]) -> Any:
+        """Evaluate over equal-length parameter arrays."""
+        if not self._array_ok:
+            raise NotImplementedError(f"No vectorized form for compute expression: {self.source}")
+        env: Dict[str, Any] = {name: fns[1] for name, fns in FUNCTIONS.items()}
+        for name in self.names:
+            env[name] = params.get(name)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return self._run(env)
+
+    def _run(self, env: Dict[str, Any]) -> Any:
+        try:
+            return eval(self._code, {"__builtins__": {}}, env)
+        except TypeError as e:
+            raise ValueError(f"Cannot evaluate {self.source!r}: {e}") from e
+
+
+@lru_cache(maxsize=256)
+def compile_compute(compute: str, allowed_names: FrozenSet[str] | None = None) -> ComputeKernel:
+    """Parse and validate a compute string once.
+
+    If allowed_names is given, every free name must be a template param or a
+    known function; otherwise unknown names resolve to None at call time.
+    """
+    source = COMPUTE_ALIASES.get(compute.strip(), compute.strip())
+    target, sep, expr = source.partition("=")
+    if not sep or not target.strip().isidentifier():
+        raise ValueError(f"Compute must look like 'target = expression': {compute!r}")
+
+    try:
+        tree = ast.parse(expr.strip(), mode="eval")
+    except SyntaxError as e:
+        raise ValueError(f"Invalid compute expression {compute!r}: {e}") from e
+
+    names: List[str] = []
+    for node in ast.walk(tree):
+        if not isinstance(node, _ALLOWED_NODES):
+            raise ValueError(f"Disallowed syntax {type(node).__name__} in {compute!r}")
+        if isinstance(node, ast.Constant) and not isinstance(node.value, (int, float)):
+            raise ValueError(f"Only numeric literals are allowed in {compute!r}")
+        if isinstance(node, ast.Call):
+            if not isinstance(node.func, ast.Name) or node.func.id not in FUNCTIONS or node.keywords:
+                raise ValueError(f"Unknown function in {compute!r}")
+        elif isinstance(node, ast.Name) and node.id not in FUNCTIONS and node.id not in names:
+            names.append(node.id)
+
+    if allowed_names is not None:
+        unknown = [name for name in names if name not in allowed_names]
+        if unknown:
+            raise ValueError(f"Unknown names {unknown} in compute {compute!r}")
+
+    array_ok = all(
+        FUNCTIONS[node.func.id][1] is not None
+        for node in ast.walk(tree) if isinstance(node, ast.Call)
+    )
+    code = compile(tree, f"<compute {target.strip()}>", "eval")
+    return ComputeKernel(source, target.strip(), tuple(names), code, array_ok)
+
+
+def compile_template(template: Dict[str, Any], param_names: Iterable[str]) -> ComputeKernel:
+    """Compile a template's compute string against its declared params."""
+    return compile_compute(template.get("compute", ""), frozenset(param_names))
@@ -68,19 +68,25 @@ class DecoratorLLM:
         }
     
     def decorate_item(self, template: Dict[str, Any], params: Dict[str, Any], 
-                     answer: Any) -> Dict[str, Any]:
-        """Decorate a template with generated content."""
+                     answer: Any, rng: random.Random | None = None) -> Dict[str, Any]:
+        """Decorate a template with generated content.
+
+        Pass the item's own `rng` so decoration is reproducible per seed; without
+        one a fresh unseeded generator is used (never the shared module RNG).
+        """
+        if rng is None:
+            rng = random.Random()
         teks = template["teks"]
         item_type = template["type"]
         
         # Generate context
-        context = self._generate_context(teks, params)
+        context = self._generate_context(teks, params, rng)
         
         # Generate prompt
         prompt = self._generate_prompt(template, params)
         
         # Generate hints
-        hints = self._generate_hints(teks, params)
+        hints = self._generate_hints(teks, params, rng)
         
         # Generate explanation
         explanation = self._generate_explanation(template, params, answer)
@@ -98,10 +104,10 @@ class DecoratorLLM:
             "distractors": distractors
         }
     
-    def _generate_context(self, teks: str, params: Dict[str, Any]) -> str:
+    def _generate_context(self, teks: str, params: Dict[str, Any], rng: random.Random) -> str:
         """Generate a school-appropriate context sentence."""
         templates = self.context_templates.get(teks, ["A math problem:"])
-        context = random.choice(templates)
+        context = rng.choice(templates)
         
         # Add specific details based on parameters
         if teks == "6.8B" and "b1" in params:
@@ -129,10 +135,10 @@ class DecoratorLLM:
         else:
             return template["presentation"].get("ask", "Answer the question.")
     
-    def _generate_hints(self, teks: str, params: Dict[str, Any]) -> List[str]:
+    def _generate_hints(self, teks: str, params: Dict[str, Any], rng: random.Random) -> List[str]:
         """Generate hints for the item."""
         templates = self.hint_templates.get(teks, ["Think step by step."])
-        return random.sample(templates, min(3, len(templates)))
+        return rng.sample(templates, min(3, len(templates)))
     
     def _generate_explanation(self, template: Dict[str, Any], params: Dict[str, Any], 
                             answer: Any) -> str:
@@ -0,0 +1,210 @@
+"""
+Two-tier algebraic equivalence for short learner expressions.
+
+Tier 1 compiles both expressions (same AST whitelist idea as engines.compute,
+plus a degree bound so nested powers can't build huge Fractions) and
+evaluates them exactly, with Fractions, at a few fixed random rational
+points. Any disagreement is a definite "not equivalent" and costs
+microseconds. Only when every probe agrees, or an expression is outside the
+whitelist, does tier 2 ask sympy, whose parsed/simplified results are cached.
+Tier 2 runs in a process sandbox with a timeout once `use_sandbox` is called.
+"""
+
+import ast
+import cmath
+import random
+import re
+import zlib
+from dataclasses import dataclass, field
+from fractions import Fraction
+from functools import lru_cache
+from typing import Any, Dict, Tuple
+
+PROBE_COUNT = 6
+MIN_VALID_PROBES = 3
+MAX_EXPONENT = 32
+MAX_EXPR_LENGTH = 200
+# Bound on the degree of any subexpression (leaves count 1), which bounds the
+# size of the probes' intermediate Fractions: ((x^32)^32)^32 is left to sympy
+MAX_PROBE_DEGREE = 256
+
+_ALLOWED_NODES = (
+    ast.Expression, ast.BinOp, ast.UnaryOp, ast.Name, ast.Load, ast.Constant,
+    ast.Add, ast.Sub, ast.Mult, ast.Div, ast.Pow, ast.UAdd, ast.USub,
+)
+# Names sympify reads as constants rather than symbols; leave those to sympy
+_SYMPY_CONSTANTS = frozenset({"E", "I", "N", "O", "Q", "S", "pi", "oo", "nan", "zoo"})
+
+# 2x -> 2*x, 4(x+3) -> 4*(x+3), (x+1)(x-1) -> (x+1)*(x-1), (x+1)2 -> (x+1)*2
+_IMPLICIT_MUL = re.compile(r"(?<=[0-9.])\s*(?=[A-Za-z(])|(?<=\))\s*(?=[A-Za-z0-9.(])")
+
+
+def normalize_expr(text: str) -> str:
+    """Spell out implicit multiplication and ^ so both tiers parse the same thing."""
+    return _IMPLICIT_MUL.sub("*", text.strip().replace("^", "**"))
+
+
+@dataclass
+class ProbeExpr:
+    """An expression compiled for exact evaluation at probe points."""
+    names: Tuple[str, ...]
+    _code: Any = field(repr=False)
+    _constants: Dict[str, Fraction] = field(repr=False)
+
+    def __call__(self, point: Dict[str, Fraction]) -> Any:
+        env = dict(self._constants)
+        env.update({name: point[name] for name in self.names})
+        return eval(self._code, {"__builtins__": {}}, env)
+
+
+@lru_cache(maxsize=4096)
+def compile_probe(text: str) -> ProbeExpr | None:
+    """Compile a normalized expression, or None if it needs sympy."""
+    if len(text) > MAX_EXPR_LENGTH:
+        return None
+    try:
+        tree = ast.parse(text, mode="eval")
+    except SyntaxError:
+        return None
+
+    constants: Dict[str, Fraction] = {}
+    names = set()
+    for node in ast.walk(tree):
+        if not isinstance(node, _ALLOWED_NODES):
+            return None
+        if isinstance(node, ast.Name):
+            if node.id in _SYMPY_CONSTANTS or node.id.startswith("_"):
+                return None
+            names.add(node.id)
+        elif isinstance(node, ast.Constant):
+            if isinstance(node.value, bool) or not isinstance(node.value, (int, float)):
+                return None
+        elif isinstance(node, ast.BinOp) and isinstance(node.op, ast.Pow):
+            # Only small literal integer exponents keep probes exact and cheap
+            exponent = node.right
+            if isinstance(exponent, ast.UnaryOp) and isinstance(exponent.op, ast.USub):
+                exponent = exponent.operand
+            if not (isinstance(exponent, ast.Constant) and isinstance(exponent.value, int)
+                    and abs(exponent.value) <= MAX_EXPONENT):
+                return None
+    if _degree(tree.body) > MAX_PROBE_DEGREE:
+        return None
+
+    # Numeric literals become exact Fractions, so 0.5*x == x/2 at every probe
+    class _Exact(ast.NodeTransformer):
+        def visit_Constant(self, node: ast.Constant) -> ast.AST:
+            name = f"_c{len(constants)}"
+            constants[name] = Fraction(repr(node.value)) if isinstance(node.value, float) else Fraction(node.value)
+            return ast.copy_location(ast.Name(id=name, ctx=ast.Load()), node)
+
+    tree = ast.fix_missing_locations(_Exact().visit(tree))
+    return ProbeExpr(tuple(sorted(names)), compile(tree, "<expr>", "eval"), constants)
+
+
+def _degree(node: ast.AST) -> int:
+    """Upper bound on the degree of a whitelisted expression, constants counting as 1."""
+    if isinstance(node, ast.UnaryOp):
+        return _degree(node.operand)
+    if isinstance(node, ast.BinOp):
+        if isinstance(node.op, ast.Pow):
+            exponent = node.right.operand if isinstance(node.right, ast.UnaryOp) else node.right
+            return _degree(node.left) * max(abs(exponent.value), 1)
+        left, right = _degree(node.left), _degree(node.right)
+        return max(left, right) if isinstance(node.op, (ast.Add, ast.Sub)) else left + right
+    return 1
+
+
+@lru_cache(maxsize=256)
+def probe_points(names: Tuple[str, ...], count: int = PROBE_COUNT) -> Tuple[Dict[str, Fraction], ...]:
+    """Fixed pseudo-random rational points (non-integer, so x and x**2 part ways)."""
+    rng = random.Random(zlib.crc32(",".join(names).encode()))
+    return tuple(
+        {name: Fraction(rng.randint(-97, 97), rng.choice((3, 7, 11, 13, 17))) for name in names}
+        for _ in range(count)
+    )
+
+
+def probe_equivalent(lhs: str, rhs: str) -> bool | None:
+    """Tier 1: False if a probe separates the expressions, True if all agree, None if undecided."""
+    left, right = compile_probe(normalize_expr(lhs)), compile_probe(normalize_expr(rhs))
+    if left is None or right is None:
+        return None
+    valid = 0
+    for point in probe_points(tuple(sorted(set(left.names) | set(right.names)))):
+        try:
+            a, b = left(point), right(point)
+        except (ZeroDivisionError, OverflowError, ValueError, TypeError):
+            continue  # Outside one expression's domain; try the next point
+        if isinstance(a, Fraction) and isinstance(b, Fraction):
+            if a != b:
+                return False
+        elif not cmath.isclose(a, b, rel_tol=1e-9, abs_tol=1e-12):
+            return False
+        valid += 1
+    return True if valid >= MIN_VALID_PROBES else None
+
+
+@lru_cache(maxsize=4096)
+def _simplified(text: str) -> Any:
+    import sympy as sp  # Deferred: sympy is slow to import and only needed here
+
+    return sp.simplify(sp.sympify(text))
+
+
+def symbolic_compare(lhs: str, rhs: str) -> str:
+    """Tier 2 on normalized expressions: "OK", "EXPR_MISMATCH" or "PARSE_ERROR".
+
+    Runs in-process, or inside a sandbox worker when one is installed.
+    """
+    import sympy as sp
+
+    try:
+        difference = _simplified(normalize_expr(lhs)) - _simplified(normalize_expr(rhs))
+        return "OK" if sp.simplify(difference) == 0 else "EXPR_MISMATCH"
+    except Exception:
+        return "PARSE_ERROR"
+
+
+# Object with run(fn, *args) (services.expr_sandbox.ExprSandbox) that isolates tier 2
+_sandbox: Any = None
+
+
+def use_sandbox(sandbox: Any):
+    """Route sympy work through sandbox.run, or back in-process with None."""
+    global _sandbox
+    _sandbox = sandbox
+    _symbolic_cached.cache_clear()
+
+
+@lru_cache(maxsize=16384)
+def _symbolic_cached(lhs: str, rhs: str) -> str:
+    # Timeouts raise, so they are never cached
+    if _sandbox is not None:
+        return _sandbox.run(symbolic_compare, lhs, rhs)
+    return symbolic_compare(lhs, rhs)
+
+
+def compare_expressions(lhs: str, rhs: str) -> str:
+    """Feedback code for lhs against rhs: OK, EXPR_MISMATCH, PARSE_ERROR or TIMEOUT."""
+    lhs, rhs = str(lhs), str(rhs)
+    if len(lhs) > MAX_EXPR_LENGTH or len(rhs) > MAX_EXPR_LENGTH:
+        return "PARSE_ERROR"
+    if probe_equivalent(lhs, rhs) is False:
+        return "EXPR_MISMATCH"
+    try:
+        return _symbolic_cached(lhs, rhs)
+    except TimeoutError:
+        return "TIMEOUT"
+    except RuntimeError:
+        return "PARSE_ERROR"  # Sandbox worker crashed, e.g. over its memory limit
+
+
+def expressions_equivalent(lhs: str, rhs: str) -> bool:
+    """True if the two expressions are algebraically equal."""
+    return compare_expressions(lhs, rhs) == "OK"
+
+
+def clear_caches():
+    """Drop compiled probes and cached sympy results (e.g. in benchmarks)."""
+    for cached in (compile_probe, probe_points, _simplified, _symbolic_cached):
+        cached.cache_clear()
@@ -1,31 +1,96 @@
-from fractions import Fraction
-from typing import Any, Dict
+import math
+import re
+from typing import Any, Dict, List, Sequence
 
-import sympy as sp
+import numpy as np
 
+from engines.answer_matcher import compile_matcher
+from engines.expr_equiv import compare_expressions, expressions_equivalent
 
-def grade_numeric(user_answer: Any, key: Any, tolerance: float, form: str, units: str | None = None) -> Dict[str, Any]:
+
+# Plain decimals of at most 15 digits (and ints below 2**53) convert to floats
+# that compare equal exactly when their exact values do
+_PLAIN_DECIMAL = re.compile(r"\s*[-+]?(?:\d+(?:\.\d*)?|\.\d+)\s*")
+_MAX_PLAIN_DIGITS = 15
+_MAX_PLAIN_INT = 2 ** 53
+# Float rounding in |answer - key| <= tolerance stays below this fraction of the operands
+_TOLERANCE_SLACK = 2.0 ** -50
+
+
+def grade_numeric(user_answer: Any, key: Any, tolerance: float, form: str, units: str | None = None,
+                  equivalents: Sequence[Any] = ()) -> Dict[str, Any]:
+    """Grade a numeric response; "7/2", "3 1/2" and "3.50" are the same answer.
+
+    The key is compiled once into an AnswerMatcher (cached per distinct key),
+    so each attempt is one normalization plus a set lookup.
+    """
     try:
-        if form == "fraction":
-            ua = Fraction(str(user_answer))
-            kk = Fraction(str(key))
-            correct = ua == kk
-            canonical = str(kk)
-        else:
-            ua = float(user_answer)
-            kk = float(key)
-            correct = abs(ua - kk) <= (tolerance or 0)
-            canonical = kk
-        return {"correct": bool(correct), "canonical": canonical, "feedback_code": "OK" if correct else "NUM_MISMATCH"}
-    except Exception:
+        matcher = compile_matcher(key, form, tolerance, units, tuple(equivalents))
+    except (TypeError, ValueError):
         return {"correct": False, "canonical": key, "feedback_code": "PARSE_ERROR"}
+    return matcher.match(user_answer)
+
+
+def grade_numeric_batch(user_answers: Sequence[Any], keys: Sequence[Any], tolerances: Sequence[float],
+                        forms: Sequence[str], units: Sequence[str | None] | None = None) -> List[Dict[str, Any]]:
+    """Grade many numeric responses; same results as calling grade_numeric on each.
+
+    Plain numbers (ints, floats and unit-less decimal strings) against
+    non-fraction keys are compared in one NumPy pass; everything else, and
+    tolerance checks too close to the boundary to trust floats, goes
+    through the matcher.
+    """
+    if units is None:
+        units = [None] * len(keys)
+    results: List[Dict[str, Any] | None] = [None] * len(keys)
+    rows, ua, kk, tol = [], [], [], []
+    for i, (user_answer, key, tolerance, form) in enumerate(zip(user_answers, keys, tolerances, forms)):
+        u, k, t = _plain_float(user_answer), _plain_float(key), _plain_float(tolerance or 0)
+        if form == "fraction" or u is None or k is None or t is None or t < 0:
+            results[i] = grade_numeric(user_answer, key, tolerance, form, units[i])
+            continue
+        rows.append(i)
+        ua.append(u)
+        kk.append(k)
+        tol.append(t)
+
+    if rows:
+        ua_arr, kk_arr, tol_arr = np.asarray(ua), np.asarray(kk), np.asarray(tol)
+        diff = np.abs(ua_arr - kk_arr)
+        correct = np.where(tol_arr > 0, diff <= tol_arr, ua_arr == kk_arr)
+        scale = np.maximum(np.maximum(np.abs(ua_arr), np.abs(kk_arr)), tol_arr)
+        unsure = (tol_arr > 0) & (np.abs(diff - tol_arr) <= scale * _TOLERANCE_SLACK)
+        for i, k, ok, recheck in zip(rows, kk, correct.tolist(), unsure.tolist()):
+            if recheck:
+                results[i] = grade_numeric(user_answers[i], keys[i], tolerances[i], forms[i], units[i])
+            else:
+                results[i] = {"correct": ok, "canonical": k, "feedback_code": "OK" if ok else "NUM_MISMATCH"}
+    return results
+
+
+def _plain_float(value: Any) -> float | None:
+    """value as a float if that comparison is exact, else None."""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, int):
+        return float(value) if abs(value) < _MAX_PLAIN_INT else None
+    if isinstance(value, float):
+        return value if math.isfinite(value) else None
+    if (isinstance(value, str) and _PLAIN_DECIMAL.fullmatch(value)
+            and sum(c.isdigit() for c in value) <= _MAX_PLAIN_DIGITS):
+        return float(value)
+    return None
 
 
 def grade_expression(user_expr: str, key_expr: str) -> bool:
-    try:
-        return sp.simplify(sp.sympify(user_expr) - sp.sympify(key_expr)) == 0
-    except Exception:
-        return False
+    """Numeric probes reject wrong answers fast; sympy confirms the rest."""
+    return expressions_equivalent(user_expr, key_expr)
+
+
+def grade_expression_result(user_expr: str, key_expr: str) -> Dict[str, Any]:
+    """Like grade_expression, with TIMEOUT/PARSE_ERROR feedback codes."""
+    code = compare_expressions(user_expr, key_expr)
+    return {"correct": code == "OK", "canonical": key_expr, "feedback_code": code}
 
 
 def grade_mc(choice: Any, correct_value: Any) -> Dict[str, Any]:
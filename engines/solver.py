@@ -1,55 +1,77 @@
+from dataclasses import dataclass
 from fractions import Fraction
-from typing import Any, Dict, Tuple
+from typing import Any, Dict, Iterable, List, Tuple
 
-import sympy as sp
+import numpy as np
 
 
-def eval_compute(template: Dict[str, Any], params: Dict[str, Any]) -> Tuple[Any, Dict[str, Any]]:
+@dataclass
+class FractionArray:
+    """Exact rational results for a batch, as reduced numerator/denominator arrays.
+
+    Attribute names mirror `Fraction` so validators can treat both alike.
+    """
+    numerator: np.ndarray
+    denominator: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.numerator)
+
+    def __getitem__(self, index: Any) -> "FractionArray":
+        return FractionArray(self.numerator[index], self.denominator[index])
+
+    def tolist(self) -> List[Fraction]:
+        return [Fraction(n, d) for n, d in zip(self.numerator.tolist(), self.denominator.tolist())]
+
+
+def eval_compute(template: Dict[str, Any], params: Dict[str, Any], kernel: Any = None) -> Tuple[Any, Dict[str, Any]]:
     """Evaluate the template's compute expression using params.
 
-    This is a minimal, safe evaluator that supports known forms from the spec.
-    Returns (answer, meta_dict).
+    Uses the template's compiled kernel (see engines.compute) when given,
+    otherwise compiles the compute string (cached). The exact result is
+    coerced to the template's answer_format form. Returns (answer, meta_dict).
+    """
+    from engines.compute import compile_compute
+
+    if kernel is None:
+        kernel = compile_compute(template.get("compute", ""))
+    meta: Dict[str, Any] = {"type": template.get("type"), "target": kernel.target}
+    return coerce_answer(kernel.scalar(params), template.get("answer_format", {}).get("form")), meta
+
+
+def eval_compute_batch(template: Dict[str, Any], params: Dict[str, np.ndarray], kernel: Any = None) -> Tuple[Any, Dict[str, Any]]:
+    """Vectorized `eval_compute` over parameter arrays of equal length.
+
+    Returns (answers, meta) where answers is a float array, or a FractionArray
+    for one-step equations. Invalid rows (e.g. division by zero) come back as
+    nan/inf/0-denominator instead of raising; constraint masks filter them out.
     """
-    compute = template.get("compute", "").strip()
-    item_type = template.get("type")
-    meta: Dict[str, Any] = {"type": item_type}
-
-    # Trapezoid area
-    if "(b1 + b2)/2 * h" in compute or compute == "A = (b1 + b2)/2 * h":
-        b1 = int(params["b1"]) if "b1" in params else int(params.get("b1_min", 0))
-        b2 = int(params["b2"]) if "b2" in params else int(params.get("b2_min", 0))
-        h = int(params["h"]) if "h" in params else int(params.get("h_min", 0))
-        ans = area_trapezoid(b1, b2, h)
-        meta.update({"b1": b1, "b2": b2, "h": h})
-        return ans, meta
-
-    # Unit rate
-    if compute.startswith("unit = ") and "/" in compute:
-        x = params.get("x")
-        y = params.get("y")
-        if x is None or y is None:
-            raise ValueError("Missing x or y for unit rate")
-        return unit_rate(x, y), meta
-
-    # One-step equation (placeholder: delegate to solve_one_step_equation)
-    if "solve for x" in compute:
-        form = params.get("form")
-        a = params.get("a")
-        b = params.get("b")
-        c = params.get("c")
-        d = params.get("d")
-        return solve_one_step_equation(form, a, b, c, d), meta
-
-    # Generic op apply for rationals ops
-    if compute.startswith("result = op_apply"):
-        a = params.get("a")
-        b = params.get("b")
-        op = params.get("op")
-        if op not in {"+", "-", "×", "÷"}:
-            raise ValueError("Unsupported op")
-        return _op_apply(a, b, op), meta
-
-    raise NotImplementedError(f"Unsupported compute expression: {compute}")
+    from engines.compute import compile_compute
+
+    if kernel is None:
+        kernel = compile_compute(template.get("compute", ""))
+    meta: Dict[str, Any] = {"type": template.get("type"), "target": kernel.target}
+    return kernel.batch(params), meta
+
+
+def coerce_answer(value: Any, form: str | None) -> Any:
+    """Convert an exact scalar result to the type its answer format expects."""
+    if not isinstance(value, Fraction):
+        return value
+    if form == "fraction":
+        return value
+    if form == "decimal":
+        return float(value)
+    if value.denominator == 1:
+        return int(value)
+    if form == "int":
+        raise ValueError(f"Non-integer result {value} for int answer format")
+    return float(value)
+
+
+def classify_exprs(forms: List[str]) -> List[str]:
+    """Label each form as an 'equation' (has an equals sign) or an 'expression'."""
+    return ["equation" if "=" in form else "expression" for form in forms]
 
 
 def solve_one_step_equation(form: str | None, a: Any, b: Any, c: Any, d: Any) -> Fraction:
@@ -57,6 +79,7 @@ def solve_one_step_equation(form: str | None, a: Any, b: Any, c: Any, d: Any) ->
 
     Supported forms: 'x + a = b', 'x - a = b', 'c x = d', 'x / c = d'
     Coefficients may be ints or Fractions (as strings like '-7/2').
+    When c or d are not given, a and b stand in for them.
     """
     def to_fraction(val: Any) -> Fraction:
         if isinstance(val, Fraction):
@@ -71,6 +94,10 @@ def solve_one_step_equation(form: str | None, a: Any, b: Any, c: Any, d: Any) ->
 
     if not form:
         raise ValueError("Equation form required")
+    if c is None:
+        c = a
+    if d is None:
+        d = b
 
     if form == "x + a = b":
         a_f, b_f = to_fraction(a), to_fraction(b)
@@ -90,6 +117,58 @@ def solve_one_step_equation(form: str | None, a: Any, b: Any, c: Any, d: Any) ->
     raise NotImplementedError(f"Unsupported form: {form}")
 
 
+def solve_one_step_array(form: np.ndarray, a: Any, b: Any, c: Any = None, d: Any = None) -> FractionArray:
+    """Vectorized `solve_one_step_equation` returning reduced fractions.
+
+    Rows with c == 0 in 'c x = d' get denominator 0.
+    """
+    if c is None:
+        c = a
+    if d is None:
+        d = b
+    a, b, c, d = (np.asarray(v, dtype=np.int64) for v in (a, b, c, d))
+    form = np.asarray(form)
+    is_add = form == "x + a = b"
+    is_sub = form == "x - a = b"
+    is_mul = form == "c x = d"
+    is_div = form == "x / c = d"
+    num = np.select([is_add, is_sub, is_mul, is_div], [b - a, b + a, d, c * d], 0)
+    den = np.where(is_mul, c, 1)
+    # Normalize sign onto the numerator, then reduce
+    num = np.where(den < 0, -num, num)
+    den = np.abs(den)
+    g = np.gcd(num, den)
+    g = np.where(g == 0, 1, g)
+    return FractionArray(num // g, den // g)
+
+
+def one_step_unused(form: np.ndarray, names: Iterable[str]) -> Dict[str, np.ndarray]:
+    """Per given coefficient name, the rows whose one-step form does not read it.
+
+    Mirrors solve_one_step_equation: 'x ± a = b' reads a and b, 'c x = d' and
+    'x / c = d' read c and d, with a and b standing in when c or d are not
+    params.
+    """
+    uses_c = np.isin(np.asarray(form), ["c x = d", "x / c = d"])
+    names = set(names)
+    reads = {
+        "a": ~uses_c | ("c" not in names),
+        "b": ~uses_c | ("d" not in names),
+        "c": uses_c,
+        "d": uses_c,
+    }
+    return {name: ~np.broadcast_to(read, uses_c.shape) for name, read in reads.items() if name in names}
+
+
+def op_apply_array(a: np.ndarray, b: np.ndarray, op: np.ndarray) -> np.ndarray:
+    """Vectorized `_op_apply`; division by zero and unknown operators are nan."""
+    a = np.asarray(a, dtype=np.float64)
+    b = np.asarray(b, dtype=np.float64)
+    op = np.asarray(op)
+    quotient = np.divide(a, b, out=np.full(np.broadcast(a, b).shape, np.nan), where=b != 0)
+    return np.select([op == "+", op == "-", op == "×", op == "÷"], [a + b, a - b, a * b, quotient], np.nan)
+
+
 def area_trapezoid(b1: int, b2: int, h: int) -> int:
     if b1 <= 0 or b2 <= 0 or h <= 0:
         raise ValueError("b1, b2, h must be positive")
@@ -105,13 +184,9 @@ def unit_rate(x: float | int, y: float | int) -> float:
 
 
 def equiv_expr(lhs: str, rhs: str) -> bool:
-    x, y, z = sp.symbols("x y z")
-    try:
-        lhs_s = sp.simplify(sp.sympify(lhs))
-        rhs_s = sp.simplify(sp.sympify(rhs))
-        return sp.simplify(lhs_s - rhs_s) == 0
-    except Exception:
-        return False
+    from engines.expr_equiv import expressions_equivalent
+
+    return expressions_equivalent(lhs, rhs)
 
 
 def _op_apply(a: Any, b: Any, op: str) -> float:
@@ -1,8 +1,11 @@
+from functools import lru_cache
 from typing import Dict, Any, List, Tuple
 
 
+@lru_cache(maxsize=4096)
 def render_trapezoid(b1: int, b2: int, h: int, units: str = "cm") -> str:
-    """Render a trapezoid SVG with given dimensions."""
+    """Render a trapezoid SVG with given dimensions (memoized: the output is
+    a pure function of the arguments)."""
     # Scale factor for better visibility
     scale = 20
     
@@ -1,4 +1,6 @@
-from typing import Any, Iterable
+from typing import Any, Dict, Iterable
+
+import numpy as np
 
 
 BANNED_TERMS = {"kill", "weapon", "drugs", "alcohol"}
@@ -31,3 +33,51 @@ def check_distractors(correct: Any, distractors: list[Any], fn_list: list) -> bo
         if not fn():
             return False
     return True
+
+
+def constraint_mask(template: Dict[str, Any], params: Dict[str, Any], answer: Any = None) -> np.ndarray:
+    """Evaluate a template's constraints over scalar params or equal-length arrays.
+
+    Returns a boolean array (or numpy bool for scalars) that is True where every
+    known constraint holds. Unknown constraint names are ignored.
+    """
+    constraints = template.get("constraints", {})
+    p = {key: np.asarray(value) for key, value in params.items()}
+    mask = np.bool_(True)
+
+    if constraints.get("nondegenerate") and "b1" in p:
+        mask = mask & (p["b1"] > 0) & (p["b2"] > 0) & (p["h"] > 0)
+
+    if constraints.get("integer_area") and "b1" in p:
+        mask = mask & (((p["b1"] + p["b2"]) * p["h"]) % 2 == 0)
+
+    if template.get("params", {}).get("require_nontrivial") and "a" in p:
+        mask = mask & (p["a"] != 0) & (p["b"] != 0)
+
+    if constraints.get("no_div_zero") and "op" in p:
+        mask = mask & ~((p["op"] == "÷") & (p["b"] == 0))
+
+    denoms = constraints.get("denom_divisibility")
+    if denoms and "op" in p:
+        # Quotients must reduce to a whole number or one of the allowed denominators
+        g = np.gcd(p["a"], p["b"])
+        den = np.abs(p["b"]) // np.where(g == 0, 1, g)
+        mask = mask & ((p["op"] != "÷") | (den == 1) | np.isin(den, denoms))
+
+    if constraints.get("clean_fraction_results") and answer is not None:
+        den = np.asarray(answer.denominator)
+        mask = mask & (den >= 1) & (den <= 10)
+
+    if constraints.get("at_least_two_each") and answer is not None:
+        labels = np.asarray(answer)
+        mask = mask & ((labels == "equation").sum(axis=-1) >= 2) & ((labels == "expression").sum(axis=-1) >= 2)
+
+    if constraints.get("reasonable_unit_pairs") and "units_x" in p:
+        mask = mask & (p["units_x"] != p["units_y"])
+
+    return mask
+
+
+def check_constraints(template: Dict[str, Any], params: Dict[str, Any], answer: Any = None) -> bool:
+    """Scalar form of `constraint_mask` for a single item."""
+    return bool(constraint_mask(template, params, answer))
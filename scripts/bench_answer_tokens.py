@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Measure what answer tokens add to per-attempt latency.
+
+Times token issue, verify (signature, then marking the nonce used), answer
+key regeneration (an item cache hit) and grading in isolation, then full
+POST /attempts round trips through the test client for comparison. Tokens
+are single use, so every round trip answers a freshly fetched item.
+
+Run: python scripts/bench_answer_tokens.py [--n 20000]
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path so we can import our modules
+sys.path.append(str(Path(__file__).parent.parent))
+
+from api.routers.attempts import grade_with_token
+from services.answer_tokens import AnswerTokenSigner, answer_key
+from services.item_factory import ItemFactory
+
+
+TEMPLATES = ["6.8B_trapezoid_area", "6.9A_one_step", "6.7B_expr_vs_eq"]
+
+
+def per_call_us(n: int, fn) -> float:
+    """Run fn() n times and return microseconds per call."""
+    started = time.perf_counter()
+    for _ in range(n):
+        fn()
+    return (time.perf_counter() - started) / n * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--n", type=int, default=20000, help="iterations per micro-benchmark")
+    parser.add_argument("--requests", type=int, default=500, help="POST /attempts round trips")
+    args = parser.parse_args()
+
+    factory = ItemFactory()
+    signer = AnswerTokenSigner("bench-secret")
+    print(f"{'template':<24}{'issue us':>10}{'verify us':>11}{'key us':>8}{'grade us':>10}{'bytes':>7}")
+    for template_id in TEMPLATES:
+        item = factory.generate_item(template_id, 1234)
+        tokens = iter([signer.issue(item, template_id, "bench") for _ in range(args.n)])
+        claims = {**signer.verify(signer.issue(item, template_id, "bench")), **answer_key(item)}
+        response = claims["key"]
+        issue = per_call_us(args.n, lambda: signer.issue(item, template_id, "bench"))
+        verify = per_call_us(args.n, lambda: signer.consume(signer.verify(next(tokens), "bench")))
+        key = per_call_us(args.n, lambda: answer_key(factory.generate_item(template_id, 1234)))
+        grade = per_call_us(args.n, lambda: grade_with_token(claims, response))
+        token = signer.issue(item, template_id, "bench")
+        print(f"{template_id:<24}{issue:>10.1f}{verify:>11.1f}{key:>8.1f}{grade:>10.1f}{len(token):>7}")
+
+    from fastapi.testclient import TestClient
+    from api.main import app
+
+    with TestClient(app) as client:
+        latencies = []
+        for _ in range(args.requests):
+            body = client.get("/practice/next", params={"teks": "6.8B"}).json()
+            answer = factory.get_item(body["id"])["answer"]
+            attempt = {"item_id": body["id"], "user_response": answer, "token": body["token"]}
+            started = time.perf_counter()
+            client.post("/attempts", json=attempt)
+            latencies.append((time.perf_counter() - started) * 1e3)
+    latencies.sort()
+    print(f"POST /attempts: median {statistics.median(latencies):.2f} ms, "
+          f"p95 {latencies[int(len(latencies) * 0.95) - 1]:.2f} ms over {len(latencies)} requests")
+
+
+if __name__ == "__main__":
+    main()
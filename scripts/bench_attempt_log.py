@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Measure durable attempt logging throughput and mastery recovery time.
+
+1. attempts/sec through MasteryService.update_mastery with the attempt log on
+   and durable=True (each call waits for its group commit), across threads.
+2. Recovery of a log with --records attempts: full replay versus loading a
+   snapshot and replaying only a 1% tail.
+
+Run: python scripts/bench_attempt_log.py [--records 10000000] [--threads 16]
+"""
+
+import argparse
+import random
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+# Add parent directory to path so we can import our modules
+sys.path.append(str(Path(__file__).parent.parent))
+
+from services.attempt_log import AttemptLog
+from services.mastery import MasteryService
+
+
+SKILLS = ["6.2", "6.4", "6.7B", "6.8B", "6.9A"]
+
+
+def throughput(log_dir: Path, threads: int, per_thread: int, commit_interval: float) -> float:
+    log = AttemptLog(log_dir, commit_interval=commit_interval)
+    log.open()
+    service = MasteryService(log=log, snapshot_every=10**12)
+
+    def work(worker: int):
+        rng = random.Random(worker)
+        for _ in range(per_thread):
+            service.update_mastery(rng.choice(SKILLS), rng.random() < 0.7, learner_id=f"learner-{worker}")
+
+    started = time.perf_counter()
+    pool = [threading.Thread(target=work, args=(w,)) for w in range(threads)]
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    stats = log.stats()
+    log.close()
+    print(f"  {threads} threads, commit every {commit_interval * 1e3:.0f} ms: "
+          f"{threads * per_thread / elapsed:,.0f} attempts/sec durable, "
+          f"{stats['records_per_commit']:.1f} attempts per fsync")
+    return elapsed
+
+
+def fill_log(log_dir: Path, records: int, learners: int):
+    log = AttemptLog(log_dir, commit_interval=0.05)
+    log.open()
+    rng = random.Random(7)
+    base = time.time() - 30 * 86400
+    seq = -1
+    for i in range(records):
+        seq = log.append(f"learner-{rng.randrange(learners)}", rng.choice(SKILLS), rng.random() < 0.7, 2, base + i)
+    log.wait(seq)
+    log.close()
+
+
+def recover(log_dir: Path) -> float:
+    log = AttemptLog(log_dir)
+    started = time.perf_counter()
+    log.open()
+    result = MasteryService(log=log).recover()
+    elapsed = time.perf_counter() - started
+    log.close()
+    print(f"    snapshot at {result['snapshot_seq']:,}, replayed {result['replayed']:,} in {elapsed:.1f}s")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--records", type=int, default=10_000_000, help="attempts in the recovery log")
+    parser.add_argument("--learners", type=int, default=100_000)
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--per-thread", type=int, default=2000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        print("Durable write throughput")
+        for interval in (0.001, 0.005):
+            throughput(Path(tmp) / f"tp-{interval}", args.threads, args.per_thread, interval)
+
+        log_dir = Path(tmp) / "recovery"
+        started = time.perf_counter()
+        fill_log(log_dir, args.records, args.learners)
+        size = sum(p.stat().st_size for p in log_dir.iterdir())
+        print(f"Recovery at {args.records:,} logged attempts "
+              f"({size / 2**20:.0f} MB, written in {time.perf_counter() - started:.1f}s)")
+        print("  full replay:")
+        recover(log_dir)
+
+        # Snapshot everything but a 1% tail, as the periodic snapshotter would
+        log = AttemptLog(log_dir)
+        log.open()
+        service = MasteryService(log=log)
+        service.recover()
+        tail = max(1, args.records // 100)
+        service.snapshot()
+        rng = random.Random(11)
+        for _ in range(tail):
+            service.log.append(f"learner-{rng.randrange(args.learners)}", rng.choice(SKILLS), True, 2, time.time())
+        log.close()
+        print("  snapshot + tail:")
+        recover(log_dir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+Benchmark vectorized batch generation against the scalar generate_item path.
+
+Run: python scripts/bench_batch_generation.py [--n 100000]
+"""
+
+import argparse
+import time
+from pathlib import Path
+import sys
+
+# Add parent directory to path so we can import our modules
+sys.path.append(str(Path(__file__).parent.parent))
+
+from services.item_factory import ItemFactory
+
+
+TEMPLATES = ["6.8B_trapezoid_area", "6.2_rationals_ops", "6.4_unit_rate", "6.9A_one_step"]
+
+
+def rate(count: int, fn) -> float:
+    """Run fn() and return items per second."""
+    started = time.perf_counter()
+    fn()
+    return count / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--n", type=int, default=100_000, help="items per batch run")
+    parser.add_argument("--scalar-n", type=int, default=2_000, help="items per scalar run")
+    parser.add_argument("--materialize-n", type=int, default=5_000, help="items per materialized batch run")
+    args = parser.parse_args()
+
+    factory = ItemFactory()
+    print(f"{'template':<22} {'scalar/s':>12} {'batch dicts/s':>14} {'batch cols/s':>14} {'speedup':>9}")
+    for template_id in TEMPLATES:
+        scalar = rate(args.scalar_n, lambda: [factory.generate_item(template_id, s) for s in range(args.scalar_n)])
+        dicts = rate(args.materialize_n, lambda: factory.generate_batch(template_id, args.materialize_n, seed=1))
+        cols = rate(args.n, lambda: factory.generate_batch(template_id, args.n, seed=1, materialize=False))
+        print(f"{template_id:<22} {scalar:>12,.0f} {dicts:>14,.0f} {cols:>14,.0f} {cols / scalar:>8,.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Show that choosing an item's difficulty costs the same at any history length.
+
+For learners with 5 to 5,000 attempts on a skill, times reading the stored
+difficulty level (MasteryService.get_difficulty) next to the previous
+approach, which walked the learner's recent_performance list backwards on
+every request to count the current run.
+
+Run: python scripts/bench_difficulty.py [--reads 100000]
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path so we can import our modules
+sys.path.append(str(Path(__file__).parent.parent))
+
+from services.mastery import MasteryService
+
+
+def scan_difficulty(recent_performance):
+    # Previous implementation: count the trailing run on every call
+    last_result = recent_performance[-1]
+    consecutive = 1
+    for i in range(len(recent_performance) - 2, -1, -1):
+        if recent_performance[i] == last_result:
+            consecutive += 1
+        else:
+            break
+    if last_result and consecutive >= 3:
+        return 3
+    if not last_result and consecutive >= 2:
+        return 1
+    return 2
+
+
+def timed(count: int, fn) -> float:
+    started = time.perf_counter()
+    for _ in range(count):
+        fn()
+    return (time.perf_counter() - started) / count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--reads", type=int, default=100_000)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    service = MasteryService()
+    print(f"{'attempts':>10}  {'stored level':>12}  {'list scan':>12}")
+    for attempts in (5, 50, 500, 5000):
+        learner_id = f"learner-{attempts}"
+        # Mostly-correct history ending in a long run, the worst case for the scan
+        history = [rng.random() < 0.7 for _ in range(attempts // 2)] + [True] * (attempts - attempts // 2)
+        for correct in history:
+            service.update_mastery("6.8B", correct, learner_id=learner_id)
+        stored = timed(args.reads, lambda: service.get_difficulty("6.8B", learner_id))
+        scanned = timed(max(args.reads // 10, 1), lambda: scan_difficulty(history))
+        print(f"{attempts:>10,}  {stored * 1e6:10.2f}µs  {scanned * 1e6:10.2f}µs")
+
+
+if __name__ == "__main__":
+    main()
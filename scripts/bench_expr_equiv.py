@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Compare the numeric-probe tier with the sympy tier of expression equivalence.
+
+Times probe_equivalent and an uncached sympy check on 6.7B/6.9A-style
+expression pairs, then the full expressions_equivalent with warm caches.
+
+Run: python scripts/bench_expr_equiv.py [--n 2000]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path so we can import our modules
+sys.path.append(str(Path(__file__).parent.parent))
+
+from engines import expr_equiv
+
+
+PAIRS = [
+    ("4(x+3)", "4x + 12"),       # equivalent
+    ("4(x+3)", "4x + 3"),        # distributed only the first term
+    ("9m-4", "9*m - 4"),
+    ("9m-4", "4 - 9m"),
+    ("k/5", "0.2k"),
+    ("k/5", "5k"),
+    ("(y-5)*2", "2y - 10"),
+    ("2^3+7", "15"),
+    ("2^3+7", "13"),
+]
+
+
+def per_call_us(n: int, fn) -> float:
+    """Run fn() n times and return microseconds per call."""
+    started = time.perf_counter()
+    for _ in range(n):
+        fn()
+    return (time.perf_counter() - started) / n * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--n", type=int, default=2000, help="iterations for the cheap tiers")
+    parser.add_argument("--sympy-n", type=int, default=5, help="iterations for uncached sympy")
+    args = parser.parse_args()
+
+    import sympy as sp
+
+    def sympy_uncached(lhs: str, rhs: str) -> bool:
+        lhs, rhs = expr_equiv.normalize_expr(lhs), expr_equiv.normalize_expr(rhs)
+        return sp.simplify(sp.sympify(lhs) - sp.sympify(rhs)) == 0
+
+    print(f"{'pair':<28}{'equal':>6}{'probe us':>10}{'sympy us':>11}{'cached us':>11}")
+    for lhs, rhs in PAIRS:
+        probe = per_call_us(args.n, lambda: expr_equiv.probe_equivalent(lhs, rhs))
+        symbolic = per_call_us(args.sympy_n, lambda: sympy_uncached(lhs, rhs))
+        equal = expr_equiv.expressions_equivalent(lhs, rhs)
+        cached = per_call_us(args.n, lambda: expr_equiv.expressions_equivalent(lhs, rhs))
+        print(f"{lhs + ' vs ' + rhs:<28}{str(equal):>6}{probe:>10.1f}{symbolic:>11.0f}{cached:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Compare mastery throughput and progress-read latency of the storage backends.
+
+Several threads submit attempts through MasteryService (as request handlers
+do) against the in-memory columnar store and the SQLite WAL store, then
+/progress/me style reads (get_all_mastery) are timed. For SQLite the run
+ends with a flush, so the throughput includes committing every update.
+
+Run: python scripts/bench_mastery_backends.py [--attempts 100000] [--threads 8]
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+# Add parent directory to path so we can import our modules
+sys.path.append(str(Path(__file__).parent.parent))
+
+from services.mastery import MasteryService
+from services.sqlite_store import SqliteMasteryStore
+
+
+SKILLS = ["6.2", "6.4", "6.7B", "6.8B", "6.9A", "6.10A", "6.11", "6.12A"]
+
+
+def submit(service: MasteryService, attempts: int, threads: int, learners: int) -> float:
+    def worker(index: int):
+        rng = random.Random(index)
+        for _ in range(attempts // threads):
+            service.update_mastery(rng.choice(SKILLS), rng.random() < 0.7,
+                                   learner_id=f"learner-{rng.randrange(learners)}")
+
+    workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    started = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    service.store.flush()
+    return time.perf_counter() - started
+
+
+def read_latencies(service: MasteryService, reads: int, learners: int):
+    rng = random.Random(0)
+    latencies = []
+    for _ in range(reads):
+        learner = f"learner-{rng.randrange(learners)}"
+        started = time.perf_counter()
+        service.get_all_mastery(learner)
+        latencies.append(time.perf_counter() - started)
+    latencies.sort()
+    return statistics.median(latencies), latencies[int(len(latencies) * 0.99)]
+
+
+def run(name: str, service: MasteryService, args):
+    seconds = submit(service, args.attempts, args.threads, args.learners)
+    median, p99 = read_latencies(service, args.reads, args.learners)
+    print(f"  {name:<8} {args.attempts / seconds:10,.0f} attempts/s   "
+          f"progress read p50 {median * 1e6:7.1f} µs  p99 {p99 * 1e6:7.1f} µs")
+    return service
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--attempts", type=int, default=100_000)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--learners", type=int, default=10_000)
+    parser.add_argument("--reads", type=int, default=5_000)
+    args = parser.parse_args()
+
+    print(f"{args.attempts:,} attempts from {args.threads} threads over {args.learners:,} learners")
+    run("memory", MasteryService(), args)
+    with tempfile.TemporaryDirectory() as tmp:
+        store = SqliteMasteryStore(Path(tmp) / "mastery.db")
+        run("sqlite", MasteryService(store=store), args)
+        stats = store.stats()
+        print(f"    {stats['transactions']:,} transactions, "
+              f"{stats['rows_written'] / stats['transactions']:.0f} rows each "
+              f"({stats['writes']:,} cell writes coalesced)")
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
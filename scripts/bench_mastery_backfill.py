@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Measure the vectorized mastery backfill on a synthetic attempt history.
+
+Builds --attempts random attempts over --learners learners and the grade 6
+skills directly as arrays, in time order like the attempt log, then times
+backfill (sort, segmented EWMA, streaks, due dates) and the mastery-level
+count.
+
+Run: python scripts/bench_mastery_backfill.py [--attempts 20000000] [--learners 200000]
+"""
+
+import argparse
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+import numpy as np
+
+# Add parent directory to path so we can import our modules
+sys.path.append(str(Path(__file__).parent.parent))
+
+from services.mastery_backfill import AttemptHistory, backfill, mastery_levels
+
+
+SKILLS = ["6.2", "6.3", "6.4", "6.5", "6.6", "6.7B", "6.8B", "6.9A", "6.10A", "6.11", "6.12A", "6.13"]
+
+
+def synthetic_history(attempts: int, learners: int) -> AttemptHistory:
+    rng = np.random.default_rng(0)
+    start = time.time() - 180 * 86400
+    return AttemptHistory(
+        learner=rng.integers(0, learners, attempts),
+        skill=rng.integers(0, len(SKILLS), attempts),
+        answered_at=np.sort(start + rng.random(attempts) * 180 * 86400),  # Log order
+        correct=rng.random(attempts) < 0.7,
+        difficulty=rng.integers(1, 4, attempts, dtype=np.uint8),
+        learner_ids=[f"learner-{i}" for i in range(learners)],
+        skill_ids=SKILLS,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--attempts", type=int, default=20_000_000)
+    parser.add_argument("--learners", type=int, default=200_000)
+    parser.add_argument("--alpha", type=float, default=0.2)
+    parser.add_argument("--threshold", type=float, default=0.83)
+    args = parser.parse_args()
+
+    history = synthetic_history(args.attempts, args.learners)
+    started = time.perf_counter()
+    store = backfill(history, args.alpha, args.threshold)
+    elapsed = time.perf_counter() - started
+    print(f"{args.attempts:,} attempts -> {len(store):,} learner-skill cells in {elapsed:.1f}s "
+          f"({args.attempts / elapsed:,.0f} attempts/s)")
+
+    started = time.perf_counter()
+    levels = Counter(mastery_levels(store, args.threshold).ravel().tolist())
+    print(f"  levels in {time.perf_counter() - started:.2f}s: "
+          + ", ".join(f"{name} {count:,}" for name, count in sorted(levels.items())))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Compare memory of the columnar MasteryStore with one MasteryRecord per cell.
+
+Each learner has started a random --fill share of --skills skills, as real
+learners touch only part of the curriculum. Both layouts get the same
+started cells, and allocations are measured with tracemalloc: arrays plus
+id and row indexes for the store; dicts, dataclasses and datetimes for the
+record layout. Untouched cells cost nothing in either layout; the dense
+(learners x skills) columns of earlier versions are shown for reference.
+
+Run: python scripts/bench_mastery_memory.py [--learners 200000] [--skills 40] [--fill 0.25]
+"""
+
+import argparse
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+
+# Add parent directory to path so we can import our modules
+sys.path.append(str(Path(__file__).parent.parent))
+
+from services.mastery import MasteryRecord
+from services.mastery_store import COLUMNS, MasteryStore
+
+
+def started_cells(learners: int, skills: int, fill: float):
+    """(learner, skill) index pairs of the started cells, learner by learner."""
+    rng = np.random.default_rng(0)
+    started = rng.random((learners, skills)) < fill
+    return np.nonzero(started)
+
+
+def fill_records(cells, skill_ids):
+    now = datetime.now()
+    records = {}
+    for learner, skill in zip(*(codes.tolist() for codes in cells)):
+        teks = skill_ids[skill]
+        records.setdefault(f"learner-{learner}", {})[teks] = MasteryRecord(teks, 0.5, 3, now, now + timedelta(days=1))
+    return records
+
+
+def fill_store(cells, skill_ids):
+    learners, skills = cells
+    store = MasteryStore(skills=skill_ids)
+    now = int(time.time())
+    codes = store.learner_codes([f"learner-{i}" for i in range(int(learners.max()) + 1)])
+    rows = store.cell_rows(codes[learners], store.skill_codes(skill_ids)[skills])
+    store.columns["score"][rows] = 0.5
+    store.columns["attempts"][rows] = 3
+    store.columns["last_seen"][rows] = now
+    store.columns["due_review"][rows] = now + 86400
+    return store
+
+
+def measure(fill, *args):
+    tracemalloc.start()
+    started = time.perf_counter()
+    layout = fill(*args)
+    elapsed = time.perf_counter() - started
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return layout, current, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--learners", type=int, default=200_000)
+    parser.add_argument("--skills", type=int, default=40)
+    parser.add_argument("--fill", type=float, default=0.25, help="Share of skills each learner has started")
+    args = parser.parse_args()
+    skill_ids = [f"6.{i}" for i in range(args.skills)]
+    cells = started_cells(args.learners, args.skills, args.fill)
+    count = len(cells[0])
+
+    records, record_bytes, record_seconds = measure(fill_records, cells, skill_ids)
+    del records
+    store, store_bytes, store_seconds = measure(fill_store, cells, skill_ids)
+    dense_bytes = args.learners * args.skills * sum(dtype.itemsize for dtype in COLUMNS.values())
+
+    print(f"{args.learners:,} learners x {args.skills} skills, {args.fill:.0%} started = {count:,} learner-skill rows")
+    print(f"  dataclass records: {record_bytes / 2**20:8.1f} MB  ({record_bytes / count:6.1f} B/row, built in {record_seconds:.1f}s)")
+    print(f"  columnar store:    {store_bytes / 2**20:8.1f} MB  ({store_bytes / count:6.1f} B/row, built in {store_seconds:.1f}s)")
+    print(f"    of which columns {store.nbytes() / 2**20:.1f} MB, id and row indexes {(store_bytes - store.nbytes()) / 2**20:.1f} MB")
+    print(f"  dense columns would take {dense_bytes / 2**20:.1f} MB before any index")
+
+    started = time.perf_counter()
+    due = store.learners_due("6.8", int(time.time()) + 2 * 86400)
+    print(f"  learners due in 6.8: {len(due):,} in {(time.perf_counter() - started) * 1e3:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Show that mastery reads with forgetting-curve decay stay constant-time.
+
+For growing learner counts, fills a MasteryStore with old attempts (so every
+score has decayed) and times get_mastery, get_mastery_level and
+get_all_mastery for random learners. Decay is computed per read, so the
+latency should not grow with the number of (idle) learners.
+
+Run: python scripts/bench_mastery_reads.py [--max-learners 1000000] [--reads 20000]
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Add parent directory to path so we can import our modules
+sys.path.append(str(Path(__file__).parent.parent))
+
+from services.mastery import MasteryService
+from services.mastery_store import MasteryStore
+
+
+SKILLS = ["6.2", "6.4", "6.7B", "6.8B", "6.9A"]
+
+
+def filled_service(learners: int) -> MasteryService:
+    store = MasteryStore(initial_rows=learners * len(SKILLS), skills=SKILLS)
+    codes = store.learner_codes([f"learner-{i}" for i in range(learners)])
+    rows = store.cell_rows(np.repeat(codes, len(SKILLS)), np.tile(store.skill_codes(SKILLS), learners))
+    last_seen = int(time.time()) - 14 * 86400
+    store.columns["score"][rows] = 0.9
+    store.columns["attempts"][rows] = 20
+    store.columns["last_seen"][rows] = last_seen
+    return MasteryService(store=store)
+
+
+def per_read(fn, learners: int, reads: int) -> float:
+    rng = random.Random(0)
+    names = [f"learner-{rng.randrange(learners)}" for _ in range(reads)]
+    started = time.perf_counter()
+    for learner in names:
+        fn(learner)
+    return (time.perf_counter() - started) / reads
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--max-learners", type=int, default=1_000_000)
+    parser.add_argument("--reads", type=int, default=20_000)
+    args = parser.parse_args()
+
+    print(f"{'learners':>10}  {'get_mastery':>12}  {'level':>12}  {'all_mastery':>12}")
+    learners = 1_000
+    while learners <= args.max_learners:
+        service = filled_service(learners)
+        one = per_read(lambda learner: service.get_mastery("6.8B", learner), learners, args.reads)
+        level = per_read(lambda learner: service.get_mastery_level("6.8B", learner), learners, args.reads)
+        every = per_read(service.get_all_mastery, learners, args.reads)
+        print(f"{learners:>10,}  {one * 1e6:10.2f}µs  {level * 1e6:10.2f}µs  {every * 1e6:10.2f}µs")
+        learners *= 10
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Measure next-item recommendation latency with many learners practicing at once.
+
+--learners learners (10k by default) start with a random history across the
+catalog. --threads client threads then cycle through the learners so that
+each one answers an item every --think seconds: fetch the next
+recommendation, then answer it (one mastery update, which queues the
+learner for the recommender's background worker). Reports the latency
+of Recommender.next (percentiles, hit rate) and the worker's compute cost
+per learner, next to computing the recommendation inline on every request
+(Recommender.recommend) as the previous per-request logic would.
+
+Run: python scripts/bench_recommender.py [--learners 10000] [--threads 8] [--think 10]
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import threading
+import time
+from pathlib import Path
+
+# Add parent directory to path so we can import our modules
+sys.path.append(str(Path(__file__).parent.parent))
+
+from services.curriculum import CurriculumService
+from services.item_factory import ItemFactory
+from services.mastery import MasteryService
+from services.recommender import Recommender
+from services.review_calendar import ReviewCalendar
+
+
+def percentile(values, q):
+    return statistics.quantiles(values, n=100)[q - 1] if len(values) > 1 else values[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--learners", type=int, default=10_000)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--think", type=float, default=10.0, help="Seconds each learner takes per item")
+    parser.add_argument("--history", type=int, default=20, help="Attempts per learner before timing")
+    args = parser.parse_args()
+
+    mastery = MasteryService()
+    curriculum = CurriculumService(mastery)
+    calendar = ReviewCalendar(sweep_interval=None)
+    recommender = Recommender(mastery, curriculum, ItemFactory(), calendar)
+    for listener in (calendar.on_mastery_change, curriculum.on_mastery_change, recommender.on_mastery_change):
+        mastery.add_listener(listener)
+
+    rng = random.Random(0)
+    learners = [f"learner-{i}" for i in range(args.learners)]
+    skills = curriculum.get_skill_sequence()
+    started = time.perf_counter()
+    for learner_id in learners:
+        for _ in range(args.history):
+            mastery.update_mastery(rng.choice(skills), rng.random() < 0.7, learner_id=learner_id)
+    print(f"{args.learners:,} learners x {args.history} attempts loaded in {time.perf_counter() - started:.1f}s")
+
+    # Precompute everyone once, as the worker would have after their last attempts
+    recommender.start()
+    while recommender.stats()["pending"]:
+        time.sleep(0.05)
+    baseline = recommender.stats()
+
+    latencies = [[] for _ in range(args.threads)]
+    attempts = [0] * args.threads
+    stop = threading.Event()
+
+    def client(n: int):
+        local = random.Random(n)
+        mine = learners[n::args.threads]
+        interval = args.think / len(mine)
+        due = time.perf_counter()
+        i = 0
+        while not stop.is_set():
+            due += interval
+            time.sleep(max(due - time.perf_counter(), 0))
+            learner_id = mine[i % len(mine)]
+            i += 1
+            t0 = time.perf_counter()
+            slot = recommender.next(learner_id)
+            latencies[n].append(time.perf_counter() - t0)
+            mastery.update_mastery(slot.teks, local.random() < 0.7, slot.difficulty, learner_id)
+            attempts[n] += 1
+
+    threads = [threading.Thread(target=client, args=(n,)) for n in range(args.threads)]
+    for thread in threads:
+        thread.start()
+    time.sleep(args.seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    recommender.stop()
+
+    stats = recommender.stats()
+    all_latencies = sorted(value for values in latencies for value in values)
+    hits = stats["hits"] - baseline["hits"]
+    misses = stats["misses"] - baseline["misses"]
+    print(f"{sum(attempts):,} next+attempt rounds in {args.seconds:.0f}s on {args.threads} threads, "
+          f"{args.think:.0f}s per item "
+          f"({sum(attempts) / args.seconds:,.0f}/s); hit rate {hits / max(hits + misses, 1):.1%}")
+    print(f"  Recommender.next      p50 {percentile(all_latencies, 50) * 1e6:8.1f} µs   "
+          f"p99 {percentile(all_latencies, 99) * 1e6:8.1f} µs   max {all_latencies[-1] * 1e6:8.1f} µs")
+    print(f"  worker compute        {stats['compute_seconds_per_learner'] * 1e6:8.1f} µs/learner "
+          f"({stats['computed']:,} recomputations)")
+
+    sample = [rng.choice(learners) for _ in range(2000)]
+    inline = []
+    for learner_id in sample:
+        t0 = time.perf_counter()
+        recommender.recommend(learner_id)
+        inline.append(time.perf_counter() - t0)
+    inline.sort()
+    print(f"  inline recommend      p50 {percentile(inline, 50) * 1e6:8.1f} µs   "
+          f"p99 {percentile(inline, 99) * 1e6:8.1f} µs   (single thread, no contention)")
+
+
+if __name__ == "__main__":
+    main()
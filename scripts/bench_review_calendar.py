@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Show that the review calendar's "who needs review" pass scales with due work.
+
+For growing learner counts, every learner has reviews scheduled over the
+next 30 days in each skill, except that a fixed --due reviews come due in
+the swept hour. Times the hourly sweep plus ready_learners and a learner's
+ready_skills, next to the previous approach: a due-review mask over the
+store's rows for every skill, and get_skills_needing_review per learner.
+
+Run: python scripts/bench_review_calendar.py [--max-learners 1000000] [--due 1000]
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Add parent directory to path so we can import our modules
+sys.path.append(str(Path(__file__).parent.parent))
+
+from services.mastery import MasteryService
+from services.mastery_store import MasteryStore
+from services.review_calendar import ReviewCalendar
+
+
+SKILLS = ["6.2", "6.4", "6.7B", "6.8B", "6.9A"]
+HOUR = 3600
+
+
+def populate(learners: int, due: int, now: int, clock):
+    rng = np.random.default_rng(0)
+    store = MasteryStore(initial_rows=learners * len(SKILLS), skills=SKILLS)
+    codes = store.learner_codes([f"learner-{i}" for i in range(learners)])
+    rows = store.cell_rows(np.repeat(codes, len(SKILLS)), np.tile(store.skill_codes(SKILLS), learners))
+    store.columns["attempts"][rows] = 5
+    store.columns["due_review"][rows] = now + HOUR + rng.integers(0, 30 * 86400, len(rows))
+    picked = rng.choice(rows, size=due, replace=False)
+    store.columns["due_review"][picked] = now - rng.integers(1, HOUR, due)
+    calendar = ReviewCalendar(sweep_interval=None, clock=clock)
+    calendar.load(store.scheduled_reviews())
+    return store, calendar
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--max-learners", type=int, default=1_000_000)
+    parser.add_argument("--due", type=int, default=1000)
+    args = parser.parse_args()
+
+    print(f"{'learners':>10}  {'sweep+ready':>12}  {'ready_skills':>12}  {'column scans':>12}  {'per learner':>12}")
+    learners = 10_000
+    while learners <= args.max_learners:
+        now = int(time.time()) // HOUR * HOUR + HOUR // 2
+        clock = [now - 2 * HOUR]  # Loaded before the due reviews come due
+        store, calendar = populate(learners, args.due, now, lambda: clock[0])
+        clock[0] = now
+        started = time.perf_counter()
+        calendar.sweep()
+        ready = calendar.ready_learners()
+        sweep = time.perf_counter() - started
+        started = time.perf_counter()
+        for learner in ready[:100]:
+            calendar.ready_skills(learner)
+        per_fetch = (time.perf_counter() - started) / min(100, len(ready))
+
+        service = MasteryService(store=store)
+        started = time.perf_counter()
+        for teks in SKILLS:
+            store.learners_due(teks, now)
+        scans = time.perf_counter() - started
+        sample = random.Random(0).sample(store.learner_ids, 1000)
+        started = time.perf_counter()
+        for learner in sample:
+            service.get_skills_needing_review(learner)
+        per_learner = (time.perf_counter() - started) / len(sample) * learners
+
+        print(f"{learners:>10,}  {sweep * 1e3:10.1f}ms  {per_fetch * 1e6:10.1f}µs  "
+              f"{scans * 1e3:10.1f}ms  {per_learner * 1e3:10.1f}ms")
+        learners *= 10
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Measure SpacedReviewService operations with a large review schedule.
+
+Schedules --reviews items (half of them already due) and times scheduling,
+get_due_reviews, mark_reviewed (reschedule), get_reviews_for_skill, a
+one-day range query and due-pops. For comparison, the previous flat-list
+implementation's get_due_reviews and mark_reviewed are timed on the same
+items.
+
+Run: python scripts/bench_spaced_review.py [--reviews 1000000]
+"""
+
+import argparse
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add parent directory to path so we can import our modules
+sys.path.append(str(Path(__file__).parent.parent))
+
+from services.spaced_review import SpacedReviewService
+
+
+SKILLS = [f"6.{n}" for n in range(2, 14)]
+
+
+def timed(label: str, count: int, fn):
+    started = time.perf_counter()
+    for _ in range(count):
+        fn()
+    per_call = (time.perf_counter() - started) / count
+    print(f"  {label:<34} {per_call * 1e6:12.1f} µs/call")
+
+
+def list_get_due(items, now, limit=10):
+    # Flat-list implementation: scan and sort every call
+    due = [item for item in items if item.due_at <= now]
+    due.sort(key=lambda x: x.priority)
+    return due[:limit]
+
+
+def list_mark_reviewed(items, item_id):
+    for i, item in enumerate(items):
+        if item.item_id == item_id:
+            del items[i]
+            break
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--reviews", type=int, default=1_000_000)
+    parser.add_argument("--ops", type=int, default=10_000)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    now = datetime.now()
+    service = SpacedReviewService()
+    started = time.perf_counter()
+    for i in range(args.reviews):
+        service.schedule_review(rng.choice(SKILLS), f"item-{i}", rng.random(),
+                                now - timedelta(days=rng.uniform(-30, 30)))
+    elapsed = time.perf_counter() - started
+    print(f"{args.reviews:,} reviews scheduled in {elapsed:.1f}s ({elapsed / args.reviews * 1e6:.1f} µs each)")
+
+    ids = [f"item-{rng.randrange(args.reviews)}" for _ in range(args.ops)]
+    timed("get_due_reviews(10)", args.ops, service.get_due_reviews)
+    it = iter(ids)
+    timed("mark_reviewed (reschedule)", args.ops, lambda: service.mark_reviewed(next(it), rng.random() < 0.8))
+    skill = service.get_reviews_for_skill("6.8")
+    timed(f"get_reviews_for_skill ({len(skill):,} items)", 20, lambda: service.get_reviews_for_skill("6.8"))
+    window = (now + timedelta(days=3), now + timedelta(days=4))
+    in_window = service.get_reviews_between(*window)
+    timed(f"get_reviews_between ({len(in_window):,} items)", 20, lambda: service.get_reviews_between(*window))
+    timed("pop_due_reviews(10)", args.ops, service.pop_due_reviews)
+
+    items = list(service.store.all())
+    print(f"flat list, {len(items):,} items:")
+    timed("get_due_reviews(10)", 5, lambda: list_get_due(items, now))
+    it = iter(ids)
+    timed("mark_reviewed", 5, lambda: list_mark_reviewed(items, next(it)))
+
+
+if __name__ == "__main__":
+    main()
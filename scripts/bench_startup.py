@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Measure API cold start: import time per module and time to the first /health.
+
+Each measurement runs in a fresh interpreter. With --budget, exits non-zero
+when time-to-first-/health exceeds the budget, so CI can catch regressions.
+
+Run: python scripts/bench_startup.py [--runs 5] [--budget 1.5]
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict
+
+ROOT = Path(__file__).parent.parent
+
+# Modules worth tracking individually; anything eagerly importing sympy shows up here
+WATCHED = ("api", "engines", "services", "fastapi", "pydantic", "numpy", "sympy")
+
+# The with block runs the app lifespan (recovery, sandbox prefork, pool and
+# watcher start) like a server would before taking requests; the time is
+# printed before shutdown so stopping the background threads is not counted
+FIRST_HEALTH = """
+import time
+from fastapi.testclient import TestClient
+from api.main import app
+with TestClient(app) as client:
+    assert client.get("/health").status_code == 200
+    print("first-health", time.time())
+"""
+
+
+def import_times() -> Dict[str, float]:
+    """Cumulative import time (ms) per watched module from `python -X importtime`."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import api.main"],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    times: Dict[str, float] = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        name = name.strip()
+        if name.split(".")[0] in WATCHED and cumulative.strip().isdigit():
+            times[name] = int(cumulative) / 1000
+    return times
+
+
+def time_to_first_health() -> float:
+    """Seconds from interpreter launch to a successful GET /health."""
+    started = time.time()
+    proc = subprocess.run([sys.executable, "-c", FIRST_HEALTH], cwd=ROOT, check=True, capture_output=True, text=True)
+    stamp = next(line for line in proc.stdout.splitlines() if line.startswith("first-health "))
+    return float(stamp.split()[1]) - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description="API cold-start benchmark")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15, help="slowest modules to list")
+    parser.add_argument("--budget", type=float, help="fail if median time-to-first-/health exceeds this (s)")
+    args = parser.parse_args()
+
+    times = import_times()
+    print(f"{'module':<40} {'cumulative ms':>14}")
+    for name, ms in sorted(times.items(), key=lambda kv: kv[1], reverse=True)[:args.top]:
+        print(f"{name:<40} {ms:>14.1f}")
+    print(f"sympy imported at startup: {'yes' if 'sympy' in times else 'no'}")
+
+    samples = [time_to_first_health() for _ in range(args.runs)]
+    median = statistics.median(samples)
+    print(f"time to first /health: median {median * 1000:.0f} ms, "
+          f"min {min(samples) * 1000:.0f} ms, max {max(samples) * 1000:.0f} ms ({args.runs} runs)")
+
+    if args.budget is not None and median > args.budget:
+        print(f"FAIL: exceeds budget of {args.budget * 1000:.0f} ms")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
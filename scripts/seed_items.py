@@ -1,13 +1,34 @@
 #!/usr/bin/env python3
 """
-Seed script to generate a batch of items for testing and caching.
+Bulk-generate items for pre-caching, streamed as NDJSON.
+
+Templates x seed ranges are split into shards and generated across a process
+pool. Each finished shard is appended to the output (as its own complete
+gzip member if the name ends in .gz) and recorded, with the output size
+after it, in `<output>.progress`. --resume cuts the output back to the last
+recorded size, dropping a shard that was half written when the run stopped,
+and continues from there. Only a bounded number of shards is in flight at once.
+
+With --dedupe, items are deduplicated within each template (signatures
+include the template id, so items of different templates never collide).
+Shards run in template order and a template's signature set is dropped once
+its last shard is written, so memory is bounded by the unique items of the
+templates in flight (about 100 bytes per item), not by the whole run. A
+resumed run reloads signatures only for templates with shards left.
+
+Run: python scripts/seed_items.py --count 100000 --output generated_items/items.ndjson.gz
 """
 
+import argparse
+import gzip
+import hashlib
 import json
-import random
-from pathlib import Path
-import sys
 import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path
+from typing import Dict, IO, Iterator, List, Set, Tuple
 
 # Add parent directory to path so we can import our modules
 sys.path.append(str(Path(__file__).parent.parent))
@@ -15,54 +36,188 @@ sys.path.append(str(Path(__file__).parent.parent))
 from services.item_factory import ItemFactory
 
 
-def generate_items_batch(template_id: str, count: int = 50) -> list:
-    """Generate a batch of items from a template."""
-    factory = ItemFactory()
-    items = []
-    
-    for i in range(count):
+Shard = Tuple[str, int, int]  # (template_id, first seed, end seed exclusive)
+
+_factory: ItemFactory | None = None
+
+
+def _init_worker(templates_dir: str):
+    global _factory
+    # Every seed is new, so keep the per-worker item cache minimal
+    _factory = ItemFactory(templates_dir, cache_size=1)
+
+
+def generate_shard(shard: Shard) -> Tuple[Shard, List[Tuple[bytes, str]], int]:
+    """Generate one shard; returns (shard, [(signature, ndjson line)], error count)."""
+    template_id, start, end = shard
+    lines = []
+    errors = 0
+    for seed in range(start, end):
         try:
-            seed = random.randint(1000, 9999)
-            item = factory.generate_item(template_id, seed)
-            items.append(item)
-            print(f"Generated item {i+1}/{count} for {template_id}")
-        except Exception as e:
-            print(f"Error generating item {i+1} for {template_id}: {e}")
+            item = _factory.generate_item(template_id, seed)
+        except Exception:
+            errors += 1
             continue
-    
-    return items
+        lines.append((param_signature(template_id, item["params"]), json.dumps(item, default=str)))
+    return shard, lines, errors
+
+
+def param_signature(template_id: str, params: Dict) -> bytes:
+    """Compact digest identifying an item by its template and parameters."""
+    payload = json.dumps([template_id, params], sort_keys=True, default=str).encode()
+    return hashlib.blake2b(payload, digest_size=12).digest()
+
+
+def plan_shards(template_ids: List[str], start_seed: int, count: int, shard_size: int) -> Iterator[Shard]:
+    for template_id in template_ids:
+        for first in range(start_seed, start_seed + count, shard_size):
+            yield (template_id, first, min(first + shard_size, start_seed + count))
+
+
+def open_output(path: Path, append: bool, size: int | None = None) -> IO[bytes]:
+    """Open the output for binary appends; when resuming, cut it back to `size` bytes first."""
+    if not append:
+        return open(path, "wb")
+    out = open(path, "ab")
+    if size is not None:
+        out.truncate(size)
+    return out
+
+
+def encode_shard(lines: List[str], compress: bool) -> bytes:
+    """NDJSON bytes of a shard; compressed into one complete gzip member if requested."""
+    data = "".join(line + "\n" for line in lines).encode("utf-8")
+    return gzip.compress(data) if compress else data
+
+
+def load_progress(progress_path: Path) -> Tuple[Set[Shard], int | None]:
+    """Shards recorded as done, and the output size after the last of them."""
+    done: Set[Shard] = set()
+    size = None
+    if progress_path.exists():
+        for line in progress_path.read_text().splitlines():
+            fields = line.split()
+            if len(fields) != 4:
+                continue  # Cut off mid-write
+            template_id, start, end, offset = fields
+            done.add((template_id, int(start), int(end)))
+            size = int(offset)
+    return done, size
+
+
+class TemplateDedupe:
+    """Signature sets per template, each dropped once its template's last shard is written."""
+
+    def __init__(self, shards: List[Shard]):
+        self.remaining: Dict[str, int] = {}
+        for template_id, _, _ in shards:
+            self.remaining[template_id] = self.remaining.get(template_id, 0) + 1
+        self.seen: Dict[str, Set[bytes]] = {}
+
+    def for_shard(self, shard: Shard) -> Set[bytes]:
+        return self.seen.setdefault(shard[0], set())
+
+    def shard_written(self, shard: Shard):
+        self.remaining[shard[0]] -= 1
+        if not self.remaining[shard[0]]:
+            self.seen.pop(shard[0], None)
+
+    def load(self, path: Path):
+        """Rebuild the sets of templates with shards left from an existing output file."""
+        opener = gzip.open if path.suffix == ".gz" else open
+        # open_output has already cut any half-written shard, so every member is complete
+        with opener(path, "rt", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    item = json.loads(line)
+                    template_id = item["id"].split("_", 2)[2].rsplit("_", 1)[0]
+                    if self.remaining.get(template_id):
+                        self.seen.setdefault(template_id, set()).add(param_signature(template_id, item["params"]))
 
 
 def main():
-    """Generate items for all templates."""
-    # Create output directory
-    output_dir = Path("generated_items")
-    output_dir.mkdir(exist_ok=True)
-    
-    # Templates to generate
-    templates = [
-        "6.2_rationals_ops",
-        "6.4_unit_rate", 
-        "6.7B_expr_vs_eq",
-        "6.8B_trapezoid_area",
-        "6.9A_one_step"
-    ]
-    
-    items_per_template = 20  # Generate 20 items per template
-    
-    for template_id in templates:
-        print(f"\nGenerating items for {template_id}...")
-        items = generate_items_batch(template_id, items_per_template)
-        
-        # Save to file
-        output_file = output_dir / f"{template_id}_items.json"
-        with open(output_file, 'w') as f:
-            json.dump(items, f, indent=2, default=str)
-        
-        print(f"Saved {len(items)} items to {output_file}")
-    
-    print(f"\nGenerated items saved to {output_dir}/")
-    print("Total items generated:", sum(len(generate_items_batch(t, 1)) for t in templates))
+    parser = argparse.ArgumentParser(description="Bulk-generate items as NDJSON")
+    parser.add_argument("--templates", nargs="*", help="template ids (default: all)")
+    parser.add_argument("--templates-dir", default="content/templates")
+    parser.add_argument("--count", type=int, default=300, help="seeds per template")
+    parser.add_argument("--start-seed", type=int, default=1000)
+    parser.add_argument("--shard-size", type=int, default=2000, help="seeds per work unit")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--output", default="generated_items/items.ndjson.gz")
+    parser.add_argument("--resume", action="store_true", help="skip shards already recorded as done")
+    parser.add_argument("--dedupe", action="store_true", help="drop items whose params were already emitted")
+    args = parser.parse_args()
+
+    template_ids = args.templates or sorted(ItemFactory(args.templates_dir).templates_cache)
+    output = Path(args.output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    progress_path = output.with_name(output.name + ".progress")
+
+    done, size = load_progress(progress_path) if args.resume else (set(), None)
+    append = args.resume and output.exists()
+    if not append:
+        done, size = set(), None  # Nothing to continue without the output
+    if not args.resume:
+        progress_path.unlink(missing_ok=True)
+    compress = output.suffix == ".gz"
+    shards = [s for s in plan_shards(template_ids, args.start_seed, args.count, args.shard_size) if s not in done]
+    dedupe = TemplateDedupe(shards) if args.dedupe else None
+
+    written = duplicates = errors = 0
+    started = time.perf_counter()
+    max_in_flight = max(1, args.workers) * 2
+    with open_output(output, append, size or 0) as out, open(progress_path, "a") as progress, \
+            ProcessPoolExecutor(args.workers, initializer=_init_worker, initargs=(args.templates_dir,)) as pool:
+        if dedupe is not None and append:
+            dedupe.load(output)
+        pending = set()
+        for shard in shards:
+            pending.add(pool.submit(generate_shard, shard))
+            if len(pending) < max_in_flight:
+                continue
+            finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                w, d, e = _write_shard(future.result(), out, progress, dedupe, compress)
+                written, duplicates, errors = written + w, duplicates + d, errors + e
+            _report(written, duplicates, errors, started)
+        for future in wait(pending).done:
+            w, d, e = _write_shard(future.result(), out, progress, dedupe, compress)
+            written, duplicates, errors = written + w, duplicates + d, errors + e
+
+    elapsed = time.perf_counter() - started
+    print(f"Wrote {written:,} items to {output} in {elapsed:.1f}s "
+          f"({written / elapsed if elapsed else 0:,.0f} items/sec); "
+          f"{duplicates:,} duplicates dropped, {errors:,} errors", file=sys.stderr)
+
+
+def _write_shard(result, out: IO[bytes], progress: IO[str], dedupe: TemplateDedupe | None,
+                 compress: bool) -> Tuple[int, int, int]:
+    shard, lines, errors = result
+    seen = dedupe.for_shard(shard) if dedupe is not None else None
+    kept = []
+    duplicates = 0
+    for signature, line in lines:
+        if seen is not None:
+            if signature in seen:
+                duplicates += 1
+                continue
+            seen.add(signature)
+        kept.append(line)
+    out.write(encode_shard(kept, compress))
+    out.flush()
+    # Record the shard only once its bytes (a whole gzip member) are flushed, with the
+    # size to cut back to, so --resume neither skips lost work nor keeps a partial shard
+    progress.write(f"{shard[0]} {shard[1]} {shard[2]} {out.tell()}\n")
+    progress.flush()
+    if dedupe is not None:
+        dedupe.shard_written(shard)
+    return len(kept), duplicates, errors
+
+
+def _report(written: int, duplicates: int, errors: int, started: float):
+    elapsed = time.perf_counter() - started
+    print(f"  {written:,} items ({written / elapsed if elapsed else 0:,.0f}/sec), "
+          f"{duplicates:,} duplicates, {errors:,} errors", file=sys.stderr, end="\r")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,161 @@
+import base64
+import hashlib
+import heapq
+import hmac
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, List, Set, Tuple
+
+
+# Truncated HMAC-SHA256 tag; 128 bits is plenty for short-lived item references
+TAG_BYTES = 16
+NONCE_BYTES = 12
+
+
+class InvalidAnswerToken(ValueError):
+    """Raised when a token is malformed, tampered with, expired, foreign or reused."""
+
+
+class AnswerTokenSigner:
+    """Issues and verifies HMAC-signed, single-use answer tokens.
+
+    A token names the item it was issued for (template id, seed, TEKS,
+    difficulty, item type), the learner it was issued to and a random nonce.
+    It is `<base64url json>.<base64url tag>` and carries no answer key: the
+    server regenerates the item from (template_id, seed, difficulty) when
+    grading, so a client that decodes the token learns nothing it could
+    answer with.
+
+    `consume` records a token's nonce so each token grades one attempt;
+    `release` gives it back when the attempt failed after all.
+    Nonces are kept until the token would have expired anyway, or at most
+    `max_seen` of them; tokens issued before the oldest forgotten nonce are
+    then refused. The seen set is per process, like a generated secret.
+    """
+
+    def __init__(self, secret: bytes | str | None = None, max_age_seconds: int | None = None,
+                 max_seen: int = 1_000_000):
+        if isinstance(secret, str):
+            secret = secret.encode()
+        # Without a configured secret, tokens only verify within this process
+        self._secret = secret or os.urandom(32)
+        self.max_age_seconds = max_age_seconds
+        self.max_seen = max_seen
+        self._lock = threading.Lock()
+        self._seen: Set[str] = set()
+        self._seen_order: List[Tuple[int, str]] = []  # Heap of (issued_at, nonce)
+        self._forgotten_before = float("-inf")  # Newest issued_at dropped from the seen set
+
+    def issue(self, item: Dict[str, Any], template_id: str, learner_id: str) -> str:
+        """Sign a reference to a generated item for one learner."""
+        payload = [
+            template_id,
+            item.get("seed"),
+            item["teks"],
+            item.get("difficulty", 2),
+            item["type"],
+            learner_id,
+            _b64encode(os.urandom(NONCE_BYTES)),
+            int(time.time()),
+        ]
+        body = _b64encode(json.dumps(payload, separators=(",", ":")).encode())
+        return f"{body}.{_b64encode(self._tag(body))}"
+
+    def verify(self, token: str, learner_id: str | None = None) -> Dict[str, Any]:
+        """Check the signature, age and learner and return the decoded claims.
+
+        Does not mark the token used; call `consume` once the attempt is accepted.
+        """
+        body, sep, tag = token.partition(".")
+        if not sep:
+            raise InvalidAnswerToken("Malformed answer token")
+        try:
+            valid = hmac.compare_digest(_b64decode(tag), self._tag(body))
+        except ValueError:
+            valid = False
+        if not valid:
+            raise InvalidAnswerToken("Answer token signature mismatch")
+
+        try:
+            (template_id, seed, teks, difficulty, item_type, token_learner, nonce,
+             issued_at) = json.loads(_b64decode(body))
+        except ValueError as e:
+            raise InvalidAnswerToken("Malformed answer token") from e
+        if self.max_age_seconds is not None and time.time() - issued_at > self.max_age_seconds:
+            raise InvalidAnswerToken("Answer token expired")
+        if learner_id is not None and token_learner != learner_id:
+            raise InvalidAnswerToken("Answer token was issued to another learner")
+
+        return {
+            "template_id": template_id,
+            "seed": seed,
+            "teks": teks,
+            "difficulty": difficulty,
+            "type": item_type,
+            "learner_id": token_learner,
+            "nonce": nonce,
+            "issued_at": issued_at,
+        }
+
+    def consume(self, claims: Dict[str, Any]):
+        """Mark verified claims used; raises InvalidAnswerToken if they already were."""
+        nonce, issued_at = claims["nonce"], claims["issued_at"]
+        with self._lock:
+            self._forget_expired()
+            if issued_at <= self._forgotten_before:
+                raise InvalidAnswerToken("Answer token too old to check for reuse")
+            if nonce in self._seen:
+                raise InvalidAnswerToken("Answer token already used")
+            self._seen.add(nonce)
+            heapq.heappush(self._seen_order, (issued_at, nonce))
+            while len(self._seen) > self.max_seen:
+                self._forget_oldest()
+
+    def release(self, claims: Dict[str, Any]):
+        """Undo `consume` for an attempt that failed after its token was used, so it can be retried."""
+        with self._lock:
+            self._seen.discard(claims["nonce"])
+
+    def _forget_expired(self):
+        # Caller holds self._lock; expired tokens fail verify() before reaching here
+        if self.max_age_seconds is None:
+            return
+        cutoff = time.time() - self.max_age_seconds
+        while self._seen_order and self._seen_order[0][0] < cutoff:
+            self._forget_oldest()
+
+    def _forget_oldest(self):
+        issued_at, nonce = heapq.heappop(self._seen_order)
+        self._seen.discard(nonce)
+        self._forgotten_before = max(self._forgotten_before, issued_at)
+
+    def _tag(self, body: str) -> bytes:
+        return hmac.new(self._secret, body.encode(), hashlib.sha256).digest()[:TAG_BYTES]
+
+
+def answer_key(item: Dict[str, Any]) -> Dict[str, Any]:
+    """Grading data of a (regenerated) item: key, form, tolerance and units.
+
+    MC items use their correct option values as the key.
+    """
+    answer_format = item.get("answer_format") or {}
+    if item["type"] == "mc":
+        key = [opt["value"] for opt in item.get("options") or [] if opt.get("correct")]
+    else:
+        key = item["answer"]
+    return {
+        "key": key,
+        "form": answer_format.get("form"),
+        "tolerance": answer_format.get("tolerance", 0),
+        "units": answer_format.get("units"),
+    }
+
+
+def _b64encode(raw: bytes) -> str:
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def _b64decode(text: str) -> bytes:
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
@@ -0,0 +1,248 @@
+import os
+import struct
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Iterator, List, NamedTuple, Tuple
+
+
+# Record: crc32 of the body, then body = learner length | teks length | answered_at |
+# correct | difficulty, followed by the learner id and teks bytes
+_CRC = struct.Struct("<I")
+_BODY = struct.Struct("<HBdBB")
+_HEADER_SIZE = _CRC.size + _BODY.size
+SEGMENT_PREFIX = "attempts-"
+SEGMENT_SUFFIX = ".log"
+
+
+class LoggedAttempt(NamedTuple):
+    seq: int
+    learner_id: str
+    teks: str
+    correct: bool
+    difficulty: int
+    answered_at: float  # Epoch seconds
+
+
+class _Rotate(NamedTuple):
+    seq: int  # First sequence number of the new segment
+
+
+class AttemptLog:
+    """Append-only attempt log in local segment files with group commit.
+
+    `append` only encodes the record into a buffer and returns its sequence
+    number. A writer thread flushes the buffer every `commit_interval`
+    seconds with one write and one fsync for the whole group. `wait(seq)`
+    blocks until that record is durable, so many concurrent attempts share
+    each fsync. Segments are named by their first sequence number. Each
+    record carries a CRC, so a torn tail left by a crash is cut off on open.
+    """
+
+    def __init__(self, log_dir: str | Path, commit_interval: float = 0.005,
+                 segment_bytes: int = 64 * 1024 * 1024, fsync: bool = True):
+        self.log_dir = Path(log_dir)
+        self.log_dir.mkdir(parents=True, exist_ok=True)
+        self.commit_interval = commit_interval
+        self.segment_bytes = segment_bytes
+        self.fsync = fsync
+        self._lock = threading.Lock()
+        self._appended = threading.Condition(self._lock)
+        self._durable = threading.Condition(self._lock)
+        self._buffer: List[Tuple[int, bytes] | _Rotate] = []
+        self._next_seq = 0
+        self._durable_seq = -1
+        self._file = None
+        self._segment_start = 0
+        self._writer: threading.Thread | None = None
+        self._running = False
+        self._stats = {"commits": 0, "records": 0, "bytes": 0}
+
+    @property
+    def next_seq(self) -> int:
+        return self._next_seq
+
+    def open(self):
+        """Find the end of the log (cutting any torn tail) and start the writer."""
+        segments = self.segments()
+        if segments:
+            start, path = segments[-1]
+            count, valid_bytes = _scan(path)
+            with open(path, "r+b") as f:
+                f.truncate(valid_bytes)
+            self._segment_start = start
+            self._next_seq = start + count
+        self._durable_seq = self._next_seq - 1
+        self._file = open(self._segment_path(self._segment_start), "ab")
+        self._running = True
+        self._writer = threading.Thread(target=self._run, name="attempt-log-writer", daemon=True)
+        self._writer.start()
+
+    def close(self):
+        """Flush everything still buffered and stop the writer."""
+        with self._lock:
+            self._running = False
+            self._appended.notify_all()
+        if self._writer is not None:
+            self._writer.join()
+            self._writer = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def append(self, learner_id: str, teks: str, correct: bool, difficulty: int, answered_at: float) -> int:
+        """Buffer one attempt; returns its sequence number (see wait)."""
+        record = encode(learner_id, teks, correct, difficulty, answered_at)
+        with self._lock:
+            seq = self._next_seq
+            self._next_seq += 1
+            self._buffer.append((seq, record))
+            self._appended.notify()
+        return seq
+
+    def wait(self, seq: int, timeout: float | None = None) -> bool:
+        """Block until record seq has been written (and fsynced)."""
+        with self._lock:
+            return self._durable.wait_for(lambda: self._durable_seq >= seq, timeout)
+
+    def rotate(self) -> int:
+        """Start a new segment at the next sequence number and return it.
+
+        Records before it stay in older segments, which `compact` can drop
+        once a snapshot covers them.
+        """
+        with self._lock:
+            seq = self._next_seq
+            self._buffer.append(_Rotate(seq))
+            self._appended.notify()
+        return seq
+
+    def compact(self, before_seq: int) -> int:
+        """Delete closed segments that only hold records before before_seq."""
+        segments = self.segments()
+        removed = 0
+        for (start, path), following in zip(segments, segments[1:]):
+            if following[0] <= before_seq and start != self._segment_start:
+                path.unlink(missing_ok=True)
+                removed += 1
+        return removed
+
+    def segments(self) -> List[Tuple[int, Path]]:
+        found = []
+        for path in self.log_dir.glob(f"{SEGMENT_PREFIX}*{SEGMENT_SUFFIX}"):
+            found.append((int(path.name[len(SEGMENT_PREFIX):-len(SEGMENT_SUFFIX)]), path))
+        return sorted(found)
+
+    def replay(self, from_seq: int = 0) -> Iterator[LoggedAttempt]:
+        """Yield durable records with seq >= from_seq, in order."""
+        segments = self.segments()
+        for i, (start, path) in enumerate(segments):
+            if i + 1 < len(segments) and segments[i + 1][0] <= from_seq:
+                continue
+            for offset, record in enumerate(_read(path)):
+                seq = start + offset
+                if seq >= from_seq:
+                    yield LoggedAttempt(seq, *record)
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats["next_seq"] = self._next_seq
+            stats["durable_seq"] = self._durable_seq
+            stats["buffered"] = len(self._buffer)
+        stats["records_per_commit"] = stats["records"] / stats["commits"] if stats["commits"] else None
+        return stats
+
+    def _segment_path(self, start: int) -> Path:
+        return self.log_dir / f"{SEGMENT_PREFIX}{start:015d}{SEGMENT_SUFFIX}"
+
+    def _run(self):
+        while True:
+            with self._lock:
+                self._appended.wait_for(lambda: self._buffer or not self._running)
+                if not self._buffer and not self._running:
+                    return
+            # Let concurrent appends pile up so they share this commit
+            if self.commit_interval:
+                time.sleep(self.commit_interval)
+            with self._lock:
+                batch, self._buffer = self._buffer, []
+            self._commit(batch)
+
+    def _commit(self, batch: List[Tuple[int, bytes] | _Rotate]):
+        last_seq = None
+        chunk = []
+        written = 0
+        records = 0
+        for entry in batch:
+            if isinstance(entry, _Rotate):
+                self._write(chunk)
+                self._switch_segment(entry.seq)
+                chunk = []
+                continue
+            seq, record = entry
+            chunk.append(record)
+            last_seq = seq
+            written += len(record)
+            records += 1
+        self._write(chunk)
+        if self._file.tell() >= self.segment_bytes and last_seq is not None:
+            self._switch_segment(last_seq + 1)
+
+        with self._lock:
+            if last_seq is not None:
+                self._durable_seq = last_seq
+            self._stats["commits"] += 1
+            self._stats["records"] += records
+            self._stats["bytes"] += written
+            self._durable.notify_all()
+
+    def _write(self, chunk: List[bytes]):
+        if not chunk:
+            return
+        self._file.write(b"".join(chunk))
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+
+    def _switch_segment(self, start: int):
+        if start == self._segment_start:
+            return
+        self._file.close()
+        self._segment_start = start
+        self._file = open(self._segment_path(start), "ab")
+
+
+def encode(learner_id: str, teks: str, correct: bool, difficulty: int, answered_at: float) -> bytes:
+    learner = learner_id.encode()
+    skill = teks.encode()
+    body = _BODY.pack(len(learner), len(skill), answered_at, bool(correct), difficulty) + learner + skill
+    return _CRC.pack(zlib.crc32(body)) + body
+
+
+def _read(path: Path) -> Iterator[Tuple[str, str, bool, int, float]]:
+    """Decode a segment, stopping at the first torn or corrupt record."""
+    data = path.read_bytes()
+    offset = 0
+    while offset + _HEADER_SIZE <= len(data):
+        (crc,) = _CRC.unpack_from(data, offset)
+        learner_len, teks_len, answered_at, correct, difficulty = _BODY.unpack_from(data, offset + _CRC.size)
+        end = offset + _HEADER_SIZE + learner_len + teks_len
+        if end > len(data) or zlib.crc32(data[offset + _CRC.size:end]) != crc:
+            return
+        learner_start = offset + _HEADER_SIZE
+        teks_start = learner_start + learner_len
+        yield (data[learner_start:teks_start].decode(), data[teks_start:end].decode(),
+               bool(correct), difficulty, answered_at)
+        offset = end
+
+
+def _scan(path: Path) -> Tuple[int, int]:
+    """(valid record count, valid byte length) of a segment."""
+    count = 0
+    valid = 0
+    for learner_id, teks, _, _, _ in _read(path):
+        count += 1
+        valid += _HEADER_SIZE + len(learner_id.encode()) + len(teks.encode())
+    return count, valid
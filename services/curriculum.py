@@ -1,115 +1,109 @@
+import threading
 from typing import Dict, List, Any
-from services.mastery import MasteryService
+from services.mastery import DEFAULT_LEARNER, MasteryService
+from services.mastery_store import MasteryCell
+from services.skill_graph import SkillGraph
+
+
+# Stored mastery score at which a skill counts as proficient and unlocks its dependents
+PROFICIENT = 0.7
 
 
 class CurriculumService:
-    def __init__(self, mastery_service: MasteryService):
+    """Skill sequencing over a compiled prerequisite DAG.
+
+    Each learner's proficient and unlocked skills are bitsets over the
+    graph's topological order. They are built from the learner's mastery
+    records on first use and then kept current by `on_mastery_change`
+    (registered as a MasteryService listener), which only touches the
+    changed skill's dependents when a stored score crosses PROFICIENT.
+    Decay does not relock skills; it shows up as due reviews instead.
+    """
+
+    def __init__(self, mastery_service: MasteryService, graph: SkillGraph | None = None):
         self.mastery_service = mastery_service
-        # Define skill prerequisites and sequencing
-        self.skill_dependencies = {
-            "6.2": [],  # Rational numbers - no prerequisites
-            "6.4": ["6.2"],  # Proportionality needs rational numbers
-            "6.7B": ["6.2"],  # Expressions/equations needs rational numbers
-            "6.8B": [],  # Geometry - independent
-            "6.9A": ["6.2", "6.7B"],  # One-step equations needs both
-        }
-        
-        # Define difficulty progression rules
-        self.difficulty_rules = {
-            "step_up_after": 3,  # Correct answers in a row
-            "step_down_after": 2,  # Incorrect answers in a row
-            "max_difficulty": 5,
-            "min_difficulty": 1
-        }
+        # Skill prerequisites and sequencing, compiled from the TEKS catalog
+        self.graph = graph if graph is not None else SkillGraph.load()
+        self.skill_dependencies = self.graph.dependencies
+        self._learners: Dict[str, List[int]] = {}  # learner -> [proficient, unlocked]
+        self._crossings = 0  # Bumped on every threshold crossing, to detect races with _state
+        self._lock = threading.Lock()
     
-    def get_next_skill(self, user_skills: List[str]) -> str | None:
-        """Determine the next skill to practice based on mastery and prerequisites."""
-        # Get all available skills
-        all_skills = list(self.skill_dependencies.keys())
+    def get_next_skill(self, user_skills: List[str] | None = None,
+                       learner_id: str = DEFAULT_LEARNER) -> str | None:
+        """Determine the next skill to practice based on mastery and prerequisites.
         
-        # Find skills that are unlocked (prerequisites met)
-        unlocked_skills = []
-        for skill in all_skills:
-            if self._is_skill_unlocked(skill, user_skills):
-                unlocked_skills.append(skill)
+        The earliest unlocked skill (in sequence order) that is not yet
+        proficient, else the earliest unlocked one for review. With
+        user_skills, prerequisites must also be among them (an O(n) filter).
+        """
+        proficient, unlocked = self._state(learner_id)
+        if user_skills is not None:
+            unlocked &= self.graph.unlocked_by(self.graph.mask(s for s in user_skills if s in self.graph.index))
         
-        if not unlocked_skills:
-            return "6.2"  # Start with rational numbers
+        if not unlocked:
+            return self.graph.skills[0] if self.graph.skills else None
         
         # Prioritize skills that need work
-        for skill in unlocked_skills:
-            mastery = self.mastery_service.get_mastery(skill)
-            if not mastery or mastery.score < 0.7:  # Not yet proficient
-                return skill
-        
-        # If all skills are proficient, return the first one for review
-        return unlocked_skills[0]
+        return self.graph.first(unlocked & ~proficient) or self.graph.first(unlocked)
     
-    def get_difficulty(self, teks: str, recent_performance: List[bool]) -> int:
-        """Determine difficulty level based on recent performance."""
-        if not recent_performance:
-            return 2  # Start at medium difficulty
-        
-        # Count consecutive correct/incorrect
-        last_result = recent_performance[-1]
-        consecutive = 1
-        
-        for i in range(len(recent_performance) - 2, -1, -1):
-            if recent_performance[i] == last_result:
-                consecutive += 1
-            else:
-                break
-        
-        # Get current difficulty (simplified - would need to track this)
-        current_difficulty = 2
-        
-        # Step up if enough consecutive correct
-        if last_result and consecutive >= self.difficulty_rules["step_up_after"]:
-            return min(current_difficulty + 1, self.difficulty_rules["max_difficulty"])
-        
-        # Step down if enough consecutive incorrect
-        if not last_result and consecutive >= self.difficulty_rules["step_down_after"]:
-            return max(current_difficulty - 1, self.difficulty_rules["min_difficulty"])
-        
-        return current_difficulty
-    
-    def _is_skill_unlocked(self, skill: str, user_skills: List[str]) -> bool:
+    def is_skill_unlocked(self, skill: str, learner_id: str = DEFAULT_LEARNER) -> bool:
         """Check if a skill is unlocked based on prerequisites."""
-        prerequisites = self.skill_dependencies.get(skill, [])
-        
-        for prereq in prerequisites:
-            if prereq not in user_skills:
-                return False
-            
-            # Check if prerequisite is mastered
-            mastery = self.mastery_service.get_mastery(prereq)
-            if not mastery or mastery.score < 0.7:
-                return False
+        return bool(self._state(learner_id)[1] >> self.graph.index[skill] & 1)
+    
+    def get_unlocked_skills(self, learner_id: str = DEFAULT_LEARNER) -> List[str]:
+        return self.graph.names(self._state(learner_id)[1])
+    
+    def on_mastery_change(self, learner_id: str, teks: str, previous: MasteryCell | None,
+                          cell: MasteryCell | None):
+        """MasteryService listener: update bitsets when a skill crosses PROFICIENT."""
+        was = previous is not None and previous.score >= PROFICIENT
+        now = cell is not None and cell.score >= PROFICIENT
+        if was == now or teks not in self.graph.index:
+            return
+        with self._lock:
+            self._crossings += 1
+            state = self._learners.get(learner_id)
+            if state is not None:
+                self._set_proficient(state, self.graph.index[teks], now)
+    
+    def get_difficulty(self, teks: str, learner_id: str = DEFAULT_LEARNER) -> int:
+        """Difficulty level for the learner's next item in teks.
         
-        return True
+        Stepped on every attempt by the mastery service's difficulty_rules
+        and stored with the skill's mastery, so this is one cell read.
+        """
+        return self.mastery_service.get_difficulty(teks, learner_id)
     
     def get_skill_sequence(self) -> List[str]:
         """Get the recommended sequence of skills."""
-        # This is a simplified topological sort
-        sequence = []
-        remaining = set(self.skill_dependencies.keys())
-        
-        while remaining:
-            # Find skills with no unmet prerequisites
-            ready = []
-            for skill in remaining:
-                prereqs = self.skill_dependencies.get(skill, [])
-                if all(prereq in sequence for prereq in prereqs):
-                    ready.append(skill)
-            
-            if not ready:
-                # Fallback: add remaining skills in arbitrary order
-                sequence.extend(remaining)
-                break
-            
-            # Add the first ready skill
-            next_skill = ready[0]
-            sequence.append(next_skill)
-            remaining.remove(next_skill)
-        
-        return sequence
+        return list(self.graph.skills)
+    
+    def _state(self, learner_id: str) -> List[int]:
+        while True:
+            with self._lock:
+                state = self._learners.get(learner_id)
+                if state is not None:
+                    return list(state)
+                crossings = self._crossings
+            # First use: build from stored scores outside the lock (the mastery
+            # service calls our listener while holding its own lock)
+            state = [0, self.graph.roots]
+            for record in self.mastery_service.get_all_mastery(learner_id):
+                if record.score >= PROFICIENT and record.teks in self.graph.index:
+                    self._set_proficient(state, self.graph.index[record.teks], True)
+            with self._lock:
+                # A crossing during the read may be missing from state: read again
+                if self._crossings == crossings:
+                    self._learners[learner_id] = state
+                    return list(state)
+    
+    def _set_proficient(self, state: List[int], skill: int, proficient: bool):
+        # Idempotent, so a change seen twice is harmless
+        bit = 1 << skill
+        state[0] = state[0] | bit if proficient else state[0] & ~bit
+        for dependent in self.graph.dependents[skill]:
+            if self.graph.prereq_masks[dependent] & ~state[0]:
+                state[1] &= ~(1 << dependent)
+            else:
+                state[1] |= 1 << dependent
@@ -0,0 +1,22 @@
+from typing import NamedTuple
+
+
+class DifficultyRules(NamedTuple):
+    """Adaptive difficulty: step after runs of correct/incorrect answers, within bounds."""
+    step_up_after: int = 3  # Correct answers in a row
+    step_down_after: int = 2  # Incorrect answers in a row
+    max_difficulty: int = 5
+    min_difficulty: int = 1
+    start: int = 2  # Level of a skill's first item
+
+    def step(self, level: int, correct: bool, correct_streak: int, incorrect_streak: int) -> int:
+        """Level after an attempt, given the streaks including that attempt.
+
+        Steps happen each time a run reaches a multiple of its length, so a
+        long run keeps climbing (or falling) one level per step length.
+        """
+        if correct and correct_streak % self.step_up_after == 0:
+            level += 1
+        elif not correct and incorrect_streak % self.step_down_after == 0:
+            level -= 1
+        return min(max(level, self.min_difficulty), self.max_difficulty)
@@ -0,0 +1,192 @@
+import multiprocessing
+import queue
+import threading
+from typing import Any, Callable, List
+
+
+class SandboxTimeout(TimeoutError):
+    """A sandboxed call did not finish (or find a free worker) in time."""
+
+
+class SandboxError(RuntimeError):
+    """A sandbox worker crashed or the call raised inside it."""
+
+
+class _Worker:
+    def __init__(self, context: Any, memory_limit_mb: int | None):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(
+            target=_worker_main, args=(child_conn, memory_limit_mb), name="expr-sandbox", daemon=True,
+        )
+        self.process.start()
+        child_conn.close()
+        self.ready = False
+        self.tasks = 0
+
+    def wait_ready(self, timeout: float) -> bool:
+        # The worker says hello once sympy is imported; only the first call waits for it
+        try:
+            if not self.ready and self.conn.poll(timeout):
+                self.ready = self.conn.recv() == "ready"
+        except (EOFError, OSError):
+            pass  # Died while starting
+        return self.ready
+
+    def close(self, graceful: bool = True):
+        if graceful and self.process.is_alive():
+            try:
+                self.conn.send(None)
+            except (OSError, ValueError):
+                pass
+            self.process.join(0.5)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.conn.close()
+
+
+class ExprSandbox:
+    """Bounded pool of pre-started worker processes for untrusted sympy work.
+
+    `run(fn, *args)` ships a module-level function to an idle worker and waits
+    at most `timeout` seconds. A worker that overruns is killed and replaced,
+    so a pathological input costs one worker restart instead of a pinned API
+    thread. Workers are also recycled after `max_tasks_per_worker` calls and
+    run under an address-space limit where the platform allows it.
+    """
+
+    def __init__(self, workers: int = 2, timeout: float = 2.0, max_tasks_per_worker: int = 200,
+                 memory_limit_mb: int | None = 512, startup_timeout: float = 30.0,
+                 start_method: str = "spawn"):
+        if workers < 1:
+            raise ValueError("workers must be at least 1")
+        self.workers = workers
+        self.timeout = timeout
+        self.max_tasks_per_worker = max_tasks_per_worker
+        self.memory_limit_mb = memory_limit_mb
+        self.startup_timeout = startup_timeout
+        self._context = multiprocessing.get_context(start_method)
+        self._idle: "queue.Queue[_Worker]" = queue.Queue()
+        self._all: List[_Worker] = []
+        self._lock = threading.Lock()
+        self._running = False
+        self._stats = {"calls": 0, "timeouts": 0, "errors": 0, "restarts": 0, "recycled": 0}
+
+    def start(self):
+        """Pre-start the workers; they import sympy in the background."""
+        with self._lock:
+            if self._running:
+                return
+            self._running = True
+            for _ in range(self.workers):
+                self._idle.put(self._spawn())
+
+    def stop(self):
+        with self._lock:
+            self._running = False
+            workers, self._all = self._all, []
+        for worker in workers:
+            worker.close()
+        while not self._idle.empty():
+            self._idle.get_nowait()
+
+    @property
+    def running(self) -> bool:
+        return self._running
+
+    def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """Call fn(*args) in a worker; raises SandboxTimeout or SandboxError."""
+        if not self._running:
+            raise SandboxError("Sandbox is not running")
+        try:
+            worker = self._idle.get(timeout=self.timeout)
+        except queue.Empty:
+            self._count("timeouts")
+            raise SandboxTimeout("No free sandbox worker")
+
+        if not worker.wait_ready(self.startup_timeout):
+            self._replace(worker)
+            self._count("errors")
+            raise SandboxError("Sandbox worker failed to start")
+
+        self._count("calls")
+        try:
+            worker.conn.send((fn, args))
+            finished = worker.conn.poll(self.timeout)
+            if finished:
+                status, value = worker.conn.recv()
+        except (EOFError, OSError) as e:
+            # Crashed, e.g. killed for exceeding the memory limit
+            self._replace(worker)
+            self._count("errors")
+            raise SandboxError("Sandbox worker died") from e
+        if not finished:
+            self._replace(worker)
+            self._count("timeouts")
+            raise SandboxTimeout(f"Sandboxed call exceeded {self.timeout}s")
+
+        worker.tasks += 1
+        if worker.tasks >= self.max_tasks_per_worker:
+            self._replace(worker, graceful=True)
+            self._count("recycled")
+        else:
+            self._idle.put(worker)
+        if status != "ok":
+            self._count("errors")
+            raise SandboxError(value)
+        return value
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+        stats["workers"] = self.workers
+        stats["idle"] = self._idle.qsize()
+        return stats
+
+    def _spawn(self) -> _Worker:
+        # Caller holds self._lock
+        worker = _Worker(self._context, self.memory_limit_mb)
+        self._all.append(worker)
+        return worker
+
+    def _replace(self, worker: _Worker, graceful: bool = False):
+        worker.close(graceful)
+        with self._lock:
+            if worker in self._all:
+                self._all.remove(worker)
+            if not self._running:
+                return
+            if not graceful:
+                self._stats["restarts"] += 1
+            replacement = self._spawn()
+        self._idle.put(replacement)
+
+    def _count(self, stat: str):
+        with self._lock:
+            self._stats[stat] += 1
+
+
+def _worker_main(conn: Any, memory_limit_mb: int | None):
+    if memory_limit_mb:
+        try:
+            import resource
+
+            limit = memory_limit_mb * 1024 * 1024
+            resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+        except (ImportError, ValueError, OSError):
+            pass  # Not available on this platform; timeouts still apply
+    import sympy  # noqa: F401  Pay the import once, before the first call
+
+    conn.send("ready")
+    while True:
+        try:
+            task = conn.recv()
+        except EOFError:
+            return
+        if task is None:
+            return
+        fn, args = task
+        try:
+            conn.send(("ok", fn(*args)))
+        except BaseException as e:
+            conn.send(("error", f"{type(e).__name__}: {e}"))
@@ -0,0 +1,30 @@
+import math
+
+
+DAY_SECONDS = 24 * 60 * 60
+
+
+def retention(elapsed_seconds: float, half_life_days: float | None) -> float:
+    """Fraction of a mastery score left after elapsed_seconds without practice.
+
+    Exponential forgetting curve: the score halves every half_life_days.
+    None disables decay.
+    """
+    if half_life_days is None or elapsed_seconds <= 0:
+        return 1.0
+    return 0.5 ** (elapsed_seconds / (half_life_days * DAY_SECONDS))
+
+
+def review_due(score: float, last_seen: int, threshold: float, half_life_days: float | None) -> int:
+    """Epoch seconds when a skill needs review; 0 = never.
+
+    Skills below the threshold are due a day after the last attempt.
+    Mastered skills are due when their decayed score reaches the threshold,
+    which only depends on the stored score and last_seen, so it is fixed
+    at write time and no sweep over idle learners is needed.
+    """
+    if score < threshold:
+        return last_seen + DAY_SECONDS
+    if half_life_days is None or threshold <= 0:
+        return 0
+    return last_seen + round(half_life_days * DAY_SECONDS * math.log2(score / threshold))
@@ -0,0 +1,185 @@
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from fractions import Fraction
+from pathlib import Path
+from typing import Any, Dict, Tuple
+
+
+class ItemCache:
+    """Bounded LRU cache of generated items keyed by item id, with optional TTL.
+
+    Item ids are a pure function of (template_id, seed), so the factory uses
+    this as a seed-addressable cache. With cache_dir set, entries are also
+    written to disk as JSON and memory misses fall through to it, so the
+    cache survives restarts. The disk tier holds at most `disk_max_items`
+    files: when a write goes over, the oldest files (and any past the TTL)
+    are removed down to 90% of the cap. Cached items are shared; treat them
+    as read-only.
+    """
+
+    def __init__(self, max_size: int = 1024, ttl_seconds: float | None = None,
+                 cache_dir: str | Path | None = None, disk_max_items: int = 100_000):
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+        if disk_max_items < 1:
+            raise ValueError("disk_max_items must be at least 1")
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.disk_max_items = disk_max_items
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else None
+        self._disk_count = 0
+        if self.cache_dir is not None:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            # Pickles from earlier versions are never loaded; reclaim their space
+            for path in self.cache_dir.glob("*.pkl"):
+                path.unlink(missing_ok=True)
+            self._disk_count = sum(1 for _ in self.cache_dir.glob("*.json"))
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._sweep_lock = threading.Lock()
+        self._stats = {"hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0, "expirations": 0,
+                       "disk_evictions": 0}
+
+    def get(self, item_id: str) -> Dict[str, Any] | None:
+        """Return the cached item, refreshing its recency, or None."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(item_id)
+            if entry is not None:
+                stored_at, item = entry
+                if self.ttl_seconds is None or now - stored_at <= self.ttl_seconds:
+                    self._entries.move_to_end(item_id)
+                    self._stats["hits"] += 1
+                    return item
+                del self._entries[item_id]
+                self._stats["expirations"] += 1
+
+        item = self._read_disk(item_id)
+        with self._lock:
+            if item is None:
+                self._stats["misses"] += 1
+                return None
+            self._stats["disk_hits"] += 1
+            self._insert(item_id, item, now)
+        return item
+
+    def put(self, item_id: str, item: Dict[str, Any]):
+        """Store an item, evicting the least recently used beyond max_size."""
+        with self._lock:
+            self._insert(item_id, item, time.monotonic())
+        self._write_disk(item_id, item)
+
+    def invalidate(self, prefix: str = ""):
+        """Drop every entry whose id starts with prefix (all entries by default)."""
+        with self._lock:
+            for item_id in [k for k in self._entries if k.startswith(prefix)]:
+                del self._entries[item_id]
+        if self.cache_dir is not None:
+            removed = 0
+            for path in self.cache_dir.glob(f"{_safe_name(prefix)}*.json"):
+                path.unlink(missing_ok=True)
+                removed += 1
+            with self._lock:
+                self._disk_count = max(self._disk_count - removed, 0)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["size"] = len(self._entries)
+            stats["disk_size"] = self._disk_count
+        stats["max_size"] = self.max_size
+        lookups = stats["hits"] + stats["disk_hits"] + stats["misses"]
+        stats["hit_rate"] = (stats["hits"] + stats["disk_hits"]) / lookups if lookups else None
+        return stats
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _insert(self, item_id: str, item: Dict[str, Any], now: float):
+        # Caller holds self._lock
+        self._entries[item_id] = (now, item)
+        self._entries.move_to_end(item_id)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    def _path(self, item_id: str) -> Path:
+        return self.cache_dir / f"{_safe_name(item_id)}.json"
+
+    def _read_disk(self, item_id: str) -> Dict[str, Any] | None:
+        if self.cache_dir is None:
+            return None
+        path = self._path(item_id)
+        try:
+            if self.ttl_seconds is not None and time.time() - path.stat().st_mtime > self.ttl_seconds:
+                path.unlink(missing_ok=True)
+                with self._lock:
+                    self._disk_count = max(self._disk_count - 1, 0)
+                return None
+            with open(path, encoding="utf-8") as f:
+                return json.load(f, object_hook=_decode)
+        except (OSError, ValueError):
+            return None
+
+    def _write_disk(self, item_id: str, item: Dict[str, Any]):
+        if self.cache_dir is None:
+            return
+        path = self._path(item_id)
+        tmp = path.with_suffix(f".{threading.get_ident()}.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(item, f, default=_encode)
+        is_new = not path.exists()
+        os.replace(tmp, path)
+        if is_new:
+            with self._lock:
+                self._disk_count += 1
+                over = self._disk_count > self.disk_max_items
+            if over:
+                self._sweep_disk()
+
+    def _sweep_disk(self):
+        """Remove expired files, then the oldest, until the disk tier is at 90% of its cap."""
+        if not self._sweep_lock.acquire(blocking=False):
+            return  # Another thread is already sweeping
+        try:
+            files = []
+            for path in self.cache_dir.glob("*.json"):
+                try:
+                    files.append((path.stat().st_mtime, path))
+                except OSError:
+                    pass
+            files.sort()
+            keep = int(self.disk_max_items * 0.9)
+            cutoff = time.time() - self.ttl_seconds if self.ttl_seconds is not None else None
+            removed = 0
+            for mtime, path in files:
+                if len(files) - removed <= keep and (cutoff is None or mtime >= cutoff):
+                    break
+                path.unlink(missing_ok=True)
+                removed += 1
+            with self._lock:
+                self._disk_count = len(files) - removed
+                self._stats["disk_evictions"] += removed
+        finally:
+            self._sweep_lock.release()
+
+
+def _encode(value: Any) -> Any:
+    # Exact answers stay exact across the disk tier
+    if isinstance(value, Fraction):
+        return {"__fraction__": str(value)}
+    raise TypeError(f"Cannot cache {type(value).__name__} values")
+
+
+def _decode(obj: Dict[str, Any]) -> Any:
+    if len(obj) == 1 and "__fraction__" in obj:
+        return Fraction(obj["__fraction__"])
+    return obj
+
+
+def _safe_name(item_id: str) -> str:
+    return re.sub(r"[^A-Za-z0-9._-]", "_", item_id)
@@ -1,53 +1,476 @@
 import json
 import random
-from typing import Dict, Any, List
+import re
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Dict, Any, Iterable, List, Set, Tuple
 from pathlib import Path
 
-from engines.solver import eval_compute
-from engines.validators import moderate, check_trapezoid, check_distractors
+import numpy as np
+
+from engines.answer_matcher import compile_matcher
+from engines.compute import ComputeKernel, compile_template
+from engines.solver import FractionArray, eval_compute, eval_compute_batch
+from engines.validators import moderate, check_trapezoid, check_distractors, check_constraints, constraint_mask
+from services.item_cache import ItemCache
+from services.param_index import ParamIndex, build_param_index
+
+
+# Redraws allowed per item before giving up on a template's constraints
+MAX_PARAM_DRAWS = 200
+# Largest candidate array drawn in one round of vectorized rejection sampling
+MAX_BATCH_DRAWS = 1_000_000
+# Integer parameter ranges grow (shrink) by this factor per difficulty level above (below) the template's own
+LEVEL_RANGE_FACTOR = 1.5
 
 
 class ItemFactory:
-    def __init__(self, templates_dir: str = "content/templates"):
+    def __init__(self, templates_dir: str = "content/templates", index_dir: str | None = None,
+                 cache_size: int = 1024, cache_ttl: float | None = None, cache_dir: str | None = None,
+                 cache_disk_max_items: int = 100_000):
         self.templates_dir = Path(templates_dir)
-        self.templates_cache = {}
+        self.index_dir = index_dir  # Optional on-disk cache for parameter indexes
+        self.item_cache = ItemCache(cache_size, cache_ttl, cache_dir, cache_disk_max_items)
+        # (templates_cache, kernels, param_indexes), swapped as one reference on reload
+        self._snapshot: Tuple[Dict[str, Dict[str, Any]], Dict[str, ComputeKernel], Dict[str, ParamIndex | None]] = ({}, {}, {})
+        self._file_stamps: Dict[Path, Tuple[int, int]] = {}
+        self._file_ids: Dict[Path, str] = {}
+        self._reload_lock = threading.Lock()
+        self._reload_listeners: List[Callable[[Set[str]], None]] = []
+        # (template_id, difficulty) -> (source template, scaled template, its index)
+        self._levels: Dict[Tuple[str, int], Tuple[Dict[str, Any], Dict[str, Any], ParamIndex | None]] = {}
+        self.template_errors: Dict[str, str] = {}
         self._load_templates()
     
+    @property
+    def templates_cache(self) -> Dict[str, Dict[str, Any]]:
+        return self._snapshot[0]
+    
+    @property
+    def kernels(self) -> Dict[str, ComputeKernel]:
+        return self._snapshot[1]
+    
+    @property
+    def param_indexes(self) -> Dict[str, ParamIndex | None]:
+        return self._snapshot[2]
+    
     def _load_templates(self):
-        """Load all JSON templates from the templates directory."""
-        for template_file in self.templates_dir.glob("*.json"):
-            with open(template_file, 'r') as f:
-                template = json.load(f)
-                self.templates_cache[template['id']] = template
-    
-    def generate_item(self, template_id: str, seed: int = None) -> Dict[str, Any]:
-        """Generate a live item from a template with random parameters."""
+        """Load all JSON templates, compile their compute expressions and index
+        the valid parameter tuples of every finite template."""
+        for template_file in sorted(self.templates_dir.glob("*.json")):
+            template, kernel, index = self._compile_template_file(template_file)
+            self.templates_cache[template['id']] = template
+            self.kernels[template['id']] = kernel
+            self.param_indexes[template['id']] = index
+            self._file_stamps[template_file] = _file_stamp(template_file)
+            self._file_ids[template_file] = template['id']
+    
+    def _compile_template_file(self, template_file: Path) -> Tuple[Dict[str, Any], ComputeKernel, ParamIndex | None]:
+        """Parse, validate, compile and index one template file."""
+        with open(template_file, 'r') as f:
+            template = json.load(f)
+        param_names = [axis[0] for axis in self._param_axes(template)]
+        param_names += list(self._param_constants(template))
+        try:
+            kernel = compile_template(template, param_names)
+        except ValueError as e:
+            raise ValueError(f"{template_file.name}: {e}") from e
+        index = build_param_index(
+            template, self._param_axes(template), kernel, self._param_constants(template), self.index_dir
+        )
+        return template, kernel, index
+    
+    def add_reload_listener(self, listener: Callable[[Set[str]], None]):
+        """Register a callback invoked with the template ids changed by a reload."""
+        self._reload_listeners.append(listener)
+    
+    def reload_templates(self) -> Set[str]:
+        """Pick up added, edited and deleted template files by mtime.
+
+        Only changed files are re-parsed, re-validated, recompiled and
+        re-indexed. A file that fails keeps its previous version live and is
+        reported in `template_errors` once; it is retried when it changes again. The new templates, kernels and indexes
+        replace the old ones in a single swap, then cached items and reload
+        listeners (e.g. item pools) are invalidated for just the affected ids.
+        """
+        with self._reload_lock:
+            templates, kernels, indexes = (dict(d) for d in self._snapshot)
+            current = {path: _file_stamp(path) for path in self.templates_dir.glob("*.json")}
+            changed: Set[str] = set()
+            old_teks: Dict[str, str] = {}
+            
+            for path in [p for p in self._file_stamps if p not in current]:
+                template_id = self._file_ids.pop(path, None)
+                del self._file_stamps[path]
+                self.template_errors.pop(path.name, None)
+                if template_id is None:
+                    continue  # Never loaded successfully
+                old_teks[template_id] = templates[template_id]["teks"]
+                for d in (templates, kernels, indexes):
+                    d.pop(template_id, None)
+                changed.add(template_id)
+            
+            for path, stamp in current.items():
+                if self._file_stamps.get(path) == stamp:
+                    continue
+                try:
+                    template, kernel, index = self._compile_template_file(path)
+                except (ValueError, KeyError, TypeError, OSError) as e:
+                    # Includes json.JSONDecodeError; keep serving the last good version
+                    self.template_errors[path.name] = str(e)
+                    print(f"Template reload failed for {path.name}: {e}")
+                    # Record the stamp so the bad version is not retried (and logged) every poll
+                    self._file_stamps[path] = stamp
+                    continue
+                self.template_errors.pop(path.name, None)
+                previous_id = self._file_ids.get(path)
+                if previous_id is not None and previous_id != template['id']:
+                    old_teks[previous_id] = templates[previous_id]["teks"]
+                    for d in (templates, kernels, indexes):
+                        d.pop(previous_id, None)
+                    changed.add(previous_id)
+                if template['id'] in templates:
+                    old_teks[template['id']] = templates[template['id']]["teks"]
+                templates[template['id']] = template
+                kernels[template['id']] = kernel
+                indexes[template['id']] = index
+                self._file_stamps[path] = stamp
+                self._file_ids[path] = template['id']
+                changed.add(template['id'])
+            
+            if not changed:
+                return changed
+            self._snapshot = (templates, kernels, indexes)
+            for key in [k for k in self._levels if k[0] in changed]:
+                self._levels.pop(key, None)
+        
+        for template_id in changed:
+            for teks in {old_teks.get(template_id), templates.get(template_id, {}).get("teks")} - {None}:
+                self.item_cache.invalidate(f"itm_{teks}_{template_id}_")
+        for listener in self._reload_listeners:
+            listener(changed)
+        return changed
+    
+    def generate_item(self, template_id: str, seed: int = None, difficulty: int | None = None) -> Dict[str, Any]:
+        """Generate a live item from a template with random parameters.
+
+        All randomness comes from a per-call `random.Random(seed)`, so the same
+        (template_id, seed, difficulty) yields the same item regardless of
+        other threads. `difficulty` defaults to the template's own level;
+        other levels draw from scaled parameter ranges (see `template_at_level`).
+        """
+        templates, kernels, indexes = self._snapshot
+        if template_id not in templates:
+            raise ValueError(f"Template {template_id} not found")
+        
+        template = templates[template_id]
+        if difficulty is None:
+            difficulty = template["difficulty"]
+        if seed is None:
+            seed = random.randint(1000, 9999)
+        item_id = item_id_for(template, seed, difficulty)
+        cached = self.item_cache.get(item_id)
+        if cached is not None:
+            return cached
+        rng = random.Random(seed)
+        
+        index = indexes.get(template_id)
+        if difficulty != template["difficulty"]:
+            template, index = self._level_variant(template, kernels[template_id], difficulty)
+        if index is not None:
+            # Uniform draw over pre-validated tuples: no rejection needed
+            params = index.sample(rng)
+            answer, meta = eval_compute(template, params, kernels[template_id])
+        else:
+            params, answer = self._draw_until_valid(template, kernels[template_id], rng)
+        
+        item = self._build_item(template, item_id, seed, params, answer)
+        
+        # Validate the generated item
+        if not self._validate_item(item, template):
+            raise ValueError("Generated item failed validation")
+        
+        self.item_cache.put(item_id, item)
+        return item
+    
+    def get_item(self, item_id: str) -> Dict[str, Any] | None:
+        """Look an item up by id, regenerating it from (template_id, seed, level) on a cache miss.
+
+        Returns None for unknown templates and for batch items, which have no
+        per-item seed.
+        """
+        cached = self.item_cache.get(item_id)
+        if cached is not None:
+            return cached
+        match = _ITEM_ID.match(item_id)
+        if match is None or match["template_id"] not in self.templates_cache:
+            return None
+        level = int(match["level"]) if match["level"] else None
+        return self.generate_item(match["template_id"], int(match["seed"]), level)
+    
+    def template_at_level(self, template: Dict[str, Any], difficulty: int) -> Dict[str, Any]:
+        """Copy of a template whose integer ranges are scaled to another difficulty level.
+
+        Each level above the template's own multiplies every `min`/`max` bound
+        by LEVEL_RANGE_FACTOR (each level below divides by it), keeping signs
+        and nonzero bounds nonzero, so higher levels use larger numbers.
+        Choices, samples and constraints are unchanged.
+        """
+        if difficulty < 1:
+            raise ValueError(f"Difficulty must be at least 1, got {difficulty}")
+        factor = LEVEL_RANGE_FACTOR ** (difficulty - template["difficulty"])
+        params = {}
+        for key, value in template.get("params", {}).items():
+            if isinstance(value, dict) and "min" in value and "max" in value:
+                value = {**value, "min": _scale_bound(value["min"], factor), "max": _scale_bound(value["max"], factor)}
+            elif not isinstance(value, (dict, list)) and any(
+                    key.endswith(suffix) and f"{key[:-4]}{other}" in template["params"]
+                    for suffix, other in (("_min", "_max"), ("_max", "_min"))):
+                value = _scale_bound(value, factor)
+            params[key] = value
+        return {**template, "params": params, "difficulty": difficulty}
+    
+    def _level_variant(self, template: Dict[str, Any], kernel: ComputeKernel,
+                       difficulty: int) -> Tuple[Dict[str, Any], ParamIndex | None]:
+        """Scaled template and parameter index of a level, built once per template version."""
+        key = (template["id"], difficulty)
+        entry = self._levels.get(key)
+        if entry is not None and entry[0] is template:
+            return entry[1], entry[2]
+        scaled = self.template_at_level(template, difficulty)
+        index = build_param_index(
+            scaled, self._param_axes(scaled), kernel, self._param_constants(scaled), self.index_dir
+        )
+        self._levels[key] = (template, scaled, index)
+        return scaled, index
+    
+    def count_distinct(self, template_id: str) -> int | None:
+        """Exact number of distinct parameter tuples, or None if not indexed."""
         if template_id not in self.templates_cache:
             raise ValueError(f"Template {template_id} not found")
+        index = self.param_indexes.get(template_id)
+        return index.count if index is not None else None
+    
+    def _draw_until_valid(self, template: Dict[str, Any], kernel: ComputeKernel,
+                          rng: random.Random) -> Tuple[Dict[str, Any], Any]:
+        """Rejection sampling for templates too large to index."""
+        for _ in range(MAX_PARAM_DRAWS):
+            params = self._generate_params(template, rng)
+            try:
+                answer, meta = eval_compute(template, params, kernel)
+            except (ValueError, ZeroDivisionError):
+                continue
+            if check_constraints(template, params, answer):
+                return params, answer
+        raise ValueError(f"Could not satisfy constraints for {template['id']}")
+    
+    def generate_many(self, template_id: str, seeds: Iterable[int], max_workers: int | None = None,
+                      use_processes: bool = False) -> List[Dict[str, Any]]:
+        """Generate one item per seed in parallel, returned in seed order.
+
+        Threads share this factory; processes each load their own copy of the
+        templates. Either way item i equals `generate_item(template_id, seeds[i])`.
+        """
+        seeds = list(seeds)
+        executor: Executor
+        if use_processes:
+            executor = ProcessPoolExecutor(
+                max_workers=max_workers,
+                initializer=_init_worker_factory,
+                initargs=(str(self.templates_dir),),
+            )
+            with executor:
+                return list(executor.map(_generate_in_worker, [template_id] * len(seeds), seeds,
+                                         chunksize=max(1, len(seeds) // 64)))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(lambda seed: self.generate_item(template_id, seed), seeds))
+    
+    def generate_batch(self, template_id: str, n: int, seed: int = None,
+                       materialize: bool = True) -> Any:
+        """Generate n items at once with NumPy.
+
+        Indexed templates draw row indices straight from their valid tuples.
+        Otherwise parameters for every candidate are drawn as arrays, answers are
+        computed vectorized and template constraints are applied as boolean
+        masks, so rejection costs a few array ops instead of a Python call per
+        draw. Only the n survivors are turned into item dicts (with SVGs).
+
+        With materialize=False, returns the survivors column-wise instead:
+        {"template_id", "count", "params": {name: array}, "answers": array}.
+        Batch items are identified by (seed, index) rather than per-item seeds.
+        """
+        templates, kernels, indexes = self._snapshot
+        if template_id not in templates:
+            raise ValueError(f"Template {template_id} not found")
         
-        template = self.templates_cache[template_id]
-        if seed is not None:
-            random.seed(seed)
+        template = templates[template_id]
+        if seed is None:
+            seed = random.randint(1000, 9999)
+        rng = np.random.default_rng(seed)
         
-        # Generate parameters based on template constraints
-        params = self._generate_params(template)
+        index = indexes.get(template_id)
+        if index is not None:
+            params = index.sample_arrays(rng, n)
+            answers, meta = eval_compute_batch(template, params, kernels[template_id])
+        else:
+            params, answers = self._draw_batch_until_valid(template, kernels[template_id], rng, n)
         
-        # Compute the answer
-        answer, meta = eval_compute(template, params)
+        if not materialize:
+            return {"template_id": template_id, "count": n, "params": params, "answers": answers}
         
-        # Create the live item
+        constants = self._param_constants(template)
+        columns = {key: value.tolist() for key, value in params.items()}
+        answer_list = answers.tolist()
+        items = []
+        for i in range(n):
+            item_params = dict(constants)
+            item_params.update({key: column[i] for key, column in columns.items()})
+            answer = self._coerce_answer(template, answer_list[i])
+            items.append(self._build_item(
+                template, f"itm_{template['teks']}_{template_id}_{seed}-{i}", None, item_params, answer
+            ))
+        return items
+    
+    def _draw_batch_until_valid(self, template: Dict[str, Any], kernel: ComputeKernel, rng: np.random.Generator,
+                                n: int) -> Tuple[Dict[str, np.ndarray], Any]:
+        """Vectorized rejection sampling for templates too large to index."""
+        chunks: List[Tuple[Dict[str, np.ndarray], Any]] = []
+        have = 0
+        drawn = 0
+        budget = n * MAX_PARAM_DRAWS  # Same per-item allowance as _draw_until_valid
+        draws = n
+        while have < n:
+            if drawn >= budget:
+                raise ValueError(f"Constraints of {template['id']} look unsatisfiable: "
+                                 f"{have} of {n} items after {drawn:,} draws")
+            draws = min(draws, budget - drawn, MAX_BATCH_DRAWS)
+            params = self._generate_param_arrays(template, rng, draws)
+            answers, meta = eval_compute_batch(template, params, kernel)
+            mask = np.broadcast_to(constraint_mask(template, params, answers), (draws,))
+            if not isinstance(answers, FractionArray):
+                mask = mask & np.isfinite(answers)
+            kept = int(mask.sum())
+            if kept:
+                chunks.append(({key: value[mask] for key, value in params.items()}, answers[mask]))
+                have += kept
+            drawn += draws
+            # Size the next round from the acceptance rate so far; only double while nothing passes
+            draws = int((n - have) * drawn / have * 1.1) + 1 if have else draws * 2
+        
+        params = {key: np.concatenate([c[0][key] for c in chunks])[:n] for key in chunks[0][0]} if chunks else {}
+        return params, _concat_answers([c[1] for c in chunks], n)
+    
+    def _param_axes(self, template: Dict[str, Any]) -> List[Tuple[str, str, Any]]:
+        """Parse template params into independent axes.
+
+        Each axis is (name, "int", (lo, hi)), (name, "choice", values) or
+        (name, "sample", (values, k)) for an ordered draw of k distinct values.
+        Supports {"min", "max"} / {"choices"} / {"sample", "k"} dicts, plain
+        lists, flat `<name>_min`/`<name>_max` pairs and `<name>_choices` lists.
+        """
+        axes = []
+        template_params = template.get("params", {})
+        for key, value in template_params.items():
+            if isinstance(value, dict):
+                if "min" in value and "max" in value:
+                    axes.append((key, "int", (value["min"], value["max"])))
+                elif "choices" in value:
+                    axes.append((key, "choice", value["choices"]))
+                elif "sample" in value:
+                    axes.append((key, "sample", (value["sample"], value.get("k", len(value["sample"])))))
+            elif isinstance(value, list):
+                if key.endswith("_choices"):
+                    axes.append((key[:-len("_choices")], "choice", value))
+                else:
+                    axes.append((key, "choice", value))
+            elif key.endswith("_min") and f"{key[:-4]}_max" in template_params:
+                name = key[:-4]
+                axes.append((name, "int", (value, template_params[f"{name}_max"])))
+        return axes
+    
+    def _param_constants(self, template: Dict[str, Any]) -> Dict[str, Any]:
+        """Scalar template params that are not part of any axis (flags like require_nontrivial)."""
+        template_params = template.get("params", {})
+        constants = {}
+        for key, value in template_params.items():
+            if isinstance(value, (dict, list)):
+                continue
+            if key.endswith("_min") and f"{key[:-4]}_max" in template_params:
+                continue
+            if key.endswith("_max") and f"{key[:-4]}_min" in template_params:
+                continue
+            constants[key] = value
+        return constants
+    
+    def _generate_params(self, template: Dict[str, Any], rng: random.Random) -> Dict[str, Any]:
+        """Generate random parameters based on template constraints."""
+        params = self._param_constants(template)
+        for name, kind, spec in self._param_axes(template):
+            if kind == "int":
+                params[name] = rng.randint(spec[0], spec[1])
+            elif kind == "sample":
+                params[name] = rng.sample(spec[0], spec[1])
+            else:
+                params[name] = rng.choice(spec)
+        return params
+    
+    def _generate_param_arrays(self, template: Dict[str, Any], rng: np.random.Generator,
+                               n: int) -> Dict[str, np.ndarray]:
+        """Draw n values per parameter axis as NumPy arrays."""
+        params = {}
+        for name, kind, spec in self._param_axes(template):
+            if kind == "int":
+                params[name] = rng.integers(spec[0], spec[1] + 1, size=n)
+            elif kind == "sample":
+                # One random permutation per row, truncated to k columns
+                order = rng.random((n, len(spec[0]))).argsort(axis=1)[:, :spec[1]]
+                params[name] = np.asarray(spec[0])[order]
+            else:
+                params[name] = np.asarray(spec)[rng.integers(0, len(spec), size=n)]
+        return params
+    
+    def _coerce_answer(self, template: Dict[str, Any], answer: Any) -> Any:
+        """Match batch answers to the types the scalar path produces."""
+        if template["answer_format"]["form"] == "int":
+            return int(answer)
+        return answer
+    
+    def _answer_equivalents(self, template: Dict[str, Any], answer: Any) -> List[Any]:
+        """Accepted written forms of a numeric key (e.g. "7/2", "3 1/2", "3.5")."""
+        answer_format = template["answer_format"]
+        if template["type"] == "mc" or isinstance(answer, (list, str)):
+            return [answer]
+        return compile_matcher(answer, answer_format.get("form"), answer_format.get("tolerance", 0),
+                               answer_format.get("units")).written_forms()
+    
+    def _answer_format(self, template: Dict[str, Any], params: Dict[str, Any]) -> Dict[str, Any]:
+        """The template's answer format, with the generic unit "u" replaced by the item's `units` param.
+
+        E.g. "u^2" becomes "m^2" for a trapezoid measured in m, so only area
+        units of the item's own length unit are accepted.
+        """
+        answer_format = template["answer_format"]
+        units = answer_format.get("units") or ""
+        base, sep, power = units.partition("^")
+        if base != "u" or not isinstance(params.get("units"), str):
+            return answer_format
+        return {**answer_format, "units": f"{params['units']}{sep}{power}"}
+    
+    def _build_item(self, template: Dict[str, Any], item_id: str, seed: int | None,
+                    params: Dict[str, Any], answer: Any) -> Dict[str, Any]:
+        """Assemble the live item dict from drawn params and the computed answer."""
         item = {
-            "id": f"itm_{template['teks']}_{template_id}_{seed or random.randint(1000, 9999)}",
+            "id": item_id,
             "teks": template["teks"],
             "type": template["type"],
-            "seed": seed or random.randint(1000, 9999),
+            "seed": seed,
             "params": params,
             "stimulus": self._create_stimulus(template, params),
             "prompt": self._create_prompt(template, params),
             "options": None,
             "answer": answer,
-            "answer_equivalents": [float(answer) if isinstance(answer, (int, float)) else answer],
-            "answer_format": template["answer_format"],
+            "answer_equivalents": self._answer_equivalents(template, answer),
+            "answer_format": self._answer_format(template, params),
             "hints": self._create_hints(template, params),
             "explanation": self._create_explanation(template, params, answer),
             "difficulty": template["difficulty"],
@@ -59,40 +482,8 @@ class ItemFactory:
         if template["type"] == "mc":
             item["options"] = self._create_mc_options(template, params, answer)
         
-        # Validate the generated item
-        if not self._validate_item(item, template):
-            raise ValueError("Generated item failed validation")
-        
         return item
     
-    def _generate_params(self, template: Dict[str, Any]) -> Dict[str, Any]:
-        """Generate random parameters based on template constraints."""
-        params = {}
-        template_params = template.get("params", {})
-        
-        for key, value in template_params.items():
-            if isinstance(value, dict):
-                if "min" in value and "max" in value:
-                    params[key] = random.randint(value["min"], value["max"])
-                elif "choices" in value:
-                    params[key] = random.choice(value["choices"])
-            elif isinstance(value, list):
-                params[key] = random.choice(value)
-            else:
-                params[key] = value
-        
-        # Special handling for trapezoid constraints
-        if template["teks"] == "6.8B":
-            b1 = params.get("b1_min", 4)
-            b2 = params.get("b2_min", 6) 
-            h = params.get("h_min", 3)
-            params["b1"] = random.randint(b1, params.get("b1_max", 14))
-            params["b2"] = random.randint(b2, params.get("b2_max", 18))
-            params["h"] = random.randint(h, params.get("h_max", 9))
-            params["units"] = random.choice(params.get("units", ["cm", "m"]))
-        
-        return params
-    
     def _create_stimulus(self, template: Dict[str, Any], params: Dict[str, Any]) -> Dict[str, Any]:
         """Create the stimulus (diagram, context) for the item."""
         stimulus = {}
@@ -199,3 +590,47 @@ class ItemFactory:
                 return False
         
         return True
+
+
+# itm_<teks>_<template_id>[_L<difficulty>]_<seed>; teks has no underscores
+_ITEM_ID = re.compile(r"^itm_[^_]+_(?P<template_id>.+?)(?:_L(?P<level>\d+))?_(?P<seed>\d+)$")
+
+
+def item_id_for(template: Dict[str, Any], seed: int, difficulty: int) -> str:
+    """Id of the item a template yields for a seed; levels other than the template's own are tagged."""
+    level = "" if difficulty == template["difficulty"] else f"_L{difficulty}"
+    return f"itm_{template['teks']}_{template['id']}{level}_{seed}"
+
+
+def _scale_bound(bound: int, factor: float) -> int:
+    if bound == 0:
+        return 0
+    return (1 if bound > 0 else -1) * max(1, round(abs(bound) * factor))
+
+
+def _file_stamp(path: Path) -> Tuple[int, int]:
+    stat = path.stat()
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def _concat_answers(chunks: List[Any], n: int) -> Any:
+    """Concatenate per-round answer arrays (or FractionArrays) and keep the first n."""
+    if chunks and isinstance(chunks[0], FractionArray):
+        return FractionArray(
+            np.concatenate([c.numerator for c in chunks])[:n],
+            np.concatenate([c.denominator for c in chunks])[:n],
+        )
+    return np.concatenate(chunks)[:n] if chunks else np.empty(0)
+
+
+# Per-process factory for generate_many(use_processes=True)
+_worker_factory: ItemFactory | None = None
+
+
+def _init_worker_factory(templates_dir: str):
+    global _worker_factory
+    _worker_factory = ItemFactory(templates_dir)
+
+
+def _generate_in_worker(template_id: str, seed: int) -> Dict[str, Any]:
+    return _worker_factory.generate_item(template_id, seed)
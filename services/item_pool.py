@@ -0,0 +1,189 @@
+import random
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Iterable, List, Tuple
+
+from services.item_factory import ItemFactory
+
+
+PoolKey = Tuple[str, int]
+
+
+class ItemPool:
+    """Pre-generated items per (template_id, difficulty), refilled in the background.
+
+    `get` is an O(1) pop from a deque. When a pool drops below `low_water` it is
+    queued for the refill worker, which tops it back up to `target_size`. A miss
+    (empty pool, or the worker not started) falls back to inline generation.
+
+    A pool for a difficulty other than the template's own holds items
+    generated at that level (ItemFactory.template_at_level), with their own
+    ids, so the level the answer token carries is the level actually served.
+    """
+
+    def __init__(self, item_factory: ItemFactory, target_size: int = 50, low_water: int = 10,
+                 max_failures: int = 20):
+        if low_water > target_size:
+            raise ValueError("low_water cannot exceed target_size")
+        self.item_factory = item_factory
+        self.target_size = target_size
+        self.low_water = low_water
+        self.max_failures = max_failures  # Consecutive errors before a refill round gives up
+        self.pools: Dict[PoolKey, Deque[Dict[str, Any]]] = {}
+        self._seed_rng = random.Random()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._pending: Dict[PoolKey, None] = {}  # Insertion-ordered set of keys to refill
+        self._worker: threading.Thread | None = None
+        self._running = False
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "refills": 0,
+            "items_generated": 0,
+            "generation_errors": 0,
+            "refill_seconds_total": 0.0,
+            "refill_seconds_last": 0.0,
+            "refill_seconds_max": 0.0,
+        }
+        item_factory.add_reload_listener(self.invalidate)
+
+    def key_for(self, template_id: str, difficulty: int | None = None) -> PoolKey:
+        """Resolve the pool key, defaulting to the template's own difficulty."""
+        if difficulty is None:
+            template = self.item_factory.templates_cache.get(template_id)
+            if template is None:
+                raise ValueError(f"Template {template_id} not found")
+            difficulty = template["difficulty"]
+        return (template_id, difficulty)
+
+    def get(self, template_id: str, difficulty: int | None = None) -> Dict[str, Any]:
+        """Pop a ready item, generating inline on a miss."""
+        key = self.key_for(template_id, difficulty)
+        with self._lock:
+            pool = self.pools.setdefault(key, deque())
+            item = pool.popleft() if pool else None
+            self._stats["hits" if item is not None else "misses"] += 1
+            if len(pool) < self.low_water:
+                self._request_refill(key)
+
+        if item is None:
+            item = self._generate(key)
+        return item
+
+    def prime(self, template_ids: List[str] | None = None):
+        """Synchronously fill pools to target size (e.g. before serving traffic)."""
+        if template_ids is None:
+            template_ids = list(self.item_factory.templates_cache.keys())
+        for template_id in template_ids:
+            self._refill(self.key_for(template_id))
+
+    def start(self, template_ids: List[str] | None = None):
+        """Start the background refill worker and queue an initial fill."""
+        if template_ids is None:
+            template_ids = list(self.item_factory.templates_cache.keys())
+        with self._lock:
+            for template_id in template_ids:
+                key = self.key_for(template_id)
+                self.pools.setdefault(key, deque())
+                self._request_refill(key)
+            if self._running:
+                return
+            self._running = True
+        self._worker = threading.Thread(target=self._run, name="item-pool-refill", daemon=True)
+        self._worker.start()
+
+    def stop(self, timeout: float | None = 5.0):
+        """Stop the refill worker; items already pooled stay available."""
+        with self._lock:
+            self._running = False
+            self._wakeup.notify_all()
+        if self._worker is not None:
+            self._worker.join(timeout)
+            self._worker = None
+
+    def invalidate(self, template_ids: Iterable[str]):
+        """Drop pooled items for changed templates and queue fresh ones."""
+        template_ids = set(template_ids)
+        with self._lock:
+            for key in [k for k in self.pools if k[0] in template_ids]:
+                self.pools[key] = deque()
+                self._pending.pop(key, None)
+                if key[0] in self.item_factory.templates_cache and self._running:
+                    self._request_refill(key)
+                elif key[0] not in self.item_factory.templates_cache:
+                    del self.pools[key]
+
+    def depth(self) -> Dict[str, int]:
+        """Current number of ready items per pool."""
+        with self._lock:
+            # Snapshot first: the refill thread and get() add keys concurrently
+            pools = list(self.pools.items())
+        return {f"{template_id}@{difficulty}": len(pool) for (template_id, difficulty), pool in pools}
+
+    def stats(self) -> Dict[str, Any]:
+        """Pool depth plus hit/miss and refill-latency counters, for sizing."""
+        with self._lock:
+            stats = dict(self._stats)
+            pending = len(self._pending)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else None
+        stats["refill_seconds_per_item"] = (
+            stats["refill_seconds_total"] / stats["items_generated"] if stats["items_generated"] else None
+        )
+        stats["pending_refills"] = pending
+        stats["target_size"] = self.target_size
+        stats["low_water"] = self.low_water
+        stats["depth"] = self.depth()
+        stats["item_cache"] = self.item_factory.item_cache.stats()
+        return stats
+
+    def _next_seed(self) -> int:
+        with self._lock:
+            return self._seed_rng.randint(1000, 999999)
+
+    def _generate(self, key: PoolKey) -> Dict[str, Any]:
+        template_id, difficulty = key
+        return self.item_factory.generate_item(template_id, self._next_seed(), difficulty)
+
+    def _request_refill(self, key: PoolKey):
+        # Caller holds self._lock
+        self._pending[key] = None
+        self._wakeup.notify()
+
+    def _run(self):
+        while True:
+            with self._lock:
+                while self._running and not self._pending:
+                    self._wakeup.wait()
+                if not self._running:
+                    return
+                key = next(iter(self._pending))
+                del self._pending[key]
+            self._refill(key)
+
+    def _refill(self, key: PoolKey):
+        """Top a pool up to target size, recording latency and errors."""
+        with self._lock:
+            pool = self.pools.setdefault(key, deque())
+        started = time.perf_counter()
+        generated = 0
+        failures = 0
+        while len(pool) < self.target_size and failures < self.max_failures:
+            try:
+                pool.append(self._generate(key))
+                generated += 1
+                failures = 0
+            except Exception:
+                failures += 1
+                with self._lock:
+                    self._stats["generation_errors"] += 1
+        elapsed = time.perf_counter() - started
+
+        with self._lock:
+            self._stats["refills"] += 1
+            self._stats["items_generated"] += generated
+            self._stats["refill_seconds_total"] += elapsed
+            self._stats["refill_seconds_last"] = elapsed
+            self._stats["refill_seconds_max"] = max(self._stats["refill_seconds_max"], elapsed)
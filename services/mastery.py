@@ -1,7 +1,26 @@
-from typing import Dict, Any, List
-from dataclasses import dataclass
-from datetime import datetime, timedelta
+from typing import Callable, Dict, Any, Iterable, List, Tuple
+from dataclasses import dataclass, field
+from datetime import datetime
+import contextlib
 import math
+import threading
+import time
+
+import numpy as np
+
+from services.attempt_log import AttemptLog
+from services.difficulty import DifficultyRules
+from services.forgetting import retention, review_due
+from services.mastery_backfill import AttemptHistory, backfill
+from services.mastery_store import EMPTY_CELL, MasteryBackend, MasteryCell, MasteryStore
+
+
+# Learner used when a request does not identify one (single-user dev setups)
+DEFAULT_LEARNER = "me"
+STREAK_MAX = np.iinfo(np.uint16).max
+
+# Called as listener(learner_id, teks, previous, cell) after a cell changes; None = no cell
+MasteryListener = Callable[[str, str, MasteryCell | None, MasteryCell | None], None]
 
 
 @dataclass
@@ -11,83 +30,293 @@ class MasteryRecord:
     attempts: int
     last_seen_at: datetime
     due_review_at: datetime | None = None
+    correct_streak: int = 0
+    incorrect_streak: int = 0
+    difficulty: int = 2  # Level of the next item
+    # score decayed by the forgetting curve up to the time of the read
+    effective_score: float | None = field(default=None, compare=False)
+
+    def __post_init__(self):
+        if self.effective_score is None:
+            self.effective_score = self.score
 
 
 class MasteryService:
-    def __init__(self, alpha: float = 0.2, threshold: float = 0.83, min_items: int = 15):
+    """EWMA mastery per (learner, TEKS), kept in a MasteryBackend.
+
+    The default backend is the in-memory columnar MasteryStore; an
+    SqliteMasteryStore persists state on its own. MasteryRecord is only a
+    read view built on demand. Writes go through one lock; reads take it
+    too unless the backend supports concurrent reads.
+
+    With an AttemptLog, every update is appended to the log (and, with
+    durable=True, waits for its group commit) and the store is snapshotted
+    every `snapshot_every` attempts; `recover` loads the snapshot and replays
+    only the log tail after it.
+
+    Scores decay with a forgetting curve (half-life `half_life_days`, None
+    disables it). Only (score, last_seen) are stored; reads compute the
+    effective score in O(1), each attempt starts from the score decayed to
+    its answer time, and the review due date is fixed when a cell is
+    written, so idle learners are never touched.
+
+    Each cell also carries the adaptive difficulty level of the skill's
+    next item, stepped by `difficulty_rules` from the stored streaks, so
+    choosing a difficulty is one cell read however long the history is.
+    """
+
+    def __init__(self, alpha: float = 0.2, threshold: float = 0.83, min_items: int = 15,
+                 store: MasteryBackend | None = None, log: AttemptLog | None = None,
+                 snapshot_every: int = 100_000, durable: bool = True,
+                 half_life_days: float | None = 30.0, difficulty_rules: DifficultyRules = DifficultyRules()):
+        if log is not None and store is not None and not isinstance(store, MasteryStore):
+            raise ValueError("The attempt log snapshots the in-memory MasteryStore only")
         self.alpha = alpha  # EWMA smoothing factor
         self.threshold = threshold  # Mastery threshold
         self.min_items = min_items  # Minimum items before mastery
-        self.mastery_records: Dict[str, MasteryRecord] = {}
+        self.half_life_days = half_life_days  # Forgetting-curve half-life
+        self.difficulty_rules = difficulty_rules
+        self.store = store if store is not None else MasteryStore()
+        self.log = log
+        self.snapshot_path = log.log_dir / "mastery-snapshot.npz" if log is not None else None
+        self.snapshot_every = snapshot_every
+        self.durable = durable
+        self._lock = threading.Lock()
+        self._snapshot_seq = 0
+        self._snapshot_thread: threading.Thread | None = None
+        self.listeners: List[MasteryListener] = []
+    
+    def add_listener(self, listener: MasteryListener):
+        """Call listener after every cell change (under the service lock, so keep it O(1))."""
+        self.listeners.append(listener)
     
-    def update_mastery(self, teks: str, correct: bool, difficulty: int = 2) -> Dict[str, Any]:
+    @property
+    def _read_lock(self):
+        return contextlib.nullcontext() if self.store.concurrent_reads else self._lock
+    
+    def update_mastery(self, teks: str, correct: bool, difficulty: int = 2,
+                       learner_id: str = DEFAULT_LEARNER) -> Dict[str, Any]:
         """Update mastery score using EWMA and return mastery info."""
-        if teks not in self.mastery_records:
-            self.mastery_records[teks] = MasteryRecord(
-                teks=teks,
-                score=0.0,
-                attempts=0,
-                last_seen_at=datetime.now()
-            )
+        now = datetime.now()
+        with self._lock:
+            info = self._apply(learner_id, teks, correct, difficulty, now)
+            seq = self._log(learner_id, teks, correct, difficulty, now)
+        self._after_logged(seq)
+        return info
+    
+    def update_mastery_batch(self, updates: Iterable[Tuple[str, bool, int, datetime | None]],
+                             learner_id: str = DEFAULT_LEARNER) -> List[Dict[str, Any]]:
+        """Apply many (teks, correct, difficulty, answered_at) updates under one lock.
         
-        record = self.mastery_records[teks]
-        record.attempts += 1
-        record.last_seen_at = datetime.now()
+        Updates are applied in answered_at order (missing timestamps count as
+        now; ties keep submission order), so each skill's EWMA sees attempts in
+        the order they happened. Results are returned in input order.
+        """
+        now = datetime.now()
+        updates = [(teks, correct, difficulty, answered_at or now) for teks, correct, difficulty, answered_at in updates]
+        order = sorted(range(len(updates)), key=lambda i: updates[i][3])
+        results: List[Dict[str, Any]] = [None] * len(updates)
+        seq = None
+        with self._lock:
+            for i in order:
+                results[i] = self._apply(learner_id, *updates[i])
+                seq = self._log(learner_id, *updates[i])
+        self._after_logged(seq)
+        return results
+    
+    def recover(self) -> Dict[str, Any]:
+        """Rebuild state from the latest snapshot plus the log tail after it."""
+        if self.log is None:
+            return {"snapshot_seq": None, "replayed": 0}
+        with self._lock:
+            if self.snapshot_path.exists():
+                self.store, self._snapshot_seq = MasteryStore.load(self.snapshot_path)
+            replayed = 0
+            for attempt in self.log.replay(self._snapshot_seq):
+                self._apply(attempt.learner_id, attempt.teks, attempt.correct, attempt.difficulty,
+                            datetime.fromtimestamp(attempt.answered_at))
+                replayed += 1
+        return {"snapshot_seq": self._snapshot_seq, "replayed": replayed}
+    
+    def rebuild(self, history: AttemptHistory, alpha: float | None = None, threshold: float | None = None,
+                min_items: int | None = None) -> int:
+        """Recompute every learner's mastery from history, optionally with new parameters.
+        
+        The history replaces the in-memory store outright; other backends
+        only get the cells the history mentions overwritten. Listeners are
+        told about every changed cell. Returns the number of cells
+        recomputed. With an attempt log, a snapshot of the result is written
+        right away so that recovery starts from the rebuilt scores.
+        """
+        with self._lock:
+            # Under the lock: updates arriving meanwhile wait instead of being overwritten
+            rebuilt = backfill(history, self.alpha if alpha is None else alpha,
+                               self.threshold if threshold is None else threshold, self.half_life_days,
+                               difficulty_rules=self.difficulty_rules)
+            if alpha is not None:
+                self.alpha = alpha
+            if threshold is not None:
+                self.threshold = threshold
+            if min_items is not None:
+                self.min_items = min_items
+            previous = self.store
+            if isinstance(self.store, MasteryStore):
+                self.store = rebuilt
+                if self.listeners:
+                    for learner_id in previous.learner_ids:
+                        for teks, cell in previous.learner_cells(learner_id):
+                            if rebuilt.read(learner_id, teks) is None:
+                                self._notify(learner_id, teks, cell, None)
+            for learner_id in rebuilt.learner_ids:
+                for teks, cell in rebuilt.learner_cells(learner_id):
+                    before = previous.read(learner_id, teks) if self.listeners else None
+                    if previous is self.store:
+                        self.store.write(learner_id, teks, cell)
+                    self._notify(learner_id, teks, before, cell)
+        if self.log is not None:
+            self.snapshot()
+        return len(rebuilt)
+    
+    def snapshot(self) -> int:
+        """Write a snapshot of the store and drop log segments it covers."""
+        with self._lock:
+            seq = self.log.rotate()
+            store = self.store.copy()
+        # Disk I/O happens on the copy, outside the lock
+        store.save(self.snapshot_path, seq)
+        self._snapshot_seq = seq
+        self.log.compact(seq)
+        return seq
+    
+    def _log(self, learner_id: str, teks: str, correct: bool, difficulty: int, seen_at: datetime) -> int | None:
+        # Caller holds self._lock, so log order matches apply order
+        if self.log is None:
+            return None
+        return self.log.append(learner_id, teks, correct, difficulty, seen_at.timestamp())
+    
+    def _after_logged(self, seq: int | None):
+        if seq is None:
+            return
+        if self.durable:
+            self.log.wait(seq)
+        if seq + 1 - self._snapshot_seq >= self.snapshot_every:
+            with self._lock:
+                if self._snapshot_thread is not None and self._snapshot_thread.is_alive():
+                    return
+                self._snapshot_thread = threading.Thread(target=self.snapshot, name="mastery-snapshot", daemon=True)
+                self._snapshot_thread.start()
+    
+    def _apply(self, learner_id: str, teks: str, correct: bool, difficulty: int,
+               seen_at: datetime) -> Dict[str, Any]:
+        # Caller holds self._lock
+        previous = self.store.read(learner_id, teks)
+        cell = previous or EMPTY_CELL
+        attempts = cell.attempts + 1
+        seen = int(seen_at.timestamp())
+        last_seen = max(cell.last_seen, seen)
+        if correct:
+            correct_streak, incorrect_streak = min(cell.correct_streak + 1, STREAK_MAX), 0
+        else:
+            correct_streak, incorrect_streak = 0, min(cell.incorrect_streak + 1, STREAK_MAX)
         
-        # EWMA update: new_score = alpha * observation + (1 - alpha) * old_score
+        # EWMA update from the score as decayed up to this attempt:
+        # new_score = alpha * observation + (1 - alpha) * old_score * retention
+        prior = cell.score * retention(seen - cell.last_seen, self.half_life_days)
         observation = 1.0 if correct else 0.0
-        record.score = self.alpha * observation + (1 - self.alpha) * record.score
+        score = float(np.float32(self.alpha * observation + (1 - self.alpha) * prior))
+        mastery_delta = score - prior
         
-        # Calculate mastery delta
-        old_score = record.score - (self.alpha * observation - self.alpha * record.score)
-        mastery_delta = record.score - old_score
+        # Review tomorrow if not mastered, else when the decayed score drops below threshold
+        due_review = review_due(score, last_seen, self.threshold, self.half_life_days)
+        due_review_at = datetime.fromtimestamp(due_review) if due_review else None
         
-        # Set review date if not mastered
-        if record.score < self.threshold:
-            record.due_review_at = datetime.now() + timedelta(days=1)
-        else:
-            record.due_review_at = None
+        # Step the stored level; `difficulty` is only the level this item was served at
+        level = self.difficulty_rules.step(cell.difficulty or self.difficulty_rules.start, correct,
+                                           correct_streak, incorrect_streak)
         
+        updated = MasteryCell(score, attempts, last_seen, due_review, correct_streak, incorrect_streak, level)
+        self.store.write(learner_id, teks, updated)
+        self._notify(learner_id, teks, previous, updated)
         return {
-            "score": record.score,
-            "attempts": record.attempts,
+            "score": score,
+            "attempts": attempts,
             "mastery_delta": mastery_delta,
-            "is_mastered": record.score >= self.threshold and record.attempts >= self.min_items,
-            "due_review_at": record.due_review_at
+            "is_mastered": score >= self.threshold and attempts >= self.min_items,
+            "due_review_at": due_review_at,
+            "difficulty": level
         }
     
-    def get_mastery(self, teks: str) -> MasteryRecord | None:
+    def get_mastery(self, teks: str, learner_id: str = DEFAULT_LEARNER) -> MasteryRecord | None:
         """Get mastery record for a TEKS."""
-        return self.mastery_records.get(teks)
+        with self._read_lock:
+            cell = self.store.read(learner_id, teks)
+        return self._record(teks, cell, time.time()) if cell is not None else None
     
-    def get_all_mastery(self) -> List[MasteryRecord]:
+    def get_all_mastery(self, learner_id: str = DEFAULT_LEARNER) -> List[MasteryRecord]:
         """Get all mastery records."""
-        return list(self.mastery_records.values())
+        with self._read_lock:
+            cells = self.store.learner_cells(learner_id)
+        now = time.time()
+        return [self._record(teks, cell, now) for teks, cell in cells]
     
-    def get_skills_needing_review(self) -> List[str]:
+    def get_skills_needing_review(self, learner_id: str = DEFAULT_LEARNER) -> List[str]:
         """Get TEKS codes that are due for review."""
-        now = datetime.now()
-        return [
-            record.teks for record in self.mastery_records.values()
-            if record.due_review_at and record.due_review_at <= now
-        ]
+        now = int(datetime.now().timestamp())
+        with self._read_lock:
+            return self.store.due_skills(learner_id, now)
+    
+    def get_learners_due_for_review(self, teks: str, now: datetime | None = None) -> List[str]:
+        """Every learner whose review of teks is due (one vectorized column scan)."""
+        moment = int((now or datetime.now()).timestamp())
+        with self._read_lock:
+            return self.store.learners_due(teks, moment)
+    
+    def get_difficulty(self, teks: str, learner_id: str = DEFAULT_LEARNER) -> int:
+        """Difficulty level of the learner's next item in teks (one cell read)."""
+        with self._read_lock:
+            cell = self.store.read(learner_id, teks)
+        return cell.difficulty if cell is not None and cell.difficulty else self.difficulty_rules.start
     
-    def get_mastery_level(self, teks: str) -> str:
+    def get_mastery_level(self, teks: str, learner_id: str = DEFAULT_LEARNER) -> str:
         """Get human-readable mastery level."""
-        record = self.get_mastery(teks)
+        return self.mastery_level(self.get_mastery(teks, learner_id))
+    
+    def mastery_level(self, record: MasteryRecord | None) -> str:
+        """Level of an already-read record, from its decayed score."""
         if not record:
             return "not_started"
         
-        if record.score >= self.threshold and record.attempts >= self.min_items:
+        score = record.effective_score
+        if score >= self.threshold and record.attempts >= self.min_items:
             return "mastered"
-        elif record.score >= 0.6:
+        elif score >= 0.6:
             return "developing"
-        elif record.score >= 0.3:
+        elif score >= 0.3:
             return "beginning"
         else:
             return "struggling"
     
-    def reset_mastery(self, teks: str):
+    def reset_mastery(self, teks: str, learner_id: str = DEFAULT_LEARNER):
         """Reset mastery for a TEKS (for testing)."""
-        if teks in self.mastery_records:
-            del self.mastery_records[teks]
+        with self._lock:
+            previous = self.store.read(learner_id, teks)
+            self.store.clear(learner_id, teks)
+            if previous is not None:
+                self._notify(learner_id, teks, previous, None)
+    
+    def _notify(self, learner_id: str, teks: str, previous: MasteryCell | None, cell: MasteryCell | None):
+        for listener in self.listeners:
+            listener(learner_id, teks, previous, cell)
+    
+    def _record(self, teks: str, cell: MasteryCell, now: float) -> MasteryRecord:
+        return MasteryRecord(
+            teks=teks,
+            score=cell.score,
+            attempts=cell.attempts,
+            last_seen_at=datetime.fromtimestamp(cell.last_seen),
+            due_review_at=datetime.fromtimestamp(cell.due_review) if cell.due_review else None,
+            correct_streak=cell.correct_streak,
+            incorrect_streak=cell.incorrect_streak,
+            difficulty=cell.difficulty or self.difficulty_rules.start,
+            effective_score=cell.score * retention(now - cell.last_seen, self.half_life_days),
+        )
@@ -0,0 +1,203 @@
+import time
+from array import array
+from typing import Dict, Iterable, List, NamedTuple, Tuple
+
+import numpy as np
+
+from services.attempt_log import AttemptLog
+from services.difficulty import DifficultyRules
+from services.forgetting import DAY_SECONDS
+from services.mastery_store import COLUMNS, SKILL_BITS, SKILL_LIMIT, MasteryStore
+
+
+LEVELS = np.array(["not_started", "struggling", "beginning", "developing", "mastered"])
+
+
+class AttemptHistory(NamedTuple):
+    """Attempts as parallel arrays; learners and skills are codes into the id lists."""
+    learner: np.ndarray  # int64 index into learner_ids
+    skill: np.ndarray  # int64 index into skill_ids
+    answered_at: np.ndarray  # float64 epoch seconds
+    correct: np.ndarray  # bool
+    difficulty: np.ndarray  # uint8
+    learner_ids: List[str]
+    skill_ids: List[str]
+
+    @property
+    def size(self) -> int:
+        return len(self.correct)
+
+    @classmethod
+    def from_records(cls, records: Iterable[Tuple[str, str, bool, int, float]]) -> "AttemptHistory":
+        """Encode (learner_id, teks, correct, difficulty, answered_at) records."""
+        learner_codes: Dict[str, int] = {}
+        skill_codes: Dict[str, int] = {}
+        learner, skill = array("q"), array("q")
+        answered_at, correct, difficulty = array("d"), array("B"), array("B")
+        for learner_id, teks, was_correct, level, moment in records:
+            learner.append(learner_codes.setdefault(learner_id, len(learner_codes)))
+            skill.append(skill_codes.setdefault(teks, len(skill_codes)))
+            correct.append(bool(was_correct))
+            difficulty.append(level)
+            answered_at.append(moment)
+        return cls(
+            np.frombuffer(learner, dtype=np.int64),
+            np.frombuffer(skill, dtype=np.int64),
+            np.frombuffer(answered_at, dtype=np.float64),
+            np.frombuffer(correct, dtype=np.uint8).astype(bool),
+            np.frombuffer(difficulty, dtype=np.uint8),
+            list(learner_codes),
+            list(skill_codes),
+        )
+
+    @classmethod
+    def from_log(cls, log: AttemptLog, from_seq: int = 0) -> "AttemptHistory":
+        return cls.from_records(
+            (a.learner_id, a.teks, a.correct, a.difficulty, a.answered_at) for a in log.replay(from_seq)
+        )
+
+
+def backfill(history: AttemptHistory, alpha: float = 0.2, threshold: float = 0.83,
+             half_life_days: float | None = 30.0, store: MasteryStore | None = None,
+             difficulty_rules: DifficultyRules = DifficultyRules()) -> MasteryStore:
+    """Recompute mastery cells from an attempt history without a per-attempt loop.
+
+    Attempts are sorted by (learner, skill, answered_at); ties keep input
+    order, as in MasteryService.update_mastery_batch. Each attempt first
+    decays the score by the retention r(t) over the time since the previous
+    one, so starting from s0 last seen at t_0, the EWMA after n attempts
+    x_1..x_n at t_1..t_n is
+
+        (1 - alpha)^n * r(t_n - t_0) * s0 + alpha * sum_k (1 - alpha)^(n - k) * r(t_n - t_k) * x_k
+
+    (r(a) * r(b) = r(a + b) for an exponential curve), so every cell's score
+    is one weighted bincount over its segment.
+    Attempt counts, last_seen, due_review (forgetting.review_due) and
+    streaks come from segment sizes, ends and maximum.reduceat. Difficulty
+    levels replay only the attempts that step them (see _difficulty_levels).
+    With `store`, the history continues
+    the cells already in it; otherwise cells start empty. Scores are
+    computed in float64 and may differ from sequential float32 updates in
+    the last bits. Histories already in time order (as the attempt log
+    yields them) need only one stable sort by cell.
+    """
+    if store is None:
+        store = MasteryStore(skills=history.skill_ids)
+    if not history.size:
+        return store
+    learners = store.learner_codes(history.learner_ids)[history.learner]
+    skills = store.skill_codes(history.skill_ids)[history.skill]
+
+    # Segment attempts by cell, in time order within each cell
+    key = learners << SKILL_BITS | skills
+    if np.all(history.answered_at[1:] >= history.answered_at[:-1]):
+        # Already in time order (log order): one stable sort by cell keeps it
+        order = np.argsort(key, kind="stable")
+    else:
+        order = np.lexsort((history.answered_at, key))
+    key = key[order]
+    correct = history.correct[order]
+    answered_at = history.answered_at[order]
+    starts = np.flatnonzero(np.r_[True, key[1:] != key[:-1]])
+    sizes = np.diff(np.r_[starts, len(key)])
+    ends = starts + sizes - 1
+    segment = np.repeat(np.arange(len(starts)), sizes)
+    position = np.arange(len(key))
+    # Rows of the cells; new ones are appended in order of their first attempt
+    first_attempt = np.argsort(answered_at[starts], kind="stable")
+    cells = key[starts][first_attempt]
+    at = np.empty(len(starts), dtype=np.int64)
+    at[first_attempt] = store.cell_rows(cells >> SKILL_BITS, cells & (SKILL_LIMIT - 1))
+
+    # Cumulative-weight EWMA: weight (1 - alpha)^(attempts after this one),
+    # times the retention over the time from this attempt to the cell's last
+    decay = 1.0 - alpha
+    weights = decay ** (ends[segment] - position)
+    prior_weight = decay ** sizes
+    if half_life_days is not None:
+        # Clock per attempt as the sequential update sees it: last_seen never moves back
+        clock = np.maximum(answered_at.astype(np.int64), store.columns["last_seen"][at][segment])
+        half_lives = half_life_days * DAY_SECONDS
+        weights = weights * 0.5 ** ((clock[ends][segment] - clock) / half_lives)
+        prior_weight = prior_weight * 0.5 ** ((clock[ends] - store.columns["last_seen"][at]) / half_lives)
+    scores = alpha * np.bincount(segment, weights=weights * correct, minlength=len(starts))
+    scores += prior_weight * store.columns["score"][at]
+
+    last_at = answered_at[ends]
+    streak_max = np.iinfo(COLUMNS["correct_streak"]).max
+    last_wrong = np.maximum.reduceat(np.where(correct, -1, position), starts)
+    last_right = np.maximum.reduceat(np.where(correct, position, -1), starts)
+    correct_streak = np.where(last_wrong >= starts, ends - last_wrong,
+                              store.columns["correct_streak"][at] + sizes)
+    incorrect_streak = np.where(last_right >= starts, ends - last_right,
+                                store.columns["incorrect_streak"][at] + sizes)
+
+    levels = _difficulty_levels(difficulty_rules, correct, position, segment, starts,
+                                store.columns["correct_streak"][at], store.columns["incorrect_streak"][at],
+                                store.columns["difficulty"][at])
+
+    columns = store.columns
+    columns["score"][at] = scores
+    columns["attempts"][at] += sizes.astype(COLUMNS["attempts"])
+    columns["last_seen"][at] = np.maximum(columns["last_seen"][at], last_at.astype(np.int64))
+    # Same rule as forgetting.review_due, in float64 like the scalar version
+    score = columns["score"][at].astype(np.float64)
+    last_seen = columns["last_seen"][at]
+    if half_life_days is None or threshold <= 0:
+        decayed_at = np.zeros_like(last_seen)
+    else:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            decayed_at = last_seen + np.rint(half_life_days * DAY_SECONDS * np.log2(score / threshold)).astype(np.int64)
+    columns["due_review"][at] = np.where(score < threshold, last_seen + DAY_SECONDS, decayed_at)
+    columns["correct_streak"][at] = np.minimum(correct_streak, streak_max)
+    columns["incorrect_streak"][at] = np.minimum(incorrect_streak, streak_max)
+    columns["difficulty"][at] = levels
+    return store
+
+
+def _difficulty_levels(rules: DifficultyRules, correct: np.ndarray, position: np.ndarray, segment: np.ndarray,
+                       starts: np.ndarray, prior_correct: np.ndarray, prior_incorrect: np.ndarray,
+                       prior_level: np.ndarray) -> np.ndarray:
+    # Streak length at every attempt: position in its run of equal answers,
+    # plus the stored streak for a segment's first run
+    run_start = np.r_[True, (segment[1:] != segment[:-1]) | (correct[1:] != correct[:-1])]
+    run_first = np.maximum.accumulate(np.where(run_start, position, 0))
+    streak = position - run_first + 1
+    prior = np.where(correct[starts], prior_correct, prior_incorrect).astype(np.int64)
+    streak += np.where(run_first == starts[segment], prior[segment], 0)
+    step = (correct & (streak % rules.step_up_after == 0)).astype(np.int64)
+    step -= ~correct & (streak % rules.step_down_after == 0)
+
+    # Clamping makes steps order-dependent, so apply them round by round: the
+    # k-th step of every cell at once. Rounds = most steps in any one cell.
+    events = np.flatnonzero(step)
+    owner = segment[events]
+    rank = np.arange(len(events)) - np.searchsorted(owner, owner)
+    by_rank = events[np.argsort(rank, kind="stable")]
+    levels = np.where(prior_level > 0, prior_level, rules.start).astype(np.int64)
+    bounds = np.r_[0, np.cumsum(np.bincount(rank))] if len(events) else [0]
+    for lo, hi in zip(bounds[:-1], bounds[1:]):
+        batch = by_rank[lo:hi]
+        cells = segment[batch]
+        levels[cells] = np.clip(levels[cells] + step[batch], rules.min_difficulty, rules.max_difficulty)
+    return levels
+
+
+def mastery_levels(store: MasteryStore, threshold: float = 0.83, min_items: int = 15,
+                   half_life_days: float | None = 30.0, now: float | None = None) -> np.ndarray:
+    """Level name of every stored (learner, skill) row at `now`, as MasteryService.mastery_level gives it.
+
+    Rows line up with `store.row_learner` and `store.row_skill`.
+    """
+    count = store.rows
+    score = store.columns["score"][:count].astype(np.float64)
+    attempts = store.columns["attempts"][:count]
+    if half_life_days is not None:
+        elapsed = np.maximum((time.time() if now is None else now) - store.columns["last_seen"][:count], 0)
+        score *= 0.5 ** (elapsed / (half_life_days * DAY_SECONDS))
+    level = np.select(
+        [attempts == 0, (score >= threshold) & (attempts >= min_items), score >= 0.6, score >= 0.3],
+        [0, 4, 3, 2],
+        default=1,
+    )
+    return LEVELS[level]
@@ -0,0 +1,356 @@
+import os
+from pathlib import Path
+from typing import Dict, Iterator, List, NamedTuple, Tuple
+
+import numpy as np
+
+
+# Column name -> dtype; every column holds one value per (learner, skill) row
+COLUMNS: Dict[str, np.dtype] = {
+    "score": np.dtype(np.float32),
+    "attempts": np.dtype(np.uint32),
+    "last_seen": np.dtype(np.int64),  # Epoch seconds, 0 = never
+    "due_review": np.dtype(np.int64),  # Epoch seconds, 0 = no review scheduled
+    "correct_streak": np.dtype(np.uint16),
+    "incorrect_streak": np.dtype(np.uint16),
+    "difficulty": np.dtype(np.uint8),  # Level to serve next, 0 = not set yet
+}
+
+
+# Skill codes are packed below the learner code in row index keys
+SKILL_BITS = 16
+SKILL_LIMIT = 1 << SKILL_BITS
+
+
+class MasteryCell(NamedTuple):
+    """Stored mastery state of one (learner, skill); times are epoch seconds, 0 = unset."""
+    score: float
+    attempts: int
+    last_seen: int
+    due_review: int
+    correct_streak: int
+    incorrect_streak: int
+    difficulty: int = 0
+
+
+EMPTY_CELL = MasteryCell(0.0, 0, 0, 0, 0, 0, 0)
+
+
+class MasteryBackend:
+    """Storage interface behind MasteryService.
+
+    Implementations keep one MasteryCell per (learner_id, teks); a cell
+    with attempts == 0 counts as not started. MasteryService serializes
+    writes, and reads must see earlier writes. Backends that are safe to
+    read while a write is in progress set `concurrent_reads`, and
+    MasteryService then reads them without its lock.
+    """
+
+    concurrent_reads = False
+
+    def read(self, learner_id: str, teks: str) -> MasteryCell | None:
+        raise NotImplementedError
+
+    def write(self, learner_id: str, teks: str, cell: MasteryCell):
+        raise NotImplementedError
+
+    def learner_cells(self, learner_id: str) -> List[Tuple[str, MasteryCell]]:
+        """Started skills of a learner, in the order they were first attempted."""
+        raise NotImplementedError
+
+    def due_skills(self, learner_id: str, now: int) -> List[str]:
+        return [teks for teks, cell in self.learner_cells(learner_id) if 0 < cell.due_review <= now]
+
+    def learners_due(self, teks: str, now: int) -> List[str]:
+        """Learners with a review of teks due at or before `now` (epoch seconds)."""
+        raise NotImplementedError
+
+    def clear(self, learner_id: str, teks: str):
+        raise NotImplementedError
+
+    def scheduled_reviews(self) -> Iterator[Tuple[str, str, int]]:
+        """(learner_id, teks, due_review) of every cell with a review scheduled."""
+        raise NotImplementedError
+
+    def flush(self):
+        """Make buffered writes durable (no-op for synchronous backends)."""
+
+    def close(self):
+        self.flush()
+
+
+class MasteryStore(MasteryBackend):
+    """Per-learner mastery state in NumPy columns, one row per started cell.
+
+    Each (learner_id, teks) pair a learner has touched gets a row, appended
+    in first-attempt order; learners and skills are stored as integer codes
+    in two more columns. A dict maps the packed (learner, skill) codes to a
+    row, so reads and writes are O(1) and update in place, and a whole-skill
+    query ("who is due for review in 6.8B?") is one vectorized mask over
+    the skill column. A learner's rows are chained through `row_next` so
+    listing them never scans other learners. Untouched cells take no space:
+    a row is 37 bytes of columns plus about 100 bytes of index entry, and
+    capacity doubles as rows are added. attempts == 0 means the learner has
+    not started that skill (or it was cleared). Not thread-safe: callers
+    serialize writes (MasteryService holds a lock).
+    """
+
+    def __init__(self, initial_rows: int = 1024, skills: List[str] | None = None):
+        self.learner_index: Dict[str, int] = {}
+        self.learner_ids: List[str] = []
+        self.skill_index: Dict[str, int] = {}
+        self.skill_ids: List[str] = []
+        self.row_index: Dict[int, int] = {}  # learner code << SKILL_BITS | skill code -> row
+        self.rows = 0
+        capacity = max(1, initial_rows)
+        self.columns: Dict[str, np.ndarray] = {name: np.zeros(capacity, dtype=dtype) for name, dtype in COLUMNS.items()}
+        self.row_learner = np.zeros(capacity, dtype=np.int32)
+        self.row_skill = np.zeros(capacity, dtype=np.uint16)
+        self.row_next = np.full(capacity, -1, dtype=np.int32)  # Learner's next row, -1 = last
+        self.learner_first = np.full(0, -1, dtype=np.int32)
+        self.learner_last = np.full(0, -1, dtype=np.int32)
+        for teks in skills or []:
+            self.skill_code(teks)
+
+    def __len__(self) -> int:
+        """Number of started (learner, skill) cells."""
+        return int(np.count_nonzero(self.columns["attempts"][:self.rows]))
+
+    @property
+    def capacity(self) -> int:
+        return len(self.row_learner)
+
+    def learner_code(self, learner_id: str, create: bool = True) -> int | None:
+        code = self.learner_index.get(learner_id)
+        if code is None and create:
+            code = int(self.learner_codes([learner_id])[0])
+        return code
+
+    def skill_code(self, teks: str, create: bool = True) -> int | None:
+        code = self.skill_index.get(teks)
+        if code is None and create:
+            code = int(self.skill_codes([teks])[0])
+        return code
+
+    def learner_codes(self, learner_ids: List[str]) -> np.ndarray:
+        """Codes of many learners, adding missing ones."""
+        for learner_id in learner_ids:
+            if learner_id not in self.learner_index:
+                self.learner_index[learner_id] = len(self.learner_ids)
+                self.learner_ids.append(learner_id)
+        if len(self.learner_ids) > len(self.learner_first):
+            size = max(len(self.learner_ids), 2 * len(self.learner_first), 1024)
+            self.learner_first = _grown(self.learner_first, size, -1)
+            self.learner_last = _grown(self.learner_last, size, -1)
+        return np.array([self.learner_index[learner_id] for learner_id in learner_ids], dtype=np.int64)
+
+    def skill_codes(self, skills: List[str]) -> np.ndarray:
+        """Codes of many skills, adding missing ones."""
+        for teks in skills:
+            if teks not in self.skill_index:
+                if len(self.skill_ids) >= SKILL_LIMIT:
+                    raise ValueError(f"A MasteryStore holds at most {SKILL_LIMIT} skills")
+                self.skill_index[teks] = len(self.skill_ids)
+                self.skill_ids.append(teks)
+        return np.array([self.skill_index[teks] for teks in skills], dtype=np.int64)
+
+    def row(self, learner_id: str, teks: str, create: bool = True) -> int | None:
+        """Row of a (learner, skill) cell, appending one if needed."""
+        learner = self.learner_code(learner_id, create)
+        skill = self.skill_code(teks, create)
+        if learner is None or skill is None:
+            return None
+        row = self.row_index.get(learner << SKILL_BITS | skill)
+        if row is None and create:
+            row = int(self.cell_rows(np.array([learner]), np.array([skill]))[0])
+        return row
+
+    def cell_rows(self, learners: np.ndarray, skills: np.ndarray) -> np.ndarray:
+        """Rows of many cells given as learner and skill codes.
+
+        Missing cells are appended in the order given (growing the columns
+        at most once), so pass them in first-attempt order.
+        """
+        keys = (learners.astype(np.int64) << SKILL_BITS | skills).tolist()
+        rows = [self.row_index.get(key, -1) for key in keys]
+        missing = [i for i, row in enumerate(rows) if row < 0]
+        if missing:
+            added: List[int] = []
+            for i in missing:
+                row = self.row_index.get(keys[i])
+                if row is None:  # Not added by an earlier duplicate in this call
+                    row = self.row_index[keys[i]] = self.rows + len(added)
+                    added.append(keys[i])
+                rows[i] = row
+            self._append(np.array(added, dtype=np.int64))
+        return np.array(rows, dtype=np.int64)
+
+    def learner_row_list(self, learner_id: str) -> List[int]:
+        """Rows of a learner in first-attempt order, started or not."""
+        code = self.learner_index.get(learner_id)
+        rows = []
+        row = int(self.learner_first[code]) if code is not None else -1
+        while row >= 0:
+            rows.append(row)
+            row = int(self.row_next[row])
+        return rows
+
+    def read(self, learner_id: str, teks: str) -> MasteryCell | None:
+        row = self.row(learner_id, teks, create=False)
+        if row is None or not self.columns["attempts"][row]:
+            return None
+        return self._cell_at(row)
+
+    def write(self, learner_id: str, teks: str, cell: MasteryCell):
+        row = self.row(learner_id, teks)
+        for name, value in zip(MasteryCell._fields, cell):
+            self.columns[name][row] = value
+
+    def learner_cells(self, learner_id: str) -> List[Tuple[str, MasteryCell]]:
+        attempts = self.columns["attempts"]
+        return [(self.skill_ids[self.row_skill[row]], self._cell_at(row))
+                for row in self.learner_row_list(learner_id) if attempts[row]]
+
+    def due_skills(self, learner_id: str, now: int) -> List[str]:
+        due = self.columns["due_review"]
+        return [self.skill_ids[self.row_skill[row]] for row in self.learner_row_list(learner_id)
+                if 0 < due[row] <= now]
+
+    def started_skills(self, learner_id: str) -> List[str]:
+        attempts = self.columns["attempts"]
+        return [self.skill_ids[self.row_skill[row]] for row in self.learner_row_list(learner_id) if attempts[row]]
+
+    def clear(self, learner_id: str, teks: str):
+        # The row stays (and keeps its place in the learner's order) for a later restart
+        row = self.row(learner_id, teks, create=False)
+        if row is not None:
+            for column in self.columns.values():
+                column[row] = 0
+
+    def learners_due(self, teks: str, now: int) -> List[str]:
+        """Learners with a review of teks due at or before `now` (epoch seconds)."""
+        skill = self.skill_index.get(teks)
+        if skill is None:
+            return []
+        due = self.columns["due_review"][:self.rows]
+        rows = np.flatnonzero((self.row_skill[:self.rows] == skill) & (due > 0) & (due <= now))
+        return [self.learner_ids[learner] for learner in self.row_learner[rows].tolist()]
+
+    def scheduled_reviews(self) -> Iterator[Tuple[str, str, int]]:
+        due = self.columns["due_review"][:self.rows]
+        rows = np.flatnonzero(due)
+        for learner, skill, at in zip(self.row_learner[rows].tolist(), self.row_skill[rows].tolist(),
+                                      due[rows].tolist()):
+            yield self.learner_ids[learner], self.skill_ids[skill], at
+
+    def nbytes(self) -> int:
+        """Bytes held by the column arrays (excluding the id and row indexes)."""
+        arrays = [*self.columns.values(), self.row_learner, self.row_skill, self.row_next,
+                  self.learner_first, self.learner_last]
+        return sum(array.nbytes for array in arrays)
+
+    def copy(self) -> "MasteryStore":
+        """Independent copy trimmed to the used rows (e.g. to snapshot outside a lock)."""
+        used = max(1, self.rows)
+        clone = MasteryStore(initial_rows=0)
+        clone.learner_ids = list(self.learner_ids)
+        clone.learner_index = dict(self.learner_index)
+        clone.skill_ids = list(self.skill_ids)
+        clone.skill_index = dict(self.skill_index)
+        clone.row_index = dict(self.row_index)
+        clone.rows = self.rows
+        clone.columns = {name: column[:used].copy() for name, column in self.columns.items()}
+        clone.row_learner = self.row_learner[:used].copy()
+        clone.row_skill = self.row_skill[:used].copy()
+        clone.row_next = self.row_next[:used].copy()
+        clone.learner_first = self.learner_first.copy()
+        clone.learner_last = self.learner_last.copy()
+        return clone
+
+    def save(self, path: str | Path, seq: int):
+        """Write a compact snapshot (columns trimmed to used rows) tagged with a log position."""
+        path = Path(path)
+        count = self.rows
+        tmp = path.with_name(path.name + ".tmp")
+        with open(tmp, "wb") as f:
+            np.savez(
+                f,
+                seq=np.int64(seq),
+                learner_ids=np.array(self.learner_ids, dtype=str),
+                skill_ids=np.array(self.skill_ids, dtype=str),
+                row_learner=self.row_learner[:count],
+                row_skill=self.row_skill[:count],
+                **{name: column[:count] for name, column in self.columns.items()},
+            )
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str | Path) -> Tuple["MasteryStore", int]:
+        """Read a snapshot written by save; returns (store, log position)."""
+        with np.load(path, allow_pickle=False) as data:
+            learner_ids = data["learner_ids"].tolist()
+            store = cls(initial_rows=max(1024, len(data["score"].ravel())))
+            store.learner_codes(learner_ids)
+            store.skill_codes(data["skill_ids"].tolist())
+            columns = {name: data[name] for name in COLUMNS if name in data}
+            if "row_learner" in data:
+                learners, skills = data["row_learner"], data["row_skill"]
+            else:
+                # Dense (learners x skills) snapshot of an older version: keep its started cells
+                learners, skills = np.nonzero(data["attempts"])
+                columns = {name: column[learners, skills] for name, column in columns.items()}
+            rows = store.cell_rows(learners, skills)
+            for name, column in columns.items():
+                # Snapshots from before a column existed leave it zeroed
+                store.columns[name][rows] = column
+            return store, int(data["seq"])
+
+    def _cell_at(self, row: int) -> MasteryCell:
+        columns = self.columns
+        return MasteryCell(
+            float(columns["score"][row]),
+            int(columns["attempts"][row]),
+            int(columns["last_seen"][row]),
+            int(columns["due_review"][row]),
+            int(columns["correct_streak"][row]),
+            int(columns["incorrect_streak"][row]),
+            int(columns["difficulty"][row]),
+        )
+
+    def _append(self, keys: np.ndarray):
+        """Fill in rows for new index keys (already numbered from self.rows on)."""
+        if self.rows + len(keys) > self.capacity:
+            self._resize(max(self.rows + len(keys), self.capacity * 2))
+        added = np.arange(self.rows, self.rows + len(keys))
+        self.rows += len(keys)
+        learners = keys >> SKILL_BITS
+        self.row_learner[added] = learners
+        self.row_skill[added] = keys & (SKILL_LIMIT - 1)
+        # Chain each learner's new rows in order, after the learner's current last row
+        order = np.argsort(learners, kind="stable")
+        by_learner, chained = learners[order], added[order]
+        same = by_learner[1:] == by_learner[:-1]
+        self.row_next[chained[:-1][same]] = chained[1:][same]
+        heads, tails = np.r_[True, ~same], np.r_[~same, True]
+        head_learners, head_rows = by_learner[heads], chained[heads]
+        previous = self.learner_last[head_learners]
+        linked = previous >= 0
+        self.row_next[previous[linked]] = head_rows[linked]
+        self.learner_first[head_learners[~linked]] = head_rows[~linked]
+        self.learner_last[by_learner[tails]] = chained[tails]
+
+    def _resize(self, capacity: int):
+        for name, column in self.columns.items():
+            self.columns[name] = _grown(column, capacity, 0)
+        self.row_learner = _grown(self.row_learner, capacity, 0)
+        self.row_skill = _grown(self.row_skill, capacity, 0)
+        self.row_next = _grown(self.row_next, capacity, -1)
+
+
+def _grown(array: np.ndarray, size: int, fill: int) -> np.ndarray:
+    """Copy of a 1-D array with `size` slots, new ones set to `fill`."""
+    grown = np.full(size, fill, dtype=array.dtype)
+    grown[:min(size, len(array))] = array[:size]
+    return grown
@@ -0,0 +1,166 @@
+import hashlib
+import itertools
+import json
+import random
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+from engines.compute import ComputeKernel
+from engines.solver import FractionArray, one_step_unused
+from engines.validators import check_constraints, constraint_mask
+
+
+# Templates whose full parameter space exceeds this many tuples are not indexed
+MAX_INDEX_SIZE = 5_000_000
+# Part of the on-disk cache key; bump when the rows kept for a template change
+INDEX_VERSION = 2
+
+Axis = Tuple[str, str, Any]
+
+
+class ParamIndex:
+    """Every distinct valid item of a finite template, as parameter tuples.
+
+    Params an item does not use (e.g. c in an 'x + a = b' equation) are
+    pinned to their first value, so each row is a different item.
+
+    Rows are stored as a NumPy structured array of per-axis value indices
+    (uint8/uint16/uint32), so a template with tens of thousands of valid
+    tuples takes a few hundred KB. Sampling is a uniform draw of a row index:
+    no rejections and O(1) per item.
+    """
+
+    def __init__(self, axes: List[Axis], rows: np.ndarray, constants: Dict[str, Any] | None = None):
+        self.axes = axes
+        self.rows = rows
+        self.constants = dict(constants or {})
+        self._values = [_axis_values(axis) for axis in axes]
+        self._columns = [rows[name] for name, _, _ in axes]
+
+    @property
+    def count(self) -> int:
+        """Exact number of distinct valid items."""
+        return len(self.rows)
+
+    def params_at(self, row: int) -> Dict[str, Any]:
+        """Decode one row into a params dict with plain Python values."""
+        params = dict(self.constants)
+        for (name, _, _), values, column in zip(self.axes, self._values, self._columns):
+            value = values[column[row]]
+            params[name] = list(value) if isinstance(value, tuple) else value
+        return params
+
+    def sample(self, rng: random.Random) -> Dict[str, Any]:
+        """Draw one valid params dict uniformly."""
+        if not len(self.rows):
+            raise ValueError("No parameter tuples satisfy the template constraints")
+        return self.params_at(rng.randrange(len(self.rows)))
+
+    def sample_arrays(self, rng: np.random.Generator, n: int) -> Dict[str, np.ndarray]:
+        """Draw n valid rows uniformly, decoded as parameter arrays."""
+        if not len(self.rows):
+            raise ValueError("No parameter tuples satisfy the template constraints")
+        picked = self.rows[rng.integers(0, len(self.rows), size=n)]
+        return _decode_columns(self.axes, {name: picked[name] for name, _, _ in self.axes})
+
+    def save(self, path: Path):
+        np.save(path, self.rows, allow_pickle=False)
+
+
+def build_param_index(template: Dict[str, Any], axes: List[Axis], kernel: ComputeKernel,
+                      constants: Dict[str, Any] | None = None,
+                      cache_dir: str | Path | None = None) -> ParamIndex | None:
+    """Enumerate a template's parameter space and keep the valid tuples.
+
+    Returns None when the space is too large to enumerate. With cache_dir, the
+    index is loaded from / saved to `<template_id>-<content hash>.npy` there.
+    """
+    sizes = [len(_axis_values(axis)) for axis in axes]
+    total = int(np.prod(sizes, dtype=np.int64)) if sizes else 1
+    if total > MAX_INDEX_SIZE:
+        return None
+
+    dtype = np.dtype([(name, _index_dtype(size)) for (name, _, _), size in zip(axes, sizes)])
+    cache_path = None
+    if cache_dir is not None:
+        digest = hashlib.sha1(json.dumps(template, sort_keys=True).encode()).hexdigest()[:12]
+        cache_path = Path(cache_dir) / f"{template['id']}-{digest}-v{INDEX_VERSION}.npy"
+        if cache_path.exists():
+            rows = np.load(cache_path, allow_pickle=False)
+            if rows.dtype == dtype:
+                return ParamIndex(axes, rows, constants)
+
+    flat = np.unravel_index(np.arange(total), sizes) if sizes else ()
+    codes = {name: np.asarray(idx) for (name, _, _), idx in zip(axes, flat)}
+    params = _decode_columns(axes, codes)
+
+    if kernel._array_ok:
+        answers = kernel.batch(params)
+        mask = np.broadcast_to(constraint_mask(template, params, answers), (total,))
+        if isinstance(answers, FractionArray):
+            mask = mask & (answers.denominator != 0)
+        else:
+            mask = mask & np.isfinite(answers)
+    else:
+        # Scalar-only kernels (e.g. classify_exprs) are checked row by row
+        index = ParamIndex(axes, _pack(dtype, codes, np.ones(total, dtype=bool)), constants)
+        mask = np.zeros(total, dtype=bool)
+        for row in range(total):
+            row_params = index.params_at(row)
+            try:
+                mask[row] = check_constraints(template, row_params, kernel.scalar(row_params))
+            except (ValueError, ZeroDivisionError):
+                pass
+
+    for name, unused in unused_axes(kernel, params).items():
+        codes[name] = np.where(unused, 0, codes[name])
+    rows = np.unique(_pack(dtype, codes, mask))
+    if cache_path is not None:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        np.save(cache_path, rows, allow_pickle=False)
+    return ParamIndex(axes, rows, constants)
+
+
+def unused_axes(kernel: ComputeKernel, params: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """Per param, the rows where its value does not change the item."""
+    if "solve_one_step(" in kernel.source and "form" in params:
+        return one_step_unused(params["form"], [name for name in params if name != "form"])
+    return {}
+
+
+def _axis_values(axis: Axis) -> List[Any]:
+    """All values an axis can take, in index order."""
+    _, kind, spec = axis
+    if kind == "int":
+        return list(range(spec[0], spec[1] + 1))
+    if kind == "sample":
+        return list(itertools.permutations(spec[0], spec[1]))
+    return list(spec)
+
+
+def _decode_columns(axes: List[Axis], codes: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """Turn per-axis value indices into parameter value arrays."""
+    params = {}
+    for name, kind, spec in axes:
+        if kind == "int":
+            params[name] = spec[0] + codes[name].astype(np.int64)
+        else:
+            params[name] = np.asarray(_axis_values((name, kind, spec)))[codes[name]]
+    return params
+
+
+def _index_dtype(size: int) -> np.dtype:
+    for dtype in (np.uint8, np.uint16, np.uint32):
+        if size <= np.iinfo(dtype).max + 1:
+            return np.dtype(dtype)
+    return np.dtype(np.uint64)
+
+
+def _pack(dtype: np.dtype, codes: Dict[str, np.ndarray], mask: np.ndarray) -> np.ndarray:
+    count = int(mask.sum())
+    rows = np.empty(count, dtype=dtype)
+    for name in dtype.names or ():
+        rows[name] = codes[name][mask]
+    return rows
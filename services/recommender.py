@@ -0,0 +1,201 @@
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Iterable, List, NamedTuple, Tuple
+
+from services.curriculum import PROFICIENT, CurriculumService
+from services.item_factory import ItemFactory
+from services.mastery import MasteryService
+from services.mastery_store import MasteryCell
+from services.review_calendar import ReviewCalendar
+
+
+class Slot(NamedTuple):
+    """One recommended item: what to practice, at which level, from which template."""
+    teks: str
+    difficulty: int
+    template_id: str
+    reason: str  # "review" (due review), "next" (curriculum) or "gap" (lowest unlocked score)
+
+
+class Recommender:
+    """Next-item recommendations per learner, precomputed after each attempt.
+
+    A learner's next `slots` recommendations combine due reviews from the
+    review calendar, the curriculum's next unlocked skill and the unlocked
+    skills with the largest mastery gaps, each at the skill's stored
+    difficulty and with the template closest to it. `on_mastery_change`
+    (a MasteryService listener) only marks the learner stale; a background
+    worker recomputes stale learners, so `next` is a dict lookup and a
+    deque pop. Reads that find no fresh slots (worker behind or not
+    started, slots used up, or older than `max_age`, which picks up
+    reviews that came due without an attempt) compute inline and count a
+    miss.
+    """
+
+    def __init__(self, mastery_service: MasteryService, curriculum: CurriculumService, item_factory: ItemFactory,
+                 review_calendar: ReviewCalendar | None = None, slots: int = 3, max_age: float | None = 60.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.mastery_service = mastery_service
+        self.curriculum = curriculum
+        self.item_factory = item_factory
+        self.review_calendar = review_calendar
+        self.slots = slots
+        self.max_age = max_age
+        self.clock = clock
+        self._templates = self._index_templates()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._versions: Dict[str, int] = {}  # Bumped by every mastery change of the learner
+        self._ready: Dict[str, Tuple[int, float, Deque[Slot]]] = {}  # learner -> (version, computed at, slots)
+        self._pending: Dict[str, None] = {}  # Insertion-ordered set of stale learners
+        self._worker: threading.Thread | None = None
+        self._running = False
+        self._stats = {"hits": 0, "misses": 0, "computed": 0, "compute_seconds_total": 0.0}
+        item_factory.add_reload_listener(self.invalidate)
+
+    def on_mastery_change(self, learner_id: str, teks: str, previous: MasteryCell | None,
+                          cell: MasteryCell | None):
+        """MasteryService listener: queue the learner for recomputation."""
+        with self._lock:
+            self._versions[learner_id] = self._versions.get(learner_id, 0) + 1
+            self._pending[learner_id] = None
+            self._wakeup.notify()
+
+    def next(self, learner_id: str) -> Slot | None:
+        """Pop the learner's next recommended slot; None if no skill has a template."""
+        with self._lock:
+            entry = self._ready.get(learner_id)
+            if entry is not None and self._fresh(learner_id, entry) and entry[2]:
+                self._stats["hits"] += 1
+                return entry[2].popleft()
+            self._stats["misses"] += 1
+        slots = self._refresh(learner_id)
+        with self._lock:
+            entry = self._ready.get(learner_id)
+            if entry is not None and entry[2]:
+                return entry[2].popleft()
+        return slots[0] if slots else None
+
+    def peek(self, learner_id: str) -> List[Slot]:
+        """The learner's remaining slots without consuming them (recomputed if stale)."""
+        with self._lock:
+            entry = self._ready.get(learner_id)
+            if entry is not None and self._fresh(learner_id, entry) and entry[2]:
+                return list(entry[2])
+        return self._refresh(learner_id)
+
+    def recommend(self, learner_id: str) -> List[Slot]:
+        """Compute a learner's slots from current state (what the worker runs)."""
+        records = {record.teks: record for record in self.mastery_service.get_all_mastery(learner_id)}
+        due = self.review_calendar.ready_skills(learner_id) if self.review_calendar is not None else []
+        candidates = [(teks, "review") for teks in due[:1]]
+        next_skill = self.curriculum.get_next_skill(learner_id=learner_id)
+        if next_skill is not None:
+            candidates.append((next_skill, "next"))
+        candidates += [(teks, "review") for teks in due[1:]]
+        # Not started counts as the largest gap; ties keep sequence order
+        gaps = [teks for teks in self.curriculum.get_unlocked_skills(learner_id)
+                if teks not in records or records[teks].score < PROFICIENT]
+        gaps.sort(key=lambda teks: records[teks].effective_score if teks in records else 0.0)
+        candidates += [(teks, "gap") for teks in gaps]
+
+        start = self.mastery_service.difficulty_rules.start
+        slots: List[Slot] = []
+        seen = set()
+        for teks, reason in candidates:
+            if teks in seen or teks not in self._templates:
+                continue
+            seen.add(teks)
+            difficulty = records[teks].difficulty if teks in records else start
+            slots.append(Slot(teks, difficulty, self.template_for(teks, difficulty), reason))
+            if len(slots) == self.slots:
+                break
+        return slots
+
+    def template_for(self, teks: str, difficulty: int) -> str | None:
+        """Template of teks whose own difficulty is closest to `difficulty`."""
+        templates = self._templates.get(teks)
+        if not templates:
+            return None
+        return min(templates, key=lambda t: (abs(t[0] - difficulty), t[1]))[1]
+
+    def invalidate(self, template_ids: Iterable[str] = ()):
+        """Drop all precomputed slots (e.g. after templates changed)."""
+        templates = self._index_templates()
+        with self._lock:
+            self._templates = templates
+            self._ready.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["learners"] = len(self._ready)
+            stats["pending"] = len(self._pending)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else None
+        stats["compute_seconds_per_learner"] = (
+            stats["compute_seconds_total"] / stats["computed"] if stats["computed"] else None
+        )
+        return stats
+
+    def start(self):
+        with self._lock:
+            if self._running:
+                return
+            self._running = True
+        self._worker = threading.Thread(target=self._run, name="recommender", daemon=True)
+        self._worker.start()
+
+    def stop(self, timeout: float | None = 5.0):
+        with self._lock:
+            self._running = False
+            self._wakeup.notify_all()
+        if self._worker is not None:
+            self._worker.join(timeout)
+            self._worker = None
+
+    def _index_templates(self) -> Dict[str, List[Tuple[int, str]]]:
+        templates: Dict[str, List[Tuple[int, str]]] = {}
+        for template_id, template in self.item_factory.templates_cache.items():
+            templates.setdefault(template["teks"], []).append((template.get("difficulty", 2), template_id))
+        return templates
+
+    def _fresh(self, learner_id: str, entry: Tuple[int, float, Deque[Slot]]) -> bool:
+        # Caller holds self._lock
+        version, computed_at, _ = entry
+        if version != self._versions.get(learner_id, 0):
+            return False
+        return self.max_age is None or self.clock() - computed_at < self.max_age
+
+    def _refresh(self, learner_id: str) -> List[Slot]:
+        # Never called with self._lock held: recommend() takes the mastery service's lock
+        with self._lock:
+            version = self._versions.get(learner_id, 0)
+            self._pending.pop(learner_id, None)
+        started = time.perf_counter()
+        slots = self.recommend(learner_id)
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self._stats["computed"] += 1
+            self._stats["compute_seconds_total"] += elapsed
+            # A change during the computation queued the learner again; keep its newer result
+            if version == self._versions.get(learner_id, 0):
+                self._ready[learner_id] = (version, self.clock(), deque(slots))
+        return slots
+
+    def _run(self):
+        while True:
+            with self._lock:
+                while self._running and not self._pending:
+                    self._wakeup.wait()
+                if not self._running:
+                    return
+                learner_id = next(iter(self._pending))
+            try:
+                self._refresh(learner_id)
+            except Exception as e:
+                # A failed recommendation must not kill the worker; reads compute inline
+                with self._lock:
+                    self._pending.pop(learner_id, None)
+                print(f"Recommender error for {learner_id}: {e}")
@@ -0,0 +1,166 @@
+import heapq
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Set, Tuple
+
+from services.mastery_store import MasteryCell
+
+
+Key = Tuple[str, str]  # (learner_id, teks)
+
+
+class ReviewCalendar:
+    """Mastery reviews of all learners bucketed by due time.
+
+    Scheduled reviews sit in calendar buckets of `bucket_seconds` (an hour
+    by default). `sweep` moves whole buckets that have come due into
+    per-learner ready queues, so finding who needs review and fetching a
+    learner's review set cost time proportional to the reviews due, not to
+    the number of learners. A background thread sweeps every
+    `sweep_interval` seconds, and reads sweep first, so they are never
+    stale. `bucket_counts` gives the review load per bucket for forecasting.
+
+    The calendar follows MasteryService through `on_mastery_change` (each
+    new due date reschedules the cell, which also takes it out of the ready
+    queue) and is filled from a backend with `load`.
+    """
+
+    def __init__(self, bucket_seconds: int = 3600, sweep_interval: float | None = 60.0,
+                 clock: Callable[[], float] = time.time):
+        self.bucket_seconds = bucket_seconds
+        self.sweep_interval = sweep_interval
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._due: Dict[Key, int] = {}  # Scheduled, not yet ready
+        self._buckets: Dict[int, Set[Key]] = {}
+        self._bucket_heap: List[int] = []  # Bucket numbers; may hold stale ones
+        self._ready: Dict[str, Dict[str, int]] = {}  # learner -> teks -> due
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def schedule(self, learner_id: str, teks: str, due: int):
+        """Set the review time (epoch seconds) of a cell; 0 cancels it."""
+        with self._lock:
+            self._schedule((learner_id, teks), due)
+
+    def on_mastery_change(self, learner_id: str, teks: str, previous: MasteryCell | None,
+                          cell: MasteryCell | None):
+        """MasteryService listener."""
+        self.schedule(learner_id, teks, cell.due_review if cell is not None else 0)
+
+    def load(self, reviews: Iterable[Tuple[str, str, int]]):
+        """Replace the calendar with (learner_id, teks, due) reviews, e.g. a backend's scheduled_reviews()."""
+        with self._lock:
+            self._due.clear()
+            self._buckets.clear()
+            self._bucket_heap.clear()
+            self._ready.clear()
+            for learner_id, teks, due in reviews:
+                self._schedule((learner_id, teks), due)
+        self.sweep()
+
+    def sweep(self, now: float | None = None) -> int:
+        """Move reviews due by `now` into the ready queues; returns how many moved."""
+        now = self.clock() if now is None else now
+        current = int(now // self.bucket_seconds)
+        moved = 0
+        with self._lock:
+            while self._bucket_heap and self._bucket_heap[0] <= current:
+                number = self._bucket_heap[0]
+                keys = self._buckets.get(number)
+                if keys is None:
+                    heapq.heappop(self._bucket_heap)  # Emptied by cancellations
+                    continue
+                if number < current:
+                    # Whole bucket is due: move it without looking at due times
+                    heapq.heappop(self._bucket_heap)
+                    del self._buckets[number]
+                    due_keys = list(keys)
+                else:
+                    # The current bucket is only partly due
+                    due_keys = [key for key in keys if self._due[key] <= now]
+                    keys.difference_update(due_keys)
+                    if not keys:
+                        del self._buckets[number]
+                for key in due_keys:
+                    learner_id, teks = key
+                    self._ready.setdefault(learner_id, {})[teks] = self._due.pop(key)
+                moved += len(due_keys)
+                if number == current:
+                    break
+        return moved
+
+    def ready_learners(self) -> List[str]:
+        """Learners with at least one review due."""
+        self.sweep()
+        with self._lock:
+            return list(self._ready)
+
+    def ready_skills(self, learner_id: str) -> List[str]:
+        """A learner's due reviews, most overdue first."""
+        self.sweep()
+        with self._lock:
+            ready = self._ready.get(learner_id, {})
+            return sorted(ready, key=ready.__getitem__)
+
+    def bucket_counts(self, start: float | None = None, end: float | None = None) -> List[Tuple[int, int]]:
+        """(bucket start in epoch seconds, scheduled reviews) for buckets in [start, end)."""
+        with self._lock:
+            counts = [(number * self.bucket_seconds, len(keys)) for number, keys in self._buckets.items()]
+        return sorted(
+            (at, count) for at, count in counts
+            if (start is None or at + self.bucket_seconds > start) and (end is None or at < end)
+        )
+
+    def stats(self):
+        with self._lock:
+            return {
+                "scheduled": len(self._due),
+                "ready": sum(len(skills) for skills in self._ready.values()),
+                "ready_learners": len(self._ready),
+                "buckets": len(self._buckets),
+            }
+
+    def start(self):
+        if self._thread is not None or not self.sweep_interval:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="review-calendar", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float | None = 5.0):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _schedule(self, key: Key, due: int):
+        # Caller holds self._lock
+        previous = self._due.pop(key, None)
+        if previous is not None:
+            number = previous // self.bucket_seconds
+            keys = self._buckets[number]
+            keys.discard(key)
+            if not keys:
+                del self._buckets[number]
+        else:
+            ready = self._ready.get(key[0])
+            if ready is not None and ready.pop(key[1], None) is not None and not ready:
+                del self._ready[key[0]]
+        if not due:
+            return
+        number = due // self.bucket_seconds
+        keys = self._buckets.get(number)
+        if keys is None:
+            keys = self._buckets[number] = set()
+            heapq.heappush(self._bucket_heap, number)
+        keys.add(key)
+        self._due[key] = due
+
+    def _run(self):
+        while not self._stop.wait(self.sweep_interval):
+            try:
+                self.sweep()
+            except Exception as e:
+                # A failed sweep must not kill the sweeper thread
+                print(f"Review calendar error: {e}")
@@ -0,0 +1,99 @@
+import heapq
+import json
+from pathlib import Path
+from typing import Dict, Iterable, List
+
+
+class SkillGraphError(ValueError):
+    """The skill catalog has a cycle or an unknown prerequisite."""
+
+
+class SkillGraph:
+    """Prerequisite DAG compiled once into topological order.
+
+    Skill ids are positions in `skills`, which is a topological order
+    (catalog order among skills that are ready at the same time), so bit i
+    of a skill bitset is skills[i] and lower bits come earlier in the
+    sequence. Bitsets are plain Python ints. `prereq_masks[i]` holds the
+    prerequisites of skill i and `dependents[i]` the skills that list it.
+    """
+
+    def __init__(self, dependencies: Dict[str, Iterable[str]]):
+        catalog = list(dependencies)
+        position = {teks: i for i, teks in enumerate(catalog)}
+        prereqs = {teks: list(dict.fromkeys(dependencies[teks])) for teks in catalog}
+        for teks, required in prereqs.items():
+            unknown = [p for p in required if p not in position]
+            if unknown:
+                raise SkillGraphError(f"{teks} requires unknown skills: {', '.join(unknown)}")
+
+        # Kahn's algorithm; the heap keeps catalog order among ready skills
+        waiting = {teks: len(required) for teks, required in prereqs.items()}
+        followers: Dict[str, List[str]] = {teks: [] for teks in catalog}
+        for teks, required in prereqs.items():
+            for p in required:
+                followers[p].append(teks)
+        ready = [position[teks] for teks in catalog if not waiting[teks]]
+        heapq.heapify(ready)
+        order: List[str] = []
+        while ready:
+            teks = catalog[heapq.heappop(ready)]
+            order.append(teks)
+            for follower in followers[teks]:
+                waiting[follower] -= 1
+                if not waiting[follower]:
+                    heapq.heappush(ready, position[follower])
+        if len(order) < len(catalog):
+            raise SkillGraphError(f"Prerequisite cycle: {' -> '.join(_find_cycle(prereqs, waiting))}")
+
+        self.skills: List[str] = order
+        self.index: Dict[str, int] = {teks: i for i, teks in enumerate(order)}
+        self.dependencies: Dict[str, List[str]] = {teks: prereqs[teks] for teks in order}
+        self.prereq_masks: List[int] = [self.mask(prereqs[teks]) for teks in order]
+        self.dependents: List[List[int]] = [[self.index[f] for f in followers[teks]] for teks in order]
+        self.roots: int = self.mask(teks for teks in order if not prereqs[teks])
+        self.all: int = (1 << len(order)) - 1
+
+    @classmethod
+    def load(cls, path: str | Path = "content/teks_map.json") -> "SkillGraph":
+        """Compile the catalog file ({teks: {"title", "prereqs": [...]}, ...})."""
+        with open(path) as f:
+            catalog = json.load(f)
+        return cls({teks: entry.get("prereqs", []) for teks, entry in catalog.items()})
+
+    def __len__(self) -> int:
+        return len(self.skills)
+
+    def mask(self, skills: Iterable[str]) -> int:
+        bits = 0
+        for teks in skills:
+            bits |= 1 << self.index[teks]
+        return bits
+
+    def unlocked_by(self, proficient: int) -> int:
+        """Skills whose prerequisites are all in `proficient` (O(n); for rebuilding state)."""
+        bits = 0
+        for i, required in enumerate(self.prereq_masks):
+            if not required & ~proficient:
+                bits |= 1 << i
+        return bits
+
+    def first(self, bits: int) -> str | None:
+        """Earliest skill in topological order among `bits`."""
+        return self.skills[(bits & -bits).bit_length() - 1] if bits else None
+
+    def names(self, bits: int) -> List[str]:
+        return [teks for i, teks in enumerate(self.skills) if bits >> i & 1]
+
+
+def _find_cycle(prereqs: Dict[str, List[str]], waiting: Dict[str, int]) -> List[str]:
+    # Every skill left waiting has a waiting prerequisite; follow them until one repeats
+    stuck = [teks for teks, count in waiting.items() if count]
+    path = [stuck[0]]
+    seen = {stuck[0]: 0}
+    while True:
+        teks = next(p for p in prereqs[path[-1]] if waiting[p])
+        if teks in seen:
+            return path[seen[teks]:] + [teks]
+        seen[teks] = len(path)
+        path.append(teks)
@@ -1,90 +1,233 @@
-from typing import Dict, List, Any
+from typing import Dict, Iterator, List, Any
 from datetime import datetime, timedelta
 from dataclasses import dataclass
+import heapq
+import itertools
 
 
-@dataclass
+DAY_SECONDS = 24 * 60 * 60
+
+
+@dataclass(slots=True)
 class ReviewItem:
     teks: str
     item_id: str
     due_at: datetime
     priority: int  # 1 = high, 2 = medium, 3 = low
+    interval_index: int = 0  # Position in SpacedReviewService.intervals
 
 
-class SpacedReviewService:
+class ReviewQueue:
+    """In-memory review index: a heap per priority plus hash indexes.
+
+    Each heap holds [due_ts, seq, item] entries ordered by due time.
+    Items are also indexed by item_id, by teks and by due day (a coarse
+    timing wheel for range queries), so cancelling or rescheduling only
+    marks the old heap entry dead (O(1)). Dead entries are skipped when
+    popped and dropped by a compaction once they outnumber live ones. Not
+    thread-safe.
+    """
+
+    COMPACT_MIN_DEAD = 1024
+
     def __init__(self):
+        self._heaps: Dict[int, List[list]] = {}
+        self._entries: Dict[str, list] = {}
+        self._by_skill: Dict[str, Dict[str, ReviewItem]] = {}
+        self._by_day: Dict[int, Dict[str, ReviewItem]] = {}
+        self._seq = itertools.count()
+        self._dead = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, item_id: str) -> ReviewItem | None:
+        entry = self._entries.get(item_id)
+        return entry[2] if entry is not None else None
+
+    def add(self, item: ReviewItem):
+        """Schedule item, replacing any review already scheduled for its item_id."""
+        self.remove(item.item_id)
+        entry = [item.due_at.timestamp(), next(self._seq), item]
+        heapq.heappush(self._heaps.setdefault(item.priority, []), entry)
+        self._entries[item.item_id] = entry
+        self._by_skill.setdefault(item.teks, {})[item.item_id] = item
+        self._by_day.setdefault(int(entry[0] // DAY_SECONDS), {})[item.item_id] = item
+
+    def remove(self, item_id: str) -> ReviewItem | None:
+        entry = self._entries.pop(item_id, None)
+        if entry is None:
+            return None
+        item, entry[2] = entry[2], None
+        self._unindex(item, entry[0])
+        self._dead += 1
+        if self._dead > self.COMPACT_MIN_DEAD and self._dead > len(self._entries):
+            self._compact()
+        return item
+
+    def due(self, now: float, limit: int) -> List[ReviewItem]:
+        """Due items by priority, then due time, without removing them."""
+        found: List[ReviewItem] = []
+        for priority in sorted(self._heaps):
+            for item in self._walk(self._heaps[priority], now):
+                if len(found) >= limit:
+                    return found
+                found.append(item)
+        return found
+
+    def pop_due(self, now: float, limit: int) -> List[ReviewItem]:
+        """Remove and return due items by priority, then due time (O(log n) each)."""
+        popped: List[ReviewItem] = []
+        for priority in sorted(self._heaps):
+            heap = self._heaps[priority]
+            while heap and len(popped) < limit and heap[0][0] <= now:
+                due_ts, _, item = heapq.heappop(heap)
+                if item is None:
+                    self._dead -= 1
+                    continue
+                del self._entries[item.item_id]
+                self._unindex(item, due_ts)
+                popped.append(item)
+        return popped
+
+    def between(self, start: float, end: float) -> List[ReviewItem]:
+        """Items due in [start, end], by due time; only the day buckets in range are read."""
+        first, last = int(start // DAY_SECONDS), int(end // DAY_SECONDS)
+        if last - first + 1 > len(self._by_day):
+            days = sorted(day for day in self._by_day if first <= day <= last)
+        else:
+            days = range(first, last + 1)
+        found = []
+        for day in days:
+            for item_id, item in self._by_day.get(day, {}).items():
+                if start <= self._entries[item_id][0] <= end:
+                    found.append(item)
+        found.sort(key=lambda item: item.due_at)
+        return found
+
+    def for_skill(self, teks: str) -> List[ReviewItem]:
+        return sorted(self._by_skill.get(teks, {}).values(), key=lambda item: item.due_at)
+
+    def all(self) -> Iterator[ReviewItem]:
+        for items in self._by_skill.values():
+            yield from items.values()
+
+    @staticmethod
+    def _walk(heap: List[list], until: float) -> Iterator[ReviewItem]:
+        # Visit heap entries in order without popping: a small frontier heap of child indexes
+        frontier = [(heap[0][0], heap[0][1], 0)] if heap else []
+        while frontier:
+            due_ts, _, i = heapq.heappop(frontier)
+            if due_ts > until:
+                return
+            if heap[i][2] is not None:
+                yield heap[i][2]
+            for child in (2 * i + 1, 2 * i + 2):
+                if child < len(heap):
+                    heapq.heappush(frontier, (heap[child][0], heap[child][1], child))
+
+    def _unindex(self, item: ReviewItem, due_ts: float):
+        for index, key in ((self._by_skill, item.teks), (self._by_day, int(due_ts // DAY_SECONDS))):
+            bucket = index[key]
+            del bucket[item.item_id]
+            if not bucket:
+                del index[key]
+
+    def _compact(self):
+        for priority, heap in list(self._heaps.items()):
+            live = [entry for entry in heap if entry[2] is not None]
+            heapq.heapify(live)
+            if live:
+                self._heaps[priority] = live
+            else:
+                del self._heaps[priority]
+        self._dead = 0
+
+
+class SpacedReviewService:
+    def __init__(self, store=None):
         # Spaced repetition intervals (in days)
         self.intervals = [1, 3, 7, 21, 60]
-        self.review_items: List[ReviewItem] = []
-    
-    def schedule_review(self, teks: str, item_id: str, mastery_score: float, 
+        # ReviewQueue in memory by default; SqliteReviewStore persists reviews
+        self.store = store if store is not None else ReviewQueue()
+
+    def schedule_review(self, teks: str, item_id: str, mastery_score: float,
                        last_reviewed: datetime = None) -> ReviewItem:
         """Schedule a review item based on mastery and previous reviews."""
         if last_reviewed is None:
             last_reviewed = datetime.now()
-        
+
         # Determine interval based on mastery score
         if mastery_score >= 0.9:
-            interval_days = self.intervals[-1]  # 60 days
-            priority = 3
+            interval_index = len(self.intervals) - 1  # 60 days
         elif mastery_score >= 0.7:
-            interval_days = self.intervals[3]  # 21 days
-            priority = 2
+            interval_index = 3  # 21 days
         elif mastery_score >= 0.5:
-            interval_days = self.intervals[2]  # 7 days
-            priority = 2
+            interval_index = 2  # 7 days
         else:
-            interval_days = self.intervals[0]  # 1 day
-            priority = 1
-        
-        due_at = last_reviewed + timedelta(days=interval_days)
-        
-        review_item = ReviewItem(
-            teks=teks,
-            item_id=item_id,
-            due_at=due_at,
-            priority=priority
-        )
-        
-        self.review_items.append(review_item)
-        return review_item
-    
+            interval_index = 0  # 1 day
+
+        return self._schedule(teks, item_id, interval_index, last_reviewed)
+
     def get_due_reviews(self, limit: int = 10) -> List[ReviewItem]:
-        """Get review items that are due now."""
-        now = datetime.now()
-        due_items = [
-            item for item in self.review_items
-            if item.due_at <= now
-        ]
-        
-        # Sort by priority (1 = high priority first)
-        due_items.sort(key=lambda x: x.priority)
-        
-        return due_items[:limit]
-    
+        """Get review items that are due now, high priority first."""
+        return self.store.due(datetime.now().timestamp(), limit)
+
+    def pop_due_reviews(self, limit: int = 10) -> List[ReviewItem]:
+        """Take due review items off the schedule, high priority first."""
+        return self.store.pop_due(datetime.now().timestamp(), limit)
+
     def get_reviews_for_skill(self, teks: str) -> List[ReviewItem]:
         """Get all review items for a specific skill."""
-        return [item for item in self.review_items if item.teks == teks]
-    
-    def mark_reviewed(self, item_id: str, correct: bool):
-        """Mark a review item as completed and reschedule if needed."""
-        # Find and remove the item
-        for i, item in enumerate(self.review_items):
-            if item.item_id == item_id:
-                del self.review_items[i]
-                break
-        
-        # If correct, schedule next review with longer interval
+        return self.store.for_skill(teks)
+
+    def get_reviews_between(self, start: datetime, end: datetime) -> List[ReviewItem]:
+        """Get review items due in [start, end], soonest first."""
+        return self.store.between(start.timestamp(), end.timestamp())
+
+    def mark_reviewed(self, item_id: str, correct: bool,
+                      reviewed_at: datetime | None = None) -> ReviewItem | None:
+        """Mark a review item as completed and reschedule it.
+
+        A correct review moves the item to the next (longer) interval; an
+        incorrect one starts it over at the first interval. Returns the new
+        schedule entry, or None if the item was not scheduled.
+        """
+        item = self.store.remove(item_id)
+        if item is None:
+            return None
+
         if correct:
-            # This would typically reschedule with a longer interval
-            pass
-    
+            interval_index = min(item.interval_index + 1, len(self.intervals) - 1)
+        else:
+            interval_index = 0
+        return self._schedule(item.teks, item_id, interval_index, reviewed_at or datetime.now())
+
     def get_review_schedule(self) -> Dict[str, List[ReviewItem]]:
         """Get all scheduled reviews grouped by skill."""
         schedule = {}
-        for item in self.review_items:
+        for item in self.store.all():
             if item.teks not in schedule:
                 schedule[item.teks] = []
             schedule[item.teks].append(item)
-        
+
         return schedule
+
+    def _schedule(self, teks: str, item_id: str, interval_index: int, reviewed_at: datetime) -> ReviewItem:
+        review_item = ReviewItem(
+            teks=teks,
+            item_id=item_id,
+            due_at=reviewed_at + timedelta(days=self.intervals[interval_index]),
+            priority=self._priority(interval_index),
+            interval_index=interval_index,
+        )
+        self.store.add(review_item)
+        return review_item
+
+    def _priority(self, interval_index: int) -> int:
+        # Shortest interval = shakiest skill = highest priority
+        if interval_index == 0:
+            return 1
+        if interval_index == len(self.intervals) - 1:
+            return 3
+        return 2
@@ -0,0 +1,363 @@
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Tuple
+
+from services.mastery_store import MasteryBackend, MasteryCell
+from services.spaced_review import ReviewItem
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS mastery (
+    learner_id TEXT NOT NULL,
+    teks TEXT NOT NULL,
+    score REAL NOT NULL,
+    attempts INTEGER NOT NULL,
+    last_seen INTEGER NOT NULL,
+    due_review INTEGER NOT NULL,
+    correct_streak INTEGER NOT NULL,
+    incorrect_streak INTEGER NOT NULL,
+    difficulty INTEGER NOT NULL DEFAULT 0,
+    started INTEGER NOT NULL,
+    PRIMARY KEY (learner_id, teks)
+) WITHOUT ROWID;
+-- The primary key already serves per-learner reads (/progress/me, due skills)
+CREATE INDEX IF NOT EXISTS mastery_due ON mastery (teks, due_review) WHERE due_review > 0;
+
+CREATE TABLE IF NOT EXISTS review_items (
+    item_id TEXT PRIMARY KEY,
+    teks TEXT NOT NULL,
+    due_at REAL NOT NULL,
+    priority INTEGER NOT NULL,
+    interval_index INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS review_items_due ON review_items (due_at, priority);
+CREATE INDEX IF NOT EXISTS review_items_teks ON review_items (teks);
+"""
+
+# Statements are constant strings so each connection's statement cache keeps them prepared
+_SELECT_CELL = ("SELECT score, attempts, last_seen, due_review, correct_streak, incorrect_streak, difficulty "
+                "FROM mastery WHERE learner_id = ? AND teks = ?")
+_SELECT_LEARNER = ("SELECT teks, score, attempts, last_seen, due_review, correct_streak, incorrect_streak, difficulty "
+                   "FROM mastery WHERE learner_id = ? ORDER BY started")
+_SELECT_DUE = "SELECT learner_id FROM mastery WHERE teks = ? AND due_review > 0 AND due_review <= ?"
+_UPSERT = (
+    "INSERT INTO mastery (learner_id, teks, score, attempts, last_seen, due_review, correct_streak, "
+    "incorrect_streak, difficulty, started) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+    "ON CONFLICT (learner_id, teks) DO UPDATE SET score = excluded.score, attempts = excluded.attempts, "
+    "last_seen = excluded.last_seen, due_review = excluded.due_review, "
+    "correct_streak = excluded.correct_streak, incorrect_streak = excluded.incorrect_streak, "
+    "difficulty = excluded.difficulty"
+)
+_DELETE = "DELETE FROM mastery WHERE learner_id = ? AND teks = ?"
+_SELECT_REVIEW = "SELECT item_id, teks, due_at, priority, interval_index FROM review_items "
+
+Key = Tuple[str, str]
+
+
+class SqliteWriteError(RuntimeError):
+    """Raised by flush()/close() when the writer keeps failing to commit."""
+
+
+class SqliteConnections:
+    """One connection per thread to a WAL-mode database file.
+
+    Every new connection applies the schema (and migrations), so a thread
+    never sees a database without the tables, e.g. after the file was
+    replaced. A shared ":memory:" path is refused: each connection would
+    open its own empty database.
+    """
+
+    def __init__(self, path: str | Path, cached_statements: int = 64):
+        self.path = str(path)
+        if self.path in (":memory:", ""):
+            raise ValueError("SQLite storage needs a database file (in-memory databases are per connection)")
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self.cached_statements = cached_statements
+        self._local = threading.local()
+        self._all: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+        self.get()
+
+    def get(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, check_same_thread=False, cached_statements=self.cached_statements)
+            conn.execute("PRAGMA journal_mode=WAL")
+            # WAL + NORMAL: commits survive process crashes; only an OS crash can lose the last ones
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=5000")
+            _apply_schema(conn)
+            self._local.conn = conn
+            with self._lock:
+                self._all.append(conn)
+        return conn
+
+    def close(self):
+        with self._lock:
+            conns, self._all = self._all, []
+        for conn in conns:
+            conn.close()
+        self._local = threading.local()
+
+
+class SqliteMasteryStore(MasteryBackend):
+    """MasteryBackend on SQLite for single-node deployments.
+
+    Writes go into a pending map (later writes to the same cell replace
+    earlier ones). A background writer commits the map every
+    `flush_interval` seconds, or once `max_batch` cells are pending, as one
+    transaction. Reads check the pending and in-flight maps before the
+    database, so callers see their own writes, and they use per-thread
+    connections, so they never wait for the writer.
+
+    A failed commit keeps its batch and is retried. flush() and close()
+    raise SqliteWriteError once `max_commit_failures` commits failed while
+    they waited, instead of waiting forever (close() then drops what is left).
+    """
+
+    concurrent_reads = True
+
+    def __init__(self, path: str | Path, flush_interval: float = 0.01, max_batch: int = 5000,
+                 max_commit_failures: int = 5):
+        self.connections = SqliteConnections(path)
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self.max_commit_failures = max_commit_failures
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._flushed = threading.Condition(self._lock)
+        self._pending: Dict[Key, MasteryCell | None] = {}  # None = delete
+        self._in_flight: Dict[Key, MasteryCell | None] = {}
+        # Insertion counter that keeps learner_cells in first-attempt order across restarts
+        self._started = self.connections.get().execute("SELECT COALESCE(MAX(started), 0) FROM mastery").fetchone()[0]
+        self._running = True
+        self._flush_requested = False
+        self._failures = 0  # Consecutive failed commits
+        self._last_error: BaseException | None = None
+        self._stats = {"transactions": 0, "rows_written": 0, "writes": 0, "errors": 0}
+        self._writer = threading.Thread(target=self._run, name="sqlite-mastery-writer", daemon=True)
+        self._writer.start()
+
+    def read(self, learner_id: str, teks: str) -> MasteryCell | None:
+        key = (learner_id, teks)
+        with self._lock:
+            for buffered in (self._pending, self._in_flight):
+                if key in buffered:
+                    cell = buffered[key]
+                    return cell if cell is not None and cell.attempts else None
+        row = self.connections.get().execute(_SELECT_CELL, key).fetchone()
+        if row is None or not row[1]:
+            return None
+        return MasteryCell(*row)
+
+    def write(self, learner_id: str, teks: str, cell: MasteryCell):
+        with self._lock:
+            self._pending[(learner_id, teks)] = cell
+            self._stats["writes"] += 1
+            if len(self._pending) >= self.max_batch:
+                self._wakeup.notify()
+
+    def learner_cells(self, learner_id: str) -> List[Tuple[str, MasteryCell]]:
+        with self._lock:
+            overlay = {teks: cell for buffered in (self._in_flight, self._pending)
+                       for (learner, teks), cell in buffered.items() if learner == learner_id}
+        cells = {row[0]: MasteryCell(*row[1:]) for row in
+                 self.connections.get().execute(_SELECT_LEARNER, (learner_id,))}
+        for teks, cell in overlay.items():
+            if cell is None:
+                cells.pop(teks, None)
+            else:
+                cells[teks] = cell
+        return [(teks, cell) for teks, cell in cells.items() if cell.attempts]
+
+    def learners_due(self, teks: str, now: int) -> List[str]:
+        with self._lock:
+            overlay = {learner: cell for buffered in (self._in_flight, self._pending)
+                       for (learner, skill), cell in buffered.items() if skill == teks}
+        due = {row[0] for row in self.connections.get().execute(_SELECT_DUE, (teks, now))}
+        for learner, cell in overlay.items():
+            if cell is not None and 0 < cell.due_review <= now:
+                due.add(learner)
+            else:
+                due.discard(learner)
+        return sorted(due)
+
+    def clear(self, learner_id: str, teks: str):
+        with self._lock:
+            self._pending[(learner_id, teks)] = None
+
+    def scheduled_reviews(self) -> Iterator[Tuple[str, str, int]]:
+        self.flush()
+        yield from self.connections.get().execute(
+            "SELECT learner_id, teks, due_review FROM mastery WHERE due_review > 0"
+        )
+
+    def flush(self):
+        """Wait until every write so far is committed; raises SqliteWriteError if commits keep failing."""
+        with self._lock:
+            self._flush_requested = True
+            self._wakeup.notify()
+            errors_before = self._stats["errors"]
+            self._flushed.wait_for(lambda: (not self._pending and not self._in_flight)
+                                   or self._stats["errors"] - errors_before >= self.max_commit_failures)
+            if self._pending or self._in_flight:
+                raise SqliteWriteError(
+                    f"{len(self._pending) + len(self._in_flight)} mastery writes not committed after "
+                    f"{self._stats['errors'] - errors_before} failed attempts"
+                ) from self._last_error
+
+    def close(self):
+        """Flush and stop the writer; uncommitted writes are dropped if flush() raises."""
+        try:
+            self.flush()
+        finally:
+            with self._lock:
+                self._running = False
+                self._wakeup.notify()
+            self._writer.join()
+            self.connections.close()
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats["pending"] = len(self._pending)
+        stats["rows_per_transaction"] = (
+            stats["rows_written"] / stats["transactions"] if stats["transactions"] else None
+        )
+        return stats
+
+    def _run(self):
+        conn = self.connections.get()
+        while True:
+            with self._lock:
+                self._wakeup.wait_for(
+                    lambda: not self._running or self._flush_requested or len(self._pending) >= self.max_batch,
+                    self.flush_interval,
+                )
+                self._flush_requested = False
+                if not self._pending:
+                    if not self._running:
+                        return
+                    continue
+                self._in_flight, self._pending = self._pending, {}
+                batch = self._in_flight
+            try:
+                self._commit(conn, batch)
+            except Exception as e:
+                # e.g. database locked past busy_timeout: keep the batch (newer writes win) and retry.
+                # Anything else is caught too, so the writer never dies under a waiting flush().
+                with self._lock:
+                    self._pending = {**batch, **self._pending}
+                    self._in_flight = {}
+                    self._stats["errors"] += 1
+                    self._failures += 1
+                    self._last_error = e
+                    failures = self._failures
+                    self._flushed.notify_all()  # Lets flush() count the failure
+                    if failures >= self.max_commit_failures and not self._running:
+                        return
+                if failures == self.max_commit_failures:
+                    print(f"SQLite mastery commits failing ({failures} in a row): {e}")
+                time.sleep(self.flush_interval * min(failures, 100))
+                continue
+            with self._lock:
+                self._in_flight = {}
+                self._failures = 0
+                self._last_error = None
+                self._stats["transactions"] += 1
+                self._stats["rows_written"] += len(batch)
+                self._flushed.notify_all()
+
+    def _commit(self, conn: sqlite3.Connection, batch: Dict[Key, MasteryCell | None]):
+        upserts = []
+        deletes = []
+        for key, cell in batch.items():
+            if cell is None:
+                deletes.append(key)
+            else:
+                self._started += 1
+                upserts.append((*key, *cell, self._started))
+        with conn:  # One transaction for the whole batch
+            if upserts:
+                conn.executemany(_UPSERT, upserts)
+            if deletes:
+                conn.executemany(_DELETE, deletes)
+
+
+def _apply_schema(conn: sqlite3.Connection):
+    """Create missing tables and indexes and migrate old ones (idempotent)."""
+    conn.executescript(SCHEMA)
+    # Databases created before the difficulty column get it added in place
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(mastery)")}
+    if "difficulty" not in columns:
+        try:
+            with conn:
+                conn.execute("ALTER TABLE mastery ADD COLUMN difficulty INTEGER NOT NULL DEFAULT 0")
+        except sqlite3.OperationalError:
+            # Another connection added it first
+            if "difficulty" not in {row[1] for row in conn.execute("PRAGMA table_info(mastery)")}:
+                raise
+
+
+class SqliteReviewStore:
+    """Review storage for SpacedReviewService on the same database (ReviewQueue's interface)."""
+
+    def __init__(self, connections: SqliteConnections):
+        self.connections = connections
+
+    def __len__(self) -> int:
+        return self.connections.get().execute("SELECT COUNT(*) FROM review_items").fetchone()[0]
+
+    def get(self, item_id: str) -> ReviewItem | None:
+        row = self.connections.get().execute(_SELECT_REVIEW + "WHERE item_id = ?", (item_id,)).fetchone()
+        return _review_item(row) if row else None
+
+    def add(self, item: ReviewItem):
+        with self.connections.get() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO review_items (item_id, teks, due_at, priority, interval_index) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (item.item_id, item.teks, item.due_at.timestamp(), item.priority, item.interval_index),
+            )
+
+    def remove(self, item_id: str) -> ReviewItem | None:
+        with self.connections.get() as conn:
+            row = conn.execute(_SELECT_REVIEW + "WHERE item_id = ?", (item_id,)).fetchone()
+            conn.execute("DELETE FROM review_items WHERE item_id = ?", (item_id,))
+        return _review_item(row) if row else None
+
+    def due(self, now: float, limit: int) -> List[ReviewItem]:
+        rows = self.connections.get().execute(
+            _SELECT_REVIEW + "WHERE due_at <= ? ORDER BY priority, due_at LIMIT ?", (now, limit),
+        )
+        return [_review_item(row) for row in rows]
+
+    def pop_due(self, now: float, limit: int) -> List[ReviewItem]:
+        with self.connections.get() as conn:
+            items = [_review_item(row) for row in conn.execute(
+                _SELECT_REVIEW + "WHERE due_at <= ? ORDER BY priority, due_at LIMIT ?", (now, limit),
+            )]
+            conn.executemany("DELETE FROM review_items WHERE item_id = ?", [(item.item_id,) for item in items])
+        return items
+
+    def between(self, start: float, end: float) -> List[ReviewItem]:
+        rows = self.connections.get().execute(
+            _SELECT_REVIEW + "WHERE due_at BETWEEN ? AND ? ORDER BY due_at", (start, end),
+        )
+        return [_review_item(row) for row in rows]
+
+    def for_skill(self, teks: str) -> List[ReviewItem]:
+        rows = self.connections.get().execute(_SELECT_REVIEW + "WHERE teks = ? ORDER BY due_at", (teks,))
+        return [_review_item(row) for row in rows]
+
+    def all(self) -> List[ReviewItem]:
+        return [_review_item(row) for row in self.connections.get().execute(_SELECT_REVIEW + "ORDER BY teks")]
+
+
+def _review_item(row) -> ReviewItem:
+    item_id, teks, due_at, priority, interval_index = row
+    return ReviewItem(teks=teks, item_id=item_id, due_at=datetime.fromtimestamp(due_at),
+                      priority=priority, interval_index=interval_index)
@@ -0,0 +1,51 @@
+import threading
+from typing import Set
+
+from services.item_factory import ItemFactory
+
+
+class TemplateWatcher:
+    """Polls the templates directory and hot-reloads changed files.
+
+    Polling only stats the template files (mtime and size), so it needs no
+    inotify or external service; the actual work happens in
+    `ItemFactory.reload_templates` and only for files that changed.
+    """
+
+    def __init__(self, item_factory: ItemFactory, interval: float = 2.0):
+        self.item_factory = item_factory
+        self.interval = interval
+        self.reloads = 0
+        self.last_changed: Set[str] = set()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def check(self) -> Set[str]:
+        """Run one poll; returns the template ids that changed."""
+        changed = self.item_factory.reload_templates()
+        if changed:
+            self.reloads += 1
+            self.last_changed = changed
+            print(f"Reloaded templates: {', '.join(sorted(changed))}")
+        return changed
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="template-watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float | None = 5.0):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.check()
+            except Exception as e:
+                # A bad poll must not kill the watcher thread
+                print(f"Template watcher error: {e}")
@@ -0,0 +1,109 @@
+import threading
+import time
+from typing import Any, Callable, Dict, List
+
+from services.item_factory import ItemFactory
+from services.item_pool import ItemPool
+
+
+# Warm-up steps in the order they run
+DEFAULT_STEPS = ["imports", "templates", "pool", "diagrams", "grading"]
+
+
+class Warmup:
+    """Runs the warm-up phase that gates `/health/ready`.
+
+    Each step pays a cost the first live requests would otherwise eat:
+    importing lazily loaded modules, compiling templates, priming item pools
+    and the diagram cache, and running one grade per non-expression item type.
+    """
+
+    def __init__(self, item_factory: ItemFactory, item_pool: ItemPool, steps: List[str] | None = None):
+        self.item_factory = item_factory
+        self.item_pool = item_pool
+        self.steps = list(DEFAULT_STEPS if steps is None else steps)
+        unknown = [step for step in self.steps if step not in self._step_functions()]
+        if unknown:
+            raise ValueError(f"Unknown warm-up steps: {unknown}")
+        self.ready = not self.steps
+        self.error: str | None = None
+        self.duration_seconds: float | None = 0.0 if self.ready else None
+        self.step_seconds: Dict[str, float] = {}
+        self._thread: threading.Thread | None = None
+
+    def run(self):
+        """Run every configured step, then mark the worker ready."""
+        started = time.perf_counter()
+        steps = self._step_functions()
+        try:
+            for step in self.steps:
+                step_started = time.perf_counter()
+                steps[step]()
+                self.step_seconds[step] = time.perf_counter() - step_started
+        except Exception as e:
+            self.error = f"{step}: {e}"
+            raise
+        finally:
+            self.duration_seconds = time.perf_counter() - started
+        self.ready = True
+
+    def start(self):
+        """Run the warm-up in a background thread so liveness checks still answer."""
+        if self.ready or self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run_logged, name="warmup", daemon=True)
+        self._thread.start()
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "status": "ready" if self.ready else ("failed" if self.error else "warming_up"),
+            "warmup_seconds": self.duration_seconds,
+            "steps": dict(self.step_seconds),
+            "error": self.error,
+        }
+
+    def _run_logged(self):
+        try:
+            self.run()
+        except Exception as e:
+            print(f"Warm-up failed: {self.error or e}")
+
+    def _step_functions(self) -> Dict[str, Callable[[], None]]:
+        return {
+            "imports": self._warm_imports,
+            "templates": self._warm_templates,
+            "pool": self._warm_pool,
+            "diagrams": self._warm_diagrams,
+            "grading": self._warm_grading,
+        }
+
+    def _warm_imports(self):
+        import sympy  # noqa: F401  Lazily imported by the expression graders
+
+    def _warm_templates(self):
+        # Pick up any edits made since boot; compiles and indexes what changed
+        self.item_factory.reload_templates()
+
+    def _warm_pool(self):
+        self.item_pool.prime()
+
+    def _warm_diagrams(self):
+        from engines.svg_renderers import render_trapezoid
+
+        for template_id, template in self.item_factory.templates_cache.items():
+            index = self.item_factory.param_indexes.get(template_id)
+            if template.get("presentation", {}).get("diagram") != "trapezoid_svg" or index is None:
+                continue
+            for row in range(index.count):
+                params = index.params_at(row)
+                render_trapezoid(params["b1"], params["b2"], params["h"], params["units"])
+
+    def _warm_grading(self):
+        # Expression grading is skipped: sympy work belongs to the first request that needs it
+        from engines.grader import grade_mc, grade_numeric, grade_plot
+
+        grade_numeric(40, 40, 0, "int")
+        grade_numeric("7/2", "7/2", 0, "fraction")
+        grade_numeric(3.5, 3.5, 0.001, "decimal")
+        grade_mc(["k/5=3"], ["k/5=3"])
+        grade_plot((1.0, 2.0), (1.0, 2.0))
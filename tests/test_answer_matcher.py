@@ -0,0 +1,54 @@
+"""Tests for the compiled answer-key matcher."""
+
+from fractions import Fraction
+from engines.answer_matcher import compile_matcher, normalize_number
+from engines.grader import grade_numeric
+
+
+def test_equivalent_written_forms_accepted():
+    """Reduced fraction, unreduced fraction, mixed number and decimal all match."""
+    for response in ["7/2", "14/4", "3 1/2", "3.5", "3.50", " 3.500 ", 3.5, Fraction(7, 2)]:
+        assert grade_numeric(response, Fraction(7, 2), 0, "fraction")["correct"], response
+    for response in ["-11/4", "-2 3/4", "-2.75", "−2.75"]:
+        assert grade_numeric(response, -2.75, 0, "decimal")["correct"], response
+    assert grade_numeric("1,200", 1200, 0, "int")["feedback_code"] == "OK"
+
+
+def test_units_and_mismatches():
+    """Matching units are accepted, other trailing text is not."""
+    assert grade_numeric("40 u^2", 40, 0, "int", "u^2")["correct"]
+    assert grade_numeric("40 square units", 40, 0, "int", "u^2")["correct"]
+    assert grade_numeric("40 cm", 40, 0, "int", "u^2")["feedback_code"] == "UNITS_MISMATCH"
+    assert grade_numeric("40 apples", 40, 0, "int")["feedback_code"] == "PARSE_ERROR"
+    for response in ["40 m²", "40 m^2", "40 m2", "40 square m", "40 sq m", "40 sq. m", "40 square meters", "40"]:
+        assert grade_numeric(response, 40, 0, "int", "m^2")["correct"], response
+    for response in ["40 cm²", "40 m", "40 square units"]:
+        assert grade_numeric(response, 40, 0, "int", "m^2")["feedback_code"] == "UNITS_MISMATCH", response
+    assert grade_numeric("3/0", 3, 0, "int")["feedback_code"] == "PARSE_ERROR"
+    assert grade_numeric("3 1/3", Fraction(7, 2), 0, "fraction")["feedback_code"] == "NUM_MISMATCH"
+
+
+def test_tolerance_and_written_forms():
+    matcher = compile_matcher(2.333, "decimal", 0.001)
+    assert matcher.match("2.3335")["correct"]
+    assert not matcher.match("2.335")["correct"]
+    assert compile_matcher(Fraction(7, 2), "fraction").written_forms() == ["7/2", "3 1/2", "3.5"]
+    assert compile_matcher(Fraction(-1, 3), "fraction").written_forms() == ["-1/3"]
+    assert compile_matcher(40, "int").written_forms() == ["40"]
+    assert normalize_number(0.1) == (Fraction(1, 10), "")
+    assert normalize_number(True) is None
+
+
+def test_item_answer_units_follow_its_length_unit():
+    """Trapezoid items accept area units of their own length unit only."""
+    from services.answer_tokens import answer_key
+    from services.item_factory import ItemFactory
+
+    factory = ItemFactory()
+    items = [factory.generate_item("6.8B_trapezoid_area", seed) for seed in range(40)]
+    item = next(item for item in items if item["params"]["units"] == "m")
+    assert item["answer_format"]["units"] == "m^2"
+    key = answer_key(item)
+    for response in [f"{item['answer']} m²", f"{item['answer']} square m"]:
+        assert grade_numeric(response, key["key"], key["tolerance"], key["form"], key["units"])["correct"]
+    assert not grade_numeric(f"{item['answer']} cm²", key["key"], key["tolerance"], key["form"], key["units"])["correct"]
@@ -0,0 +1,76 @@
+"""Tests for signed answer tokens."""
+
+import json
+import pytest
+from services.answer_tokens import AnswerTokenSigner, InvalidAnswerToken, _b64decode, answer_key
+from services.item_factory import ItemFactory
+
+
+def test_round_trip_numeric_and_mc():
+    """Tokens name the item and learner; the key is regenerated from them."""
+    factory = ItemFactory()
+    signer = AnswerTokenSigner("secret")
+    for template_id in ["6.8B_trapezoid_area", "6.9A_one_step", "6.7B_expr_vs_eq"]:
+        item = factory.generate_item(template_id, 12)
+        claims = signer.verify(signer.issue(item, template_id, "learner-a"), "learner-a")
+        assert factory.generate_item(claims["template_id"], claims["seed"], claims["difficulty"])["id"] == item["id"]
+        assert claims["teks"] == item["teks"]
+        key = answer_key(factory.generate_item(claims["template_id"], claims["seed"]))["key"]
+        if item["type"] == "mc":
+            assert key == [o["value"] for o in item["options"] if o["correct"]]
+        else:
+            assert key == item["answer"]
+
+
+def test_token_does_not_contain_answer():
+    item = ItemFactory().generate_item("6.8B_trapezoid_area", 3)
+    body = AnswerTokenSigner("secret").issue(item, "6.8B_trapezoid_area", "learner-a").split(".")[0]
+    payload = json.loads(_b64decode(body))
+    # template, seed, teks, difficulty, type, learner, nonce, issued_at
+    assert payload[:6] == ["6.8B_trapezoid_area", 3, "6.8B", item["difficulty"], item["type"], "learner-a"]
+    assert len(payload) == 8
+
+
+def test_tampering_and_foreign_secret_rejected():
+    item = ItemFactory().generate_item("6.8B_trapezoid_area", 3)
+    token = AnswerTokenSigner("secret").issue(item, "6.8B_trapezoid_area", "learner-a")
+    body, tag = token.split(".")
+    with pytest.raises(InvalidAnswerToken):
+        AnswerTokenSigner("other").verify(token)
+    with pytest.raises(InvalidAnswerToken):
+        AnswerTokenSigner("secret").verify(body[:-1] + ("A" if body[-1] != "A" else "B") + "." + tag)
+    with pytest.raises(InvalidAnswerToken):
+        AnswerTokenSigner("secret").verify("garbage")
+
+
+def test_expired_token_rejected():
+    item = ItemFactory().generate_item("6.8B_trapezoid_area", 3)
+    signer = AnswerTokenSigner("secret", max_age_seconds=-1)
+    with pytest.raises(InvalidAnswerToken):
+        signer.verify(signer.issue(item, "6.8B_trapezoid_area", "learner-a"))
+
+
+def test_token_bound_to_learner_and_single_use():
+    item = ItemFactory().generate_item("6.8B_trapezoid_area", 3)
+    signer = AnswerTokenSigner("secret")
+    token = signer.issue(item, "6.8B_trapezoid_area", "learner-a")
+    with pytest.raises(InvalidAnswerToken):
+        signer.verify(token, "learner-b")
+    claims = signer.verify(token, "learner-a")
+    signer.consume(claims)
+    with pytest.raises(InvalidAnswerToken):
+        signer.consume(signer.verify(token, "learner-a"))
+    # A fresh token for the same item is still accepted
+    signer.consume(signer.verify(signer.issue(item, "6.8B_trapezoid_area", "learner-a"), "learner-a"))
+
+
+def test_forgotten_nonces_refuse_older_tokens():
+    """Past max_seen, tokens as old as the forgotten ones can't be replayed."""
+    item = ItemFactory().generate_item("6.8B_trapezoid_area", 3)
+    signer = AnswerTokenSigner("secret", max_seen=1)
+    first = signer.verify(signer.issue(item, "6.8B_trapezoid_area", "learner-a"))
+    second = signer.verify(signer.issue(item, "6.8B_trapezoid_area", "learner-a"))
+    signer.consume(first)
+    signer.consume(second)
+    with pytest.raises(InvalidAnswerToken):
+        signer.consume(first)
@@ -1,3 +1,5 @@
+from unittest import mock
+
 from fastapi.testclient import TestClient
 
 from api.main import app
@@ -16,3 +18,148 @@ def test_root_ok():
     r = client.get("/")
     assert r.status_code == 200
     assert r.json().get("ok") is True
+
+
+def test_practice_next_ok():
+    r = client.get("/practice/next", params={"teks": "6.8B"})
+    assert r.status_code == 200
+    body = r.json()
+    assert body["teks"] == "6.8B"
+    assert "seed" in body
+
+
+def test_practice_pool_stats():
+    r = client.get("/practice/pool")
+    assert r.status_code == 200
+    body = r.json()
+    assert "hits" in body and "misses" in body and "depth" in body
+
+
+def test_ready_after_warmup():
+    import time
+
+    with TestClient(app) as warm_client:
+        deadline = time.time() + 30
+        r = warm_client.get("/health/ready")
+        while r.status_code == 503 and time.time() < deadline:
+            time.sleep(0.05)
+            r = warm_client.get("/health/ready")
+        assert r.status_code == 200
+        body = r.json()
+        assert body["status"] == "ready"
+        assert body["warmup_seconds"] > 0
+        assert set(body["steps"]) == {"imports", "templates", "pool", "diagrams", "grading"}
+
+
+def test_attempt_graded_from_token():
+    r = client.get("/practice/next", params={"teks": "6.8B"})
+    body = r.json()
+    assert "answer" not in body
+    answer = app.state.item_factory.get_item(body["id"])["answer"]
+
+    right = client.post("/attempts", json={"item_id": body["id"], "user_response": answer, "token": body["token"]})
+    assert right.status_code == 200
+    assert right.json()["correct"] is True
+
+    replay = client.post("/attempts", json={"item_id": body["id"], "user_response": answer, "token": body["token"]})
+    assert replay.status_code == 400
+
+    body = client.get("/practice/next", params={"teks": "6.8B"}).json()
+    answer = app.state.item_factory.get_item(body["id"])["answer"]
+    wrong = client.post("/attempts", json={"item_id": body["id"], "user_response": answer + 1, "token": body["token"]})
+    assert wrong.json()["correct"] is False
+    assert wrong.json()["feedback_code"] == "NUM_MISMATCH"
+
+
+def test_attempt_rejects_token_of_another_learner():
+    body = client.get("/practice/next", params={"teks": "6.8B"}, headers={"X-Learner-Id": "token-owner"}).json()
+    r = client.post("/attempts", json={"item_id": body["id"], "user_response": 1, "token": body["token"]},
+                    headers={"X-Learner-Id": "someone-else"})
+    assert r.status_code == 400
+
+
+def test_attempt_rejects_bad_token():
+    body = client.get("/practice/next", params={"teks": "6.8B"}).json()
+    r = client.post("/attempts", json={"item_id": body["id"], "user_response": 1, "token": body["token"][:-2] + "AA"})
+    assert r.status_code == 400
+    r = client.post("/attempts", json={"item_id": "itm_other", "user_response": 1, "token": body["token"]})
+    assert r.status_code == 400
+
+
+def test_attempts_batch():
+    items = [client.get("/practice/next", params={"teks": "6.8B"}).json() for _ in range(3)]
+    attempts = []
+    for i, body in enumerate(items):
+        answer = app.state.item_factory.get_item(body["id"])["answer"]
+        attempts.append({
+            "item_id": body["id"],
+            "user_response": answer if i != 1 else answer + 1,
+            "token": body["token"],
+            "answered_at": f"2026-01-05T09:0{i}:00Z",
+        })
+    attempts.append({"item_id": items[0]["id"], "user_response": 1, "token": "bad.token"})
+    attempts.append({**attempts[0], "answered_at": "2026-01-05T09:05:00Z"})  # Replayed token
+
+    r = client.post("/attempts/batch", json={"attempts": attempts})
+    assert r.status_code == 200
+    body = r.json()
+    assert (body["accepted"], body["rejected"]) == (3, 2)
+    assert [res.get("correct") for res in body["results"][:3]] == [True, False, True]
+    assert "error" in body["results"][3]
+    assert "error" in body["results"][4]
+
+
+def test_failed_batch_can_be_retried():
+    """A batch whose mastery update fails keeps its tokens usable for the retry."""
+    headers = {"X-Learner-Id": "learner-batch-retry-test"}
+    items = [client.get("/practice/next", params={"teks": "6.8B"}, headers=headers).json() for _ in range(2)]
+    attempts = [{"item_id": body["id"], "user_response": app.state.item_factory.get_item(body["id"])["answer"],
+                 "token": body["token"]} for body in items]
+    failing = TestClient(app, raise_server_exceptions=False)
+    with mock.patch.object(app.state.mastery_service, "update_mastery_batch", side_effect=RuntimeError("disk full")):
+        assert failing.post("/attempts/batch", json={"attempts": attempts}, headers=headers).status_code == 500
+
+    r = client.post("/attempts/batch", json={"attempts": attempts}, headers=headers)
+    assert (r.json()["accepted"], r.json()["rejected"]) == (2, 0)
+    r = client.post("/attempts/batch", json={"attempts": attempts}, headers=headers)
+    assert (r.json()["accepted"], r.json()["rejected"]) == (0, 2)
+
+
+def test_progress_is_per_learner():
+    headers = {"X-Learner-Id": "learner-progress-test"}
+    body = client.get("/practice/next", params={"teks": "6.8B"}, headers=headers).json()
+    r = client.post("/attempts", json={"item_id": body["id"], "user_response": 0, "token": body["token"]}, headers=headers)
+    assert r.status_code == 200
+    skills = client.get("/progress/me", headers=headers).json()["skills"]
+    assert [(s["teks"], s["attempts"]) for s in skills] == [("6.8B", 1)]
+    assert client.get("/progress/me", headers={"X-Learner-Id": "someone-else"}).json()["skills"] == []
+
+
+def test_review_forecast_counts_scheduled_reviews():
+    headers = {"X-Learner-Id": "learner-review-test"}
+    body = client.get("/practice/next", params={"teks": "6.8B"}, headers=headers).json()
+    client.post("/attempts", json={"item_id": body["id"], "user_response": 0, "token": body["token"]}, headers=headers)
+    forecast = client.get("/progress/reviews/forecast", params={"hours": 48}).json()
+    assert sum(bucket["count"] for bucket in forecast["buckets"]) >= 1
+    assert client.get("/progress/me/reviews", headers=headers).json() == {"skills": []}
+
+
+def test_practice_next_follows_stepped_difficulty():
+    headers = {"X-Learner-Id": "learner-difficulty-test"}
+    for _ in range(3):
+        body = client.get("/practice/next", params={"teks": "6.8B"}, headers=headers).json()
+        assert body["difficulty"] == 2
+        answer = app.state.item_factory.get_item(body["id"])["answer"]
+        client.post("/attempts", json={"item_id": body["id"], "user_response": answer, "token": body["token"]},
+                    headers=headers)
+    body = client.get("/practice/next", params={"teks": "6.8B"}, headers=headers).json()
+    assert body["difficulty"] == 3
+    assert client.get("/progress/me", headers=headers).json()["skills"][0]["difficulty"] == 3
+
+
+def test_practice_next_serves_recommendation():
+    headers = {"X-Learner-Id": "learner-recommendation-test"}
+    slots = client.get("/practice/recommendations", headers=headers).json()["slots"]
+    assert [(s["teks"], s["reason"]) for s in slots] == [("6.2", "next"), ("6.8B", "gap")]
+    body = client.get("/practice/next", headers=headers).json()
+    assert (body["teks"], body["difficulty"]) == ("6.2", 2)
@@ -0,0 +1,56 @@
+"""Tests for compiled template compute kernels."""
+
+from fractions import Fraction
+
+import numpy as np
+import pytest
+from engines.compute import compile_compute, compile_template
+
+
+def test_arithmetic_is_exact():
+    """Scalar kernels divide exactly instead of truncating."""
+    kernel = compile_compute("A = (b1 + b2)/2 * h")
+    assert kernel.target == "A"
+    assert kernel.scalar({"b1": 7, "b2": 8, "h": 3}) == Fraction(45, 2)
+
+
+def test_array_kernel():
+    """The same kernel evaluates over NumPy arrays."""
+    kernel = compile_compute("unit = y/x")
+    result = kernel.batch({"x": np.array([2, 4]), "y": np.array([10, 10])})
+    assert result.tolist() == [5.0, 2.5]
+
+
+def test_functions_and_aliases():
+    """Whitelisted functions and prose aliases compile."""
+    assert compile_compute("result = op_apply(a,b,op)").scalar({"a": 6, "b": 4, "op": "÷"}) == 1.5
+    assert compile_compute("solve for x").scalar({"form": "c x = d", "a": 1, "b": 9, "c": 6}) == Fraction(3, 2)
+    labels = compile_compute("labels = classify_exprs(forms)").scalar({"forms": ["k/5=3", "9m-4"]})
+    assert labels == ["equation", "expression"]
+
+
+@pytest.mark.parametrize("compute", [
+    "A = __import__('os')",
+    "A = b1.real",
+    "A = [b1 for b1 in h]",
+    "A = open(h)",
+    "A = 'text'",
+    "b1 + b2",
+])
+def test_rejects_unsafe_or_malformed(compute):
+    """Anything outside the arithmetic/function whitelist fails at compile time."""
+    with pytest.raises(ValueError):
+        compile_compute(compute)
+
+
+def test_rejects_unknown_params():
+    """Template compilation checks names against the declared params."""
+    with pytest.raises(ValueError):
+        compile_template({"compute": "A = b1 * w"}, ["b1", "b2", "h"])
+
+
+def test_no_array_form():
+    """Kernels that call scalar-only functions refuse batch evaluation."""
+    kernel = compile_compute("labels = classify_exprs(forms)")
+    with pytest.raises(NotImplementedError):
+        kernel.batch({"forms": np.array([["a=b"]])})
@@ -0,0 +1,61 @@
+"""Tests for the skill graph and curriculum sequencing."""
+
+import pytest
+
+from services.curriculum import CurriculumService
+from services.mastery import MasteryService
+from services.skill_graph import SkillGraph, SkillGraphError
+
+
+def practice(service: MasteryService, teks: str, correct: bool, times: int, learner_id: str = "ana"):
+    for _ in range(times):
+        service.update_mastery(teks, correct, learner_id=learner_id)
+
+
+def test_graph_compiles_catalog_in_topological_order():
+    graph = SkillGraph.load()
+    assert graph.skills == ["6.2", "6.4", "6.7B", "6.8B", "6.9A"]
+    assert graph.names(graph.prereq_masks[graph.index["6.9A"]]) == ["6.2", "6.7B"]
+    assert graph.names(graph.roots) == ["6.2", "6.8B"]
+
+    late_root = SkillGraph({"b": ["a"], "c": [], "a": []})
+    assert late_root.skills == ["c", "a", "b"]
+
+
+def test_graph_rejects_cycles_and_unknown_prereqs():
+    with pytest.raises(SkillGraphError, match="cycle: b -> c -> b"):
+        SkillGraph({"a": [], "b": ["a", "c"], "c": ["b"]})
+    with pytest.raises(SkillGraphError, match="unknown skills: z"):
+        SkillGraph({"a": ["z"]})
+
+
+def test_unlocks_follow_threshold_crossings():
+    """Crossing 0.7 unlocks dependents; dropping back relocks them."""
+    mastery = MasteryService()
+    curriculum = CurriculumService(mastery)
+    mastery.add_listener(curriculum.on_mastery_change)
+
+    assert curriculum.get_next_skill(learner_id="ana") == "6.2"
+    assert curriculum.get_unlocked_skills("ana") == ["6.2", "6.8B"]
+
+    practice(mastery, "6.2", True, 6)  # 1 - 0.8^6 = 0.74
+    assert curriculum.get_unlocked_skills("ana") == ["6.2", "6.4", "6.7B", "6.8B"]
+    assert curriculum.get_next_skill(learner_id="ana") == "6.4"
+    assert curriculum.get_next_skill(learner_id="ben") == "6.2"
+
+    practice(mastery, "6.7B", True, 6)
+    assert curriculum.is_skill_unlocked("6.9A", "ana")
+    practice(mastery, "6.2", False, 1)
+    assert curriculum.get_unlocked_skills("ana") == ["6.2", "6.8B"]
+    assert curriculum.get_next_skill(learner_id="ana") == "6.2"
+    assert curriculum.get_next_skill(["6.8B"], learner_id="ana") == "6.2"
+
+
+def test_state_is_built_from_existing_mastery():
+    """A learner's bitsets start from stored scores, with or without the listener."""
+    mastery = MasteryService()
+    for teks in ("6.2", "6.4", "6.7B", "6.8B", "6.9A"):
+        practice(mastery, teks, True, 6)
+    curriculum = CurriculumService(mastery)
+    assert curriculum.get_unlocked_skills("ana") == curriculum.get_skill_sequence()
+    assert curriculum.get_next_skill(learner_id="ana") == "6.2"  # All proficient: review from the start
@@ -0,0 +1,42 @@
+"""Tests for two-tier expression equivalence."""
+
+from unittest import mock
+
+from engines import expr_equiv
+from engines.expr_equiv import expressions_equivalent, normalize_expr, probe_equivalent
+
+
+def test_normalize_implicit_multiplication():
+    assert normalize_expr("4(x+3)") == "4*(x+3)"
+    assert normalize_expr("9m-4") == "9*m-4"
+    assert normalize_expr("(x+1)(x-1)") == "(x+1)*(x-1)"
+    assert normalize_expr("2^3 + 7") == "2**3 + 7"
+
+
+def test_equivalence_across_written_forms():
+    """6.7B/6.9A-style expressions compare algebraically."""
+    assert expressions_equivalent("4(x+3)", "4x + 12")
+    assert expressions_equivalent("(x+1)(x-1)", "x^2 - 1")
+    assert expressions_equivalent("x/2", "0.5x")
+    assert expressions_equivalent("2^3+7", "15")
+    assert not expressions_equivalent("4(x+3)", "4x + 3")
+    assert not expressions_equivalent("x^2", "2x")
+    assert not expressions_equivalent("sqrt(x^2)", "x")
+
+
+def test_probes_reject_without_sympy():
+    """A wrong answer is decided by the probes; sympy is never consulted."""
+    expr_equiv.clear_caches()
+    with mock.patch.object(expr_equiv, "_symbolic_cached") as symbolic:
+        assert not expressions_equivalent("3(y-5)", "3y - 5")
+        symbolic.assert_not_called()
+    assert probe_equivalent("3(y-5)", "3y - 15") is True
+    assert probe_equivalent("sqrt(x)", "x") is None
+
+
+def test_nested_powers_left_to_sympy():
+    """Degrees past MAX_PROBE_DEGREE are not probed, so huge Fractions are never built."""
+    nested = "((((((x^32)^32)^32)^32)^32)^32)"
+    assert expr_equiv.compile_probe(normalize_expr(nested)) is None
+    assert probe_equivalent(nested, "x") is None
+    assert probe_equivalent("(x^2)^3", "x^6") is True
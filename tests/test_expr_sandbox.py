@@ -0,0 +1,46 @@
+"""Tests for the process sandbox around sympy grading."""
+
+import time
+
+import pytest
+
+from engines import expr_equiv
+from engines.grader import grade_expression_result
+from services.expr_sandbox import ExprSandbox, SandboxTimeout
+
+
+@pytest.fixture
+def sandbox():
+    sandbox = ExprSandbox(workers=1, timeout=1.0, max_tasks_per_worker=3)
+    sandbox.start()
+    expr_equiv.use_sandbox(sandbox)
+    yield sandbox
+    expr_equiv.use_sandbox(None)
+    sandbox.stop()
+
+
+def test_pathological_input_times_out_and_worker_is_replaced(sandbox):
+    """A runaway sympify costs one worker restart, not a stuck request."""
+    assert grade_expression_result("4(x+3)", "4x+12")["feedback_code"] == "OK"
+
+    started = time.perf_counter()
+    result = grade_expression_result("9**9**9", "9")
+    assert result == {"correct": False, "canonical": "9", "feedback_code": "TIMEOUT"}
+    assert time.perf_counter() - started < 3
+    assert sandbox.stats()["restarts"] == 1
+
+    # The replacement worker serves the next call
+    assert grade_expression_result("2x", "x+x")["feedback_code"] == "OK"
+
+
+def test_workers_are_recycled(sandbox):
+    for _ in range(4):
+        assert sandbox.run(abs, -2) == 2
+    assert sandbox.stats()["recycled"] == 1
+    with pytest.raises(SandboxTimeout):
+        sandbox.run(time.sleep, 5)
+
+
+def test_oversized_and_unparsable_input():
+    assert grade_expression_result("x+" * 200 + "1", "x")["feedback_code"] == "PARSE_ERROR"
+    assert grade_expression_result("x +* )", "x")["feedback_code"] == "PARSE_ERROR"
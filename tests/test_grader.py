@@ -1,7 +1,8 @@
 """Tests for the grader engine."""
 
+import random
 import pytest
-from engines.grader import grade_numeric, grade_expression, grade_mc, grade_plot
+from engines.grader import grade_numeric, grade_numeric_batch, grade_expression, grade_mc, grade_plot
 
 
 def test_grade_numeric_exact():
@@ -78,3 +79,35 @@ def test_grade_plot_far():
     result = grade_plot((1.0, 2.0), (3.0, 4.0), 0.2)
     assert result["correct"] == False
     assert result["feedback_code"] == "PLOT_OFF"
+
+
+def test_grade_numeric_batch_matches_scalar():
+    """Batch grading returns exactly what grade_numeric returns per attempt."""
+    cases = [
+        (42, 42, 0, "int"),
+        (41, 42, 0, "int"),
+        ("42.1", 42, 0.2, "decimal"),
+        ("abc", 42, 0, "int"),
+        ("1/2", "1/2", 0, "fraction"),
+        ("2/4", "1/2", 0, "fraction"),
+        ("x/2", "1/2", 0, "fraction"),
+        (None, 3.5, 0, "decimal"),
+        ("3.50", 3.5, 0, "decimal"),
+        (" -0.1 ", -0.1, 0, "decimal"),
+        ("0.1000000000000000001", 0.1, 0, "decimal"),
+        ("2.334", 2.333, 0.001, "decimal"),
+        ("2.3341", 2.333, 0.001, "decimal"),
+        ("40 u^2", 40, 0, "int"),
+        ("1,200", 1200, 0, "int"),
+        (2 ** 60 + 1, 2 ** 60, 0, "int"),
+        (True, 1, 0, "int"),
+        (float("nan"), 3.5, 0, "decimal"),
+    ]
+    batch = grade_numeric_batch(*zip(*cases))
+    assert batch == [grade_numeric(u, k, t, f) for u, k, t, f in cases]
+
+    rng = random.Random(0)
+    cases = [(str(rng.randint(0, 400) / 8), rng.randint(0, 50), rng.choice([0, 0.125, 0.1]), "decimal")
+             for _ in range(2000)]
+    batch = grade_numeric_batch(*zip(*cases))
+    assert batch == [grade_numeric(u, k, t, f) for u, k, t, f in cases]
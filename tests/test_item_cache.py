@@ -0,0 +1,72 @@
+"""Tests for the seed-addressable item cache."""
+
+from services.item_cache import ItemCache
+from services.item_factory import ItemFactory
+
+
+TRAPEZOID = "6.8B_trapezoid_area"
+
+
+def test_lru_eviction():
+    """The least recently used entry is evicted first."""
+    cache = ItemCache(max_size=2)
+    cache.put("a", {"id": "a"})
+    cache.put("b", {"id": "b"})
+    cache.get("a")
+    cache.put("c", {"id": "c"})
+    assert cache.get("b") is None
+    assert cache.get("a") == {"id": "a"}
+    stats = cache.stats()
+    assert stats["evictions"] == 1
+    assert stats["size"] == 2
+
+
+def test_ttl_expiry():
+    """Entries older than the TTL are treated as misses."""
+    cache = ItemCache(max_size=4, ttl_seconds=0)
+    cache.put("a", {"id": "a"})
+    assert cache.get("a") is None
+    assert cache.stats()["expirations"] == 1
+
+
+def test_factory_regeneration_is_a_hit():
+    """Regenerating (template_id, seed) and looking up by id hit the cache."""
+    factory = ItemFactory(cache_size=16)
+    item = factory.generate_item(TRAPEZOID, 4242)
+    assert factory.generate_item(TRAPEZOID, 4242) is item
+    assert factory.get_item(item["id"]) is item
+    assert factory.item_cache.stats()["hits"] == 2
+
+
+def test_get_item_regenerates_after_eviction():
+    """Evicted items are rebuilt from the seed encoded in their id."""
+    factory = ItemFactory(cache_size=1)
+    item = factory.generate_item(TRAPEZOID, 1)
+    factory.generate_item(TRAPEZOID, 2)
+    assert factory.get_item(item["id"]) == item
+    assert factory.get_item("itm_6.8B_unknown_1") is None
+
+
+def test_disk_cache_survives_restart(tmp_path):
+    """A new cache over the same directory serves earlier items from disk."""
+    ItemFactory(cache_dir=str(tmp_path)).generate_item(TRAPEZOID, 77)
+    factory = ItemFactory(cache_dir=str(tmp_path))
+    item = factory.get_item(f"itm_6.8B_{TRAPEZOID}_77")
+    assert item["seed"] == 77
+    assert factory.item_cache.stats()["disk_hits"] == 1
+
+
+def test_disk_tier_is_bounded_json(tmp_path):
+    """Disk entries are JSON (exact fractions included) and the oldest go beyond the cap."""
+    from fractions import Fraction
+
+    cache = ItemCache(max_size=1, cache_dir=tmp_path, disk_max_items=10)
+    for i in range(25):
+        cache.put(f"item-{i}", {"id": f"item-{i}", "answer": Fraction(i, 7)})
+    assert 9 <= len(list(tmp_path.glob("*.json"))) <= 10
+    assert not list(tmp_path.glob("*.pkl"))
+    assert cache.stats()["disk_evictions"] >= 15
+
+    reopened = ItemCache(cache_dir=tmp_path, disk_max_items=10)
+    assert reopened.get("item-24") == {"id": "item-24", "answer": Fraction(24, 7)}
+    assert reopened.get("item-0") is None
@@ -0,0 +1,119 @@
+"""Tests for the item factory."""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from services.item_factory import ItemFactory
+
+
+TRAPEZOID = "6.8B_trapezoid_area"
+
+
+def test_same_seed_same_item():
+    """(template_id, seed) fully determines the item."""
+    factory = ItemFactory()
+    assert factory.generate_item(TRAPEZOID, 1234) == factory.generate_item(TRAPEZOID, 1234)
+
+
+def test_seed_reproducible_under_concurrency():
+    """Concurrent generation does not clobber other calls' seeds."""
+    factory = ItemFactory()
+    seeds = list(range(1000, 1200))
+    expected = [factory.generate_item(TRAPEZOID, seed) for seed in seeds]
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        actual = list(executor.map(lambda seed: factory.generate_item(TRAPEZOID, seed), seeds))
+    assert actual == expected
+
+
+def test_item_records_seed_used():
+    """Items generated without a seed still record the one they used."""
+    factory = ItemFactory()
+    item = factory.generate_item(TRAPEZOID)
+    assert item["id"].endswith(f"_{item['seed']}")
+    assert factory.generate_item(TRAPEZOID, item["seed"]) == item
+
+
+def test_generate_many_matches_serial():
+    """Thread and process fan-out return the serial items in seed order."""
+    factory = ItemFactory()
+    seeds = [7, 42, 1000, 9999, 123456]
+    expected = [factory.generate_item(TRAPEZOID, seed) for seed in seeds]
+    assert factory.generate_many(TRAPEZOID, seeds, max_workers=4) == expected
+    assert factory.generate_many(TRAPEZOID, seeds, max_workers=2, use_processes=True) == expected
+
+
+def test_all_numeric_templates_generate():
+    """Flat *_min/*_max and *_choices params are drawn for every numeric template."""
+    factory = ItemFactory()
+    for template_id in ["6.2_rationals_ops", "6.4_unit_rate", "6.8B_trapezoid_area", "6.9A_one_step"]:
+        for seed in range(50):
+            factory.generate_item(template_id, seed)
+
+
+def test_generate_batch_respects_constraints():
+    """Batch survivors satisfy integer_area and carry int answers."""
+    factory = ItemFactory()
+    items = factory.generate_batch(TRAPEZOID, 200, seed=3)
+    assert len(items) == 200
+    for item in items:
+        p = item["params"]
+        assert (p["b1"] + p["b2"]) * p["h"] % 2 == 0
+        assert isinstance(item["answer"], int)
+        assert item["answer"] == (p["b1"] + p["b2"]) * p["h"] // 2
+
+
+def test_generate_batch_gives_up_on_unsatisfiable_constraints():
+    """No draw can pass: a bounded number of bounded rounds, then a clear error."""
+    factory = ItemFactory()
+    template = dict(factory.templates_cache[TRAPEZOID])
+    template["params"] = dict(template["params"], h_min=0, h_max=0)  # Fails nondegenerate
+    with pytest.raises(ValueError, match="unsatisfiable"):
+        factory._draw_batch_until_valid(template, factory.kernels[TRAPEZOID], np.random.default_rng(0), 5000)
+
+
+def test_generate_batch_columns_match_scalar_solver():
+    """Column-wise batch answers agree with the scalar solver."""
+    from engines.solver import eval_compute
+
+    factory = ItemFactory()
+    for template_id in ["6.2_rationals_ops", "6.9A_one_step"]:
+        template = factory.templates_cache[template_id]
+        batch = factory.generate_batch(template_id, 500, seed=11, materialize=False)
+        assert batch["count"] == 500
+        answers = batch["answers"].tolist()
+        for i in range(500):
+            params = {key: column[i].item() for key, column in batch["params"].items()}
+            expected, _ = eval_compute(template, params)
+            assert answers[i] == expected
+
+
+def test_expr_vs_eq_mc_item():
+    """6.7B draws a set of forms with at least two equations and two expressions."""
+    factory = ItemFactory()
+    item = factory.generate_item("6.7B_expr_vs_eq", 5)
+    labels = [opt["label"] for opt in item["options"]]
+    assert labels == item["answer"]
+    assert labels.count("equation") >= 2 and labels.count("expression") >= 2
+
+
+def test_difficulty_levels_scale_parameter_ranges():
+    """Levels above the template's own draw larger numbers, levels below smaller ones."""
+    factory = ItemFactory()
+    template = factory.templates_cache["6.8B_trapezoid_area"]
+    assert factory.template_at_level(template, 2) == template
+    easy, hard = factory.template_at_level(template, 1), factory.template_at_level(template, 4)
+    assert (easy["params"]["b1_min"], easy["params"]["b1_max"]) == (3, 9)
+    assert (hard["params"]["b1_min"], hard["params"]["b1_max"]) == (9, 32)
+    assert hard["params"]["units"] == template["params"]["units"]
+
+    for level, scaled in ((1, easy), (4, hard)):
+        items = [factory.generate_item("6.8B_trapezoid_area", seed, level) for seed in range(30)]
+        assert all(item["difficulty"] == level for item in items)
+        assert all(scaled["params"]["h_min"] <= item["params"]["h"] <= scaled["params"]["h_max"] for item in items)
+        assert factory.get_item(items[0]["id"]) == items[0]
+    native, leveled = factory.generate_item("6.8B_trapezoid_area", 7), factory.generate_item("6.8B_trapezoid_area", 7, 4)
+    assert native["id"] != leveled["id"]
+    with pytest.raises(ValueError):
+        factory.generate_item("6.8B_trapezoid_area", 7, 0)
@@ -0,0 +1,66 @@
+"""Tests for the pre-generated item pool."""
+
+import time
+
+from services.item_factory import ItemFactory
+from services.item_pool import ItemPool
+
+
+TRAPEZOID = "6.8B_trapezoid_area"
+
+
+def test_pool_miss_generates_inline():
+    """An empty pool still serves an item and counts a miss."""
+    pool = ItemPool(ItemFactory(), target_size=4, low_water=2)
+    item = pool.get(TRAPEZOID)
+    assert item["teks"] == "6.8B"
+    stats = pool.stats()
+    assert stats["misses"] == 1
+    assert stats["hits"] == 0
+
+
+def test_pool_prime_then_hit():
+    """Primed pools serve hits and shrink by one per pop."""
+    pool = ItemPool(ItemFactory(), target_size=5, low_water=1)
+    pool.prime([TRAPEZOID])
+    assert pool.depth()[f"{TRAPEZOID}@2"] == 5
+
+    pool.get(TRAPEZOID)
+    stats = pool.stats()
+    assert stats["hits"] == 1
+    assert stats["depth"][f"{TRAPEZOID}@2"] == 4
+    assert stats["items_generated"] == 5
+
+
+def test_pool_generates_items_at_requested_difficulty():
+    """A pool at another level serves items generated at that level, under their own ids."""
+    factory = ItemFactory()
+    pool = ItemPool(factory, target_size=3, low_water=1)
+    pool.prime([TRAPEZOID])
+    item = pool.get(TRAPEZOID, 4)
+    assert item["difficulty"] == 4
+    assert item["id"] == f"itm_6.8B_{TRAPEZOID}_L4_{item['seed']}"
+    assert factory.get_item(item["id"]) == item
+    assert factory.generate_item(TRAPEZOID, item["seed"])["difficulty"] == 2
+    pool._refill(pool.key_for(TRAPEZOID, 4))
+    assert pool.depth()[f"{TRAPEZOID}@4"] == 3
+    assert pool.get(TRAPEZOID, 4)["difficulty"] == 4
+
+
+def test_pool_background_refill():
+    """The worker tops a pool back up after it drops below low water."""
+    pool = ItemPool(ItemFactory(), target_size=6, low_water=3)
+    pool.start([TRAPEZOID])
+    try:
+        deadline = time.time() + 5
+        while pool.depth()[f"{TRAPEZOID}@2"] < 6 and time.time() < deadline:
+            time.sleep(0.01)
+        for _ in range(4):
+            pool.get(TRAPEZOID)
+        deadline = time.time() + 5
+        while pool.depth()[f"{TRAPEZOID}@2"] < 6 and time.time() < deadline:
+            time.sleep(0.01)
+        assert pool.depth()[f"{TRAPEZOID}@2"] == 6
+        assert pool.stats()["refills"] >= 2
+    finally:
+        pool.stop()
@@ -0,0 +1,132 @@
+"""Tests for the mastery service."""
+
+import math
+from datetime import datetime, timedelta
+
+import pytest
+
+from services.mastery import MasteryService
+from services.mastery_store import MasteryCell
+
+
+def test_batch_applies_updates_in_time_order():
+    """Queued attempts update the EWMA as if submitted one by one in time order."""
+    base = datetime(2026, 1, 5, 9, 0)
+    updates = [
+        ("6.8B", True, 2, base + timedelta(minutes=2)),
+        ("6.8B", False, 2, base),
+        ("6.2", True, 2, base + timedelta(minutes=1)),
+        ("6.8B", True, 2, base + timedelta(minutes=1)),
+    ]
+    batch = MasteryService()
+    results = batch.update_mastery_batch(updates)
+
+    sequential = MasteryService()
+    expected = {}
+    for i in sorted(range(len(updates)), key=lambda i: updates[i][3]):
+        expected[i] = sequential.update_mastery_batch([updates[i]])[0]
+
+    assert [r["score"] for r in results] == [expected[i]["score"] for i in range(len(updates))]
+    assert batch.get_mastery("6.8B").attempts == 3
+    assert batch.get_mastery("6.8B").last_seen_at == base + timedelta(minutes=2)
+
+
+def test_learners_are_isolated_and_queryable_by_skill():
+    """Each learner has their own record; due reviews are found per skill."""
+    service = MasteryService()
+    service.update_mastery("6.8B", True, learner_id="ana")
+    service.update_mastery("6.8B", False, learner_id="ben")
+    service.update_mastery("6.8B", False, learner_id="ben")
+    service.update_mastery("6.2", True, learner_id="ben")
+
+    assert service.get_mastery("6.8B", "ana").attempts == 1
+    assert service.get_mastery("6.8B", "ben").incorrect_streak == 2
+    assert service.get_mastery("6.2", "ana") is None
+    assert [r.teks for r in service.get_all_mastery("ben")] == ["6.8B", "6.2"]
+    assert service.get_all_mastery("nobody") == []
+
+    tomorrow = datetime.now() + timedelta(days=1, minutes=1)
+    assert service.get_learners_due_for_review("6.8B", tomorrow) == ["ana", "ben"]
+    assert service.get_learners_due_for_review("6.8B") == []
+
+    service.reset_mastery("6.8B", "ana")
+    assert service.get_mastery_level("6.8B", "ana") == "not_started"
+
+
+def test_store_grows_past_initial_capacity():
+    from services.mastery_store import MasteryStore
+
+    service = MasteryService(store=MasteryStore(initial_rows=2))
+    for i in range(5):
+        service.update_mastery("6.4", i % 2 == 0, learner_id=f"learner-{i}")
+    assert service.store.capacity >= 5
+    assert len(service.store) == 5
+    assert service.get_mastery("6.4", "learner-4").score > 0
+
+
+def test_store_keeps_rows_for_touched_cells_only(tmp_path):
+    """One row per started (learner, skill); a snapshot restores rows, order and due queries."""
+    from services.mastery_store import MasteryStore
+
+    store = MasteryStore(skills=[f"6.{i}" for i in range(40)])
+    store.write("ana", "6.8B", MasteryCell(0.4, 2, 100, 500, 0, 2, 2))
+    store.write("ben", "6.2", MasteryCell(0.9, 9, 100, 9000, 9, 0, 3))
+    store.write("ana", "6.2", MasteryCell(0.5, 1, 200, 400, 1, 0, 2))
+    assert store.rows == 3
+    assert [teks for teks, _ in store.learner_cells("ana")] == ["6.8B", "6.2"]
+    assert store.learners_due("6.2", 1000) == ["ana"]
+
+    store.save(tmp_path / "snapshot.npz", seq=7)
+    loaded, seq = MasteryStore.load(tmp_path / "snapshot.npz")
+    assert seq == 7 and loaded.rows == 3
+    assert loaded.learner_cells("ana") == store.learner_cells("ana")
+    assert loaded.learners_due("6.2", 10_000) == ["ben", "ana"]
+    loaded.write("cy", "6.8B", MasteryCell(0.2, 1, 300, 600, 0, 1, 2))
+    assert sorted(loaded.learners_due("6.8B", 1000)) == ["ana", "cy"]
+
+
+def test_scores_decay_lazily_and_schedule_review():
+    """Reads see the forgetting curve; mastered skills come due once decayed below threshold."""
+    answered = datetime.now() - timedelta(days=20)
+    decaying = MasteryService(half_life_days=10)
+    steady = MasteryService(half_life_days=None)
+    updates = [("6.8B", True, 2, answered + timedelta(seconds=i)) for i in range(20)]
+    for service in (decaying, steady):
+        service.update_mastery_batch(updates, "ana")
+
+    record = decaying.get_mastery("6.8B", "ana")
+    assert record.effective_score == pytest.approx(record.score / 4, rel=1e-3)
+    assert decaying.get_mastery_level("6.8B", "ana") == "struggling"
+    assert steady.get_mastery_level("6.8B", "ana") == "mastered"
+    assert steady.get_mastery("6.8B", "ana").due_review_at is None
+
+    # Due when score * 2^(-t / 10 days) reaches the threshold, fixed at write time
+    days_until_due = 10 * math.log2(record.score / decaying.threshold)
+    assert (record.due_review_at - record.last_seen_at).total_seconds() == pytest.approx(days_until_due * 86400, abs=1)
+    assert decaying.get_learners_due_for_review("6.8B") == ["ana"]
+    assert steady.get_learners_due_for_review("6.8B") == []
+
+
+def test_difficulty_steps_with_streaks():
+    """Each run of 3 right steps the level up and each run of 2 wrong steps it down, within 1-5."""
+    service = MasteryService()
+    assert service.get_difficulty("6.2", "ana") == 2
+    levels = [service.update_mastery("6.2", correct, learner_id="ana")["difficulty"]
+              for correct in [True] * 12 + [False] * 10 + [True]]
+    assert levels == [2, 2, 3, 3, 3, 4, 4, 4, 5, 5, 5, 5] + [5, 4, 4, 3, 3, 2, 2, 1, 1, 1] + [1]
+    assert service.get_difficulty("6.2", "ana") == 1
+    assert service.get_mastery("6.2", "ana").difficulty == 1
+    assert service.get_difficulty("6.2", "ben") == 2
+
+
+def test_attempt_after_a_long_gap_starts_from_the_decayed_score():
+    """A wrong answer 180 days after reaching 0.95 must not raise mastery."""
+    service = MasteryService()
+    last_seen = datetime(2026, 1, 5, 9, 0)
+    service.store.write("ana", "6.8B", MasteryCell(0.95, 20, int(last_seen.timestamp()), 0, 20, 0))
+    decayed = 0.95 * 0.5 ** (180 / service.half_life_days)
+
+    result = service.update_mastery_batch([("6.8B", False, 2, last_seen + timedelta(days=180))], "ana")[0]
+    assert result["score"] == pytest.approx((1 - service.alpha) * decayed, rel=1e-6)
+    assert result["score"] < decayed
+    assert result["mastery_delta"] < 0
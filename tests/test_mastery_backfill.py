@@ -0,0 +1,110 @@
+"""Tests for the vectorized mastery backfill."""
+
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+from services.mastery import MasteryService
+from services.mastery_backfill import AttemptHistory, backfill, mastery_levels
+
+
+def random_history(count: int, seed: int = 0):
+    rng = random.Random(seed)
+    base = datetime(2026, 2, 2, 8, 0).timestamp()
+    return [
+        (f"learner-{rng.randrange(20)}", rng.choice(["6.2", "6.4", "6.8B"]), rng.random() < 0.6,
+         rng.randint(1, 3), base + rng.randrange(0, 5 * 86400, 60))
+        for _ in range(count)
+    ]
+
+
+@pytest.mark.parametrize("alpha, threshold", [(0.2, 0.83), (0.35, 0.7)])
+def test_backfill_matches_sequential_updates(alpha, threshold):
+    """Every cell equals what update_mastery_batch computes attempt by attempt."""
+    records = random_history(3000)
+    sequential = MasteryService(alpha=alpha, threshold=threshold)
+    by_learner = {}
+    for learner_id, teks, correct, difficulty, answered_at in records:
+        by_learner.setdefault(learner_id, []).append(
+            (teks, correct, difficulty, datetime.fromtimestamp(answered_at)))
+    for learner_id, updates in by_learner.items():
+        sequential.update_mastery_batch(updates, learner_id)
+
+    store = backfill(AttemptHistory.from_records(records), alpha, threshold)
+    for learner_id in by_learner:
+        expected = dict(sequential.store.learner_cells(learner_id))
+        actual = dict(store.learner_cells(learner_id))
+        assert actual.keys() == expected.keys()
+        for teks, cell in actual.items():
+            assert cell.score == pytest.approx(expected[teks].score, abs=1e-5)
+            # Decay-based due dates move ~1s per float32 ulp of score
+            assert cell.due_review == pytest.approx(expected[teks].due_review, abs=5)
+            assert cell._replace(score=0, due_review=0) == expected[teks]._replace(score=0, due_review=0)
+
+
+def test_backfill_continues_existing_cells():
+    """Backfilling a tail onto a store equals backfilling the whole history."""
+    records = sorted(random_history(2000, seed=1), key=lambda r: r[4])
+    whole = backfill(AttemptHistory.from_records(records))
+    head = backfill(AttemptHistory.from_records(records[:1200]))
+    continued = backfill(AttemptHistory.from_records(records[1200:]), store=head)
+    for learner_id in whole.learner_ids:
+        for (teks, cell), (other_teks, other) in zip(whole.learner_cells(learner_id),
+                                                     continued.learner_cells(learner_id)):
+            assert teks == other_teks
+            assert cell.score == pytest.approx(other.score, abs=1e-6)
+            assert cell.due_review == pytest.approx(other.due_review, abs=5)
+            assert cell._replace(score=0, due_review=0) == other._replace(score=0, due_review=0)
+
+
+def test_backfill_decays_scores_across_gaps():
+    """Prior scores and earlier attempts decay over the gaps, as in sequential updates."""
+    base = datetime(2026, 1, 5, 9, 0)
+    head = [("ana", "6.4", True, 2, (base + timedelta(hours=i)).timestamp()) for i in range(20)]
+    tail = [("ana", "6.4", correct, 2, (base + timedelta(days=180 + 40 * i)).timestamp())
+            for i, correct in enumerate([False, True, True])]
+    sequential = MasteryService()
+    sequential.update_mastery_batch(
+        [(teks, correct, level, datetime.fromtimestamp(moment)) for _, teks, correct, level, moment in head + tail], "ana")
+
+    mastered = backfill(AttemptHistory.from_records(head)).read("ana", "6.4").score
+    continued = backfill(AttemptHistory.from_records(tail), store=backfill(AttemptHistory.from_records(head)))
+    assert continued.read("ana", "6.4").score == pytest.approx(sequential.store.read("ana", "6.4").score, abs=1e-6)
+    after_gap = backfill(AttemptHistory.from_records(tail[:1]), store=backfill(AttemptHistory.from_records(head)))
+    assert after_gap.read("ana", "6.4").score < mastered * 0.5
+
+
+def test_backfill_replays_difficulty_steps():
+    """Long runs hit both difficulty bounds; a tail split mid-run continues the stored streak."""
+    base = datetime.now().timestamp() - 3600
+    pattern = [True] * 20 + [False] * 13 + [True] * 4 + [False] * 3 + [True] * 7
+    records = [("ana", "6.4", correct, 2, base + i) for i, correct in enumerate(pattern)]
+    records += [("ben", "6.4", not correct, 2, base + i) for i, correct in enumerate(pattern[:30])]
+    sequential = MasteryService()
+    for learner_id, teks, correct, _, _ in records:
+        sequential.update_mastery(teks, correct, learner_id=learner_id)
+
+    whole = backfill(AttemptHistory.from_records(records))
+    head = backfill(AttemptHistory.from_records(records[:18] + records[len(pattern):len(pattern) + 5]))
+    continued = backfill(AttemptHistory.from_records(records[18:len(pattern)] + records[len(pattern) + 5:]), store=head)
+    for learner_id in ("ana", "ben"):
+        expected = sequential.store.read(learner_id, "6.4").difficulty
+        assert whole.read(learner_id, "6.4").difficulty == expected
+        assert continued.read(learner_id, "6.4").difficulty == expected
+
+
+def test_rebuild_retunes_service():
+    """rebuild swaps in recomputed scores and the new parameters."""
+    base = datetime.now().timestamp() - 60
+    records = [("ana", "6.8B", True, 2, base + i) for i in range(5)]
+    service = MasteryService()
+    assert service.rebuild(AttemptHistory.from_records(records), alpha=0.5, threshold=0.9, min_items=5) == 1
+
+    record = service.get_mastery("6.8B", "ana")
+    assert record.score == pytest.approx(1 - 0.5 ** 5)
+    assert record.correct_streak == 5 and record.due_review_at is not None
+    assert service.get_mastery_level("6.8B", "ana") == "mastered"
+    assert mastery_levels(service.store, 0.9, 5).tolist() == ["mastered"]
+    # The next attempt starts from the score decayed over the ~minute since the last one
+    assert service.update_mastery("6.8B", True, learner_id="ana")["score"] == pytest.approx(1 - 0.5 ** 6, rel=1e-4)
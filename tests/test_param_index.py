@@ -0,0 +1,61 @@
+"""Tests for the constraint-satisfying parameter index."""
+
+import random
+
+from services.item_factory import ItemFactory
+
+
+def test_trapezoid_index_is_exact():
+    """The index holds exactly the integer-area trapezoids."""
+    factory = ItemFactory()
+    expected = sum(
+        1
+        for b1 in range(4, 15) for b2 in range(6, 19) for h in range(3, 10)
+        if (b1 + b2) * h % 2 == 0
+    ) * 2  # cm / m
+    assert factory.count_distinct("6.8B_trapezoid_area") == expected
+
+
+def test_one_step_index_counts_distinct_equations():
+    """Coefficients a form does not read do not multiply the count (c in x + a = b, a in c x = d)."""
+    from engines.solver import eval_compute
+    from engines.validators import check_constraints
+
+    factory = ItemFactory()
+    template = factory.templates_cache["6.9A_one_step"]
+    p = template["params"]
+    equations = set()
+    for form in p["form"]:
+        for a in range(p["a_min"], p["a_max"] + 1):
+            for b in range(p["b_min"], p["b_max"] + 1):
+                for c in p["c_choices"]:
+                    params = {"form": form, "a": a, "b": b, "c": c}
+                    answer, _ = eval_compute(template, params)
+                    if check_constraints(template, params, answer):
+                        equations.add((form, c if "c" in form else a, b))
+    assert factory.count_distinct("6.9A_one_step") == len(equations)
+    index = factory.param_indexes["6.9A_one_step"]
+    assert len({tuple(sorted(map(str, index.params_at(row).items()))) for row in range(index.count)}) == index.count
+
+
+def test_index_rows_satisfy_constraints():
+    """Every indexed tuple passes the template constraints."""
+    from engines.solver import eval_compute
+    from engines.validators import check_constraints
+
+    factory = ItemFactory()
+    for template_id, index in factory.param_indexes.items():
+        template = factory.templates_cache[template_id]
+        for row in random.Random(0).sample(range(index.count), min(200, index.count)):
+            params = index.params_at(row)
+            answer, _ = eval_compute(template, params)
+            assert check_constraints(template, params, answer), (template_id, params)
+
+
+def test_index_disk_cache(tmp_path):
+    """A second factory loads the same index from disk."""
+    first = ItemFactory(index_dir=str(tmp_path))
+    assert list(tmp_path.glob("*.npy"))
+    second = ItemFactory(index_dir=str(tmp_path))
+    for template_id, index in first.param_indexes.items():
+        assert (second.param_indexes[template_id].rows == index.rows).all()
@@ -0,0 +1,71 @@
+"""Tests for precomputed next-item recommendations."""
+
+import time
+
+from services.curriculum import CurriculumService
+from services.item_factory import ItemFactory
+from services.mastery import MasteryService
+from services.recommender import Recommender, Slot
+from services.review_calendar import ReviewCalendar
+
+
+def make_recommender(**kwargs):
+    mastery = MasteryService()
+    curriculum = CurriculumService(mastery)
+    calendar = ReviewCalendar(sweep_interval=None)
+    recommender = Recommender(mastery, curriculum, ItemFactory(), calendar, **kwargs)
+    for listener in (calendar.on_mastery_change, curriculum.on_mastery_change, recommender.on_mastery_change):
+        mastery.add_listener(listener)
+    return mastery, calendar, recommender
+
+
+def test_slots_combine_reviews_curriculum_and_gaps():
+    """A due review comes first, then the curriculum's next skill, then the weakest unlocked skills."""
+    mastery, calendar, recommender = make_recommender(slots=4)
+    assert recommender.peek("ana") == [Slot("6.2", 2, "6.2_rationals_ops", "next"),
+                                       Slot("6.8B", 2, "6.8B_trapezoid_area", "gap")]
+
+    for _ in range(6):
+        mastery.update_mastery("6.2", True, learner_id="ana")  # Proficient: unlocks 6.4 and 6.7B
+    mastery.update_mastery("6.8B", False, learner_id="ana")
+    mastery.update_mastery("6.8B", False, learner_id="ana")
+    calendar.schedule("ana", "6.2", int(time.time()) - 60)
+    assert recommender.peek("ana") == [
+        Slot("6.2", 4, "6.2_rationals_ops", "review"),
+        Slot("6.4", 2, "6.4_unit_rate", "next"),
+        Slot("6.7B", 2, "6.7B_expr_vs_eq", "gap"),
+        Slot("6.8B", 1, "6.8B_trapezoid_area", "gap"),
+    ]
+
+
+def test_next_serves_precomputed_slots_until_an_attempt():
+    """Reads pop precomputed slots; an attempt makes the learner stale until the worker catches up."""
+    mastery, _, recommender = make_recommender(max_age=None)
+    mastery.update_mastery("6.8B", False, learner_id="ana")
+    assert recommender.next("ana").teks == "6.2"  # Stale: computed inline
+    assert recommender.next("ana").teks == "6.8B"
+    assert recommender.stats()["hits"] == 1
+
+    recommender.start()
+    try:
+        mastery.update_mastery("6.2", True, learner_id="ana")
+        deadline = time.time() + 5
+        while recommender.stats()["pending"] and time.time() < deadline:
+            time.sleep(0.01)
+        assert recommender.next("ana") == Slot("6.2", 2, "6.2_rationals_ops", "next")
+        assert recommender.stats()["misses"] == 1
+    finally:
+        recommender.stop()
+
+
+def test_slots_expire_after_max_age():
+    """Old slots are recomputed, so reviews that came due without an attempt show up."""
+    now = [0.0]
+    mastery = MasteryService()
+    recommender = Recommender(mastery, CurriculumService(mastery), ItemFactory(), max_age=60, clock=lambda: now[0])
+    recommender.peek("ana")
+    recommender.next("ana")
+    assert recommender.stats()["hits"] == 1
+    now[0] = 61
+    recommender.next("ana")
+    assert recommender.stats()["misses"] == 1
@@ -0,0 +1,52 @@
+"""Tests for the calendar-bucketed review scheduler."""
+
+from services.mastery import MasteryService
+from services.review_calendar import ReviewCalendar
+
+
+HOUR = 3600
+T0 = 1_780_000_000 - 1_780_000_000 % HOUR  # Start of an hour
+
+
+def test_sweep_moves_due_buckets_into_ready_queues():
+    """Whole past buckets and the due part of the current one become ready."""
+    calendar = ReviewCalendar(sweep_interval=None, clock=lambda: T0 + HOUR + 60)
+    calendar.schedule("ana", "6.2", T0 + 10)
+    calendar.schedule("ana", "6.4", T0 + 5)
+    calendar.schedule("ben", "6.2", T0 + HOUR + 30)
+    calendar.schedule("ben", "6.4", T0 + HOUR + 90)
+    calendar.schedule("cy", "6.2", T0 + 5 * HOUR)
+
+    assert calendar.sweep() == 3
+    assert calendar.ready_skills("ana") == ["6.4", "6.2"]
+    assert sorted(calendar.ready_learners()) == ["ana", "ben"]
+    assert calendar.bucket_counts() == [(T0 + HOUR, 1), (T0 + 5 * HOUR, 1)]
+    assert calendar.bucket_counts(start=T0 + 2 * HOUR) == [(T0 + 5 * HOUR, 1)]
+
+    # Practicing reschedules: the review leaves the ready queue and its old bucket
+    calendar.schedule("ana", "6.4", T0 + 30 * HOUR)
+    calendar.schedule("ben", "6.4", 0)
+    assert calendar.ready_skills("ana") == ["6.2"]
+    assert calendar.stats() == {"scheduled": 2, "ready": 2, "ready_learners": 2, "buckets": 2}
+    assert calendar.sweep(now=T0 + 40 * HOUR) == 2
+    assert calendar.ready_skills("ana") == ["6.2", "6.4"]
+
+
+def test_calendar_follows_mastery_service():
+    """Mastery updates and resets reschedule reviews; load fills from the store."""
+    service = MasteryService()
+    calendar = ReviewCalendar(sweep_interval=None)
+    service.add_listener(calendar.on_mastery_change)
+    service.update_mastery("6.8B", False, learner_id="ana")
+    service.update_mastery("6.2", False, learner_id="ben")
+    assert calendar.stats()["scheduled"] == 2
+    assert calendar.ready_skills("ana") == []
+
+    service.reset_mastery("6.2", learner_id="ben")
+    assert calendar.stats()["scheduled"] == 1
+
+    due = service.get_mastery("6.8B", "ana").due_review_at.timestamp()
+    reloaded = ReviewCalendar(sweep_interval=None, clock=lambda: due + 1)
+    reloaded.load(service.store.scheduled_reviews())
+    assert reloaded.ready_learners() == ["ana"]
+    assert reloaded.ready_skills("ana") == ["6.8B"]
@@ -87,3 +87,17 @@ def test_eval_compute_unit_rate():
     answer, meta = eval_compute(template, params)
     assert answer == 4.0
     assert meta["type"] == "numeric"
+
+
+def test_batch_kernels():
+    """Vectorized kernels match scalar results and flag invalid rows."""
+    import numpy as np
+    from fractions import Fraction
+    from engines.solver import op_apply_array, solve_one_step_array
+
+    result = op_apply_array(np.array([6, 6, 6, 6, 1]), np.array([4, 4, 4, 4, 0]), np.array(["+", "-", "×", "÷", "÷"]))
+    assert result[:4].tolist() == [10.0, 2.0, 24.0, 1.5]
+    assert np.isnan(result[4])
+
+    solved = solve_one_step_array(np.array(["x + a = b", "c x = d", "x / c = d"]), [3, 0, 0], [7, -7, 5], [1, -2, 4], None)
+    assert solved.tolist() == [Fraction(4), Fraction(7, 2), Fraction(20)]
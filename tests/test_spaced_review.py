@@ -0,0 +1,72 @@
+"""Tests for the spaced review scheduler."""
+
+import random
+from datetime import datetime, timedelta
+
+from services.spaced_review import ReviewItem, ReviewQueue, SpacedReviewService
+
+
+def test_due_reviews_by_priority_then_due_time():
+    """Due items come highest priority first, most overdue first within a priority."""
+    service = SpacedReviewService()
+    now = datetime.now()
+    service.schedule_review("6.2", "low", 0.95, now - timedelta(days=90))
+    service.schedule_review("6.4", "high-late", 0.1, now - timedelta(days=2))
+    service.schedule_review("6.4", "high-early", 0.1, now - timedelta(days=5))
+    service.schedule_review("6.8B", "not-due", 0.1, now)
+    service.schedule_review("6.9A", "medium", 0.6, now - timedelta(days=10))
+
+    assert [r.item_id for r in service.get_due_reviews()] == ["high-early", "high-late", "medium", "low"]
+    assert [r.item_id for r in service.get_due_reviews(limit=2)] == ["high-early", "high-late"]
+    assert [r.item_id for r in service.get_reviews_for_skill("6.4")] == ["high-early", "high-late"]
+    assert [r.item_id for r in service.pop_due_reviews(limit=3)] == ["high-early", "high-late", "medium"]
+    assert [r.item_id for r in service.get_due_reviews()] == ["low"]
+    assert sorted(service.get_review_schedule()) == ["6.2", "6.8B"]
+
+
+def test_mark_reviewed_moves_along_intervals():
+    """Correct reviews step to longer intervals; a miss starts over."""
+    service = SpacedReviewService()
+    start = datetime(2026, 3, 2, 9, 0)
+    item = service.schedule_review("6.7B", "item-1", 0.2, start)
+    days = []
+    for _ in range(6):
+        item = service.mark_reviewed("item-1", True, reviewed_at=item.due_at)
+        days.append((item.due_at - start).days)
+    assert days == [1 + 3, 4 + 7, 11 + 21, 32 + 60, 92 + 60, 152 + 60]
+    assert item.priority == 3
+
+    missed = service.mark_reviewed("item-1", False, reviewed_at=item.due_at)
+    assert (missed.interval_index, missed.priority) == (0, 1)
+    assert missed.due_at == item.due_at + timedelta(days=1)
+    assert len(service.store) == 1
+    assert service.mark_reviewed("unknown", True) is None
+
+
+def test_queue_matches_naive_scan_under_churn():
+    """Cancels, reschedules and compactions keep the queue equal to a sorted scan."""
+    rng = random.Random(3)
+    queue = ReviewQueue()
+    queue.COMPACT_MIN_DEAD = 8
+    expected = {}
+    base = datetime(2026, 1, 1)
+    for step in range(5000):
+        item_id = f"item-{rng.randrange(300)}"
+        if rng.random() < 0.3:
+            assert (queue.remove(item_id) is not None) == (expected.pop(item_id, None) is not None)
+        else:
+            item = ReviewItem(rng.choice(["6.2", "6.4"]), item_id, base + timedelta(hours=rng.randrange(500)),
+                              rng.randint(1, 3))
+            queue.add(item)
+            expected[item_id] = item
+
+    now = (base + timedelta(hours=250)).timestamp()
+    naive = sorted((i for i in expected.values() if i.due_at.timestamp() <= now),
+                   key=lambda i: (i.priority, i.due_at))
+    assert [(i.priority, i.due_at) for i in queue.due(now, 50)] == [(i.priority, i.due_at) for i in naive[:50]]
+    window = queue.between((base + timedelta(hours=100)).timestamp(), (base + timedelta(hours=120)).timestamp())
+    assert sorted(i.item_id for i in window) == sorted(
+        i.item_id for i in expected.values() if base + timedelta(hours=100) <= i.due_at <= base + timedelta(hours=120))
+    assert [i.due_at for i in window] == sorted(i.due_at for i in window)
+    assert len(queue.pop_due(now, len(expected))) == len(naive)
+    assert len(queue) == len(expected) - len(naive)
@@ -0,0 +1,139 @@
+"""Tests for the SQLite mastery and review storage."""
+
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+from unittest import mock
+
+import pytest
+
+from services.mastery import MasteryService
+from services.mastery_store import MasteryCell
+from services.spaced_review import SpacedReviewService
+from services.sqlite_store import SqliteMasteryStore, SqliteReviewStore, SqliteWriteError
+
+
+def test_reads_see_buffered_writes_and_survive_reopen(tmp_path):
+    """Writes are visible before they are committed and persist across restarts."""
+    path = tmp_path / "mastery.db"
+    store = SqliteMasteryStore(path, flush_interval=60)
+    store.write("ana", "6.8B", MasteryCell(0.2, 1, 100, 200, 1, 0))
+    store.write("ana", "6.2", MasteryCell(0.0, 1, 100, 0, 0, 1))
+    assert store.read("ana", "6.8B").score == 0.2
+    assert [teks for teks, _ in store.learner_cells("ana")] == ["6.8B", "6.2"]
+    store.close()
+
+    reopened = SqliteMasteryStore(path)
+    assert reopened.read("ana", "6.8B") == MasteryCell(0.2, 1, 100, 200, 1, 0)
+    reopened.write("ana", "6.9", MasteryCell(0.2, 1, 300, 0, 1, 0))
+    reopened.clear("ana", "6.2")
+    reopened.flush()
+    assert [teks for teks, _ in reopened.learner_cells("ana")] == ["6.8B", "6.9"]
+    assert reopened.learners_due("6.8B", 200) == ["ana"]
+    assert reopened.learners_due("6.8B", 199) == []
+    reopened.close()
+
+
+def test_database_without_difficulty_column_is_migrated(tmp_path):
+    """Tables created before the difficulty column gain it, with 0 (unset) in old rows."""
+    path = tmp_path / "mastery.db"
+    with sqlite3.connect(path) as conn:
+        conn.execute("CREATE TABLE mastery (learner_id TEXT NOT NULL, teks TEXT NOT NULL, score REAL NOT NULL, "
+                     "attempts INTEGER NOT NULL, last_seen INTEGER NOT NULL, due_review INTEGER NOT NULL, "
+                     "correct_streak INTEGER NOT NULL, incorrect_streak INTEGER NOT NULL, started INTEGER NOT NULL, "
+                     "PRIMARY KEY (learner_id, teks)) WITHOUT ROWID")
+        conn.execute("INSERT INTO mastery VALUES ('ana', '6.8B', 0.2, 1, 100, 200, 1, 0, 1)")
+    conn.close()
+
+    service = MasteryService(store=SqliteMasteryStore(path))
+    assert service.store.read("ana", "6.8B") == MasteryCell(0.2, 1, 100, 200, 1, 0, 0)
+    assert service.get_difficulty("6.8B", "ana") == 2
+    service.store.close()
+
+
+def test_writer_coalesces_updates_into_transactions(tmp_path):
+    """Many updates share one transaction; repeated writes to a cell keep the last one."""
+    store = SqliteMasteryStore(tmp_path / "mastery.db", flush_interval=60)
+    for attempts in range(1, 501):
+        store.write(f"learner-{attempts % 50}", "6.8B", MasteryCell(0.5, attempts, 0, 0, 0, 0))
+    store.flush()
+    stats = store.stats()
+    assert stats["transactions"] == 1
+    assert stats["rows_written"] == 50
+    assert store.read("learner-0", "6.8B").attempts == 500
+    store.close()
+
+
+def test_mastery_service_matches_in_memory_backend(tmp_path):
+    """MasteryService gives the same results on SQLite as on the columnar store."""
+    store = SqliteMasteryStore(tmp_path / "mastery.db")
+    on_disk = MasteryService(store=store)
+    in_memory = MasteryService()
+    base = datetime(2026, 1, 5, 9, 0)
+    updates = [("6.8B", i % 3 != 0, 2, base + timedelta(minutes=i)) for i in range(10)]
+    updates.append(("6.2", False, 1, base))
+    for learner in ("ana", "ben"):
+        assert on_disk.update_mastery_batch(updates, learner) == in_memory.update_mastery_batch(updates, learner)
+
+    assert on_disk.get_all_mastery("ben") == in_memory.get_all_mastery("ben")
+    assert on_disk.get_learners_due_for_review("6.2", base + timedelta(days=2)) == ["ana", "ben"]
+    assert on_disk.get_mastery_level("6.8B", "ana") == in_memory.get_mastery_level("6.8B", "ana")
+    store.close()
+
+
+def test_review_service_on_sqlite(tmp_path):
+    """Spaced reviews round-trip through the database."""
+    store = SqliteMasteryStore(tmp_path / "mastery.db")
+    reviews = SpacedReviewService(store=SqliteReviewStore(store.connections))
+    past = datetime.now() - timedelta(days=30)
+    reviews.schedule_review("6.8B", "item-1", 0.2, past)
+    reviews.schedule_review("6.2", "item-2", 0.95, past)
+
+    assert [item.item_id for item in reviews.get_due_reviews()] == ["item-1"]
+    assert [item.item_id for item in reviews.get_reviews_for_skill("6.2")] == ["item-2"]
+    rescheduled = reviews.mark_reviewed("item-1", correct=True)
+    assert rescheduled.interval_index == 1
+    assert reviews.get_due_reviews() == []
+    assert set(reviews.get_review_schedule()) == {"6.2", "6.8B"}
+    assert reviews.pop_due_reviews() == []
+    store.close()
+
+
+def test_in_memory_path_rejected():
+    with pytest.raises(ValueError):
+        SqliteMasteryStore(":memory:")
+
+
+def test_each_new_connection_applies_the_schema(tmp_path):
+    store = SqliteMasteryStore(tmp_path / "mastery.db")
+    store.connections.get().execute("DROP TABLE review_items")
+    counts = []
+    thread = threading.Thread(target=lambda: counts.append(len(SqliteReviewStore(store.connections))))
+    thread.start()
+    thread.join()
+    assert counts == [0]
+    store.close()
+
+
+def test_flush_raises_after_repeated_commit_failures(tmp_path):
+    """A writer that keeps failing (with any exception) makes flush() raise rather than hang."""
+    store = SqliteMasteryStore(tmp_path / "mastery.db", flush_interval=0.001, max_commit_failures=3)
+    commit = store._commit
+    store._commit = mock.Mock(side_effect=TypeError("bad row"))
+    store.write("ana", "6.8B", MasteryCell(0.2, 1, 100, 0, 1, 0))
+    with pytest.raises(SqliteWriteError):
+        store.flush()
+    assert store.read("ana", "6.8B").score == 0.2  # Kept for retry
+
+    store._commit = commit
+    store.flush()
+    assert store.stats()["errors"] >= 3
+    store.close()
+    assert SqliteMasteryStore(tmp_path / "mastery.db").read("ana", "6.8B").score == 0.2
+
+    failing = SqliteMasteryStore(tmp_path / "other.db", flush_interval=0.001, max_commit_failures=2)
+    failing._commit = mock.Mock(side_effect=sqlite3.OperationalError("database is locked"))
+    failing.write("ana", "6.8B", MasteryCell(0.2, 1, 100, 0, 1, 0))
+    with pytest.raises(SqliteWriteError):
+        failing.close()
+    assert not failing._writer.is_alive()
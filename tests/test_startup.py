@@ -0,0 +1,22 @@
+"""Cold-start regression tests."""
+
+import subprocess
+import sys
+from pathlib import Path
+
+
+def test_api_import_does_not_load_sympy():
+    """sympy is imported lazily on first expression grade, not at boot."""
+    code = "import sys, api.main; print('sympy' in sys.modules)"
+    result = subprocess.run(
+        [sys.executable, "-c", code], cwd=Path(__file__).parent.parent,
+        capture_output=True, text=True, check=True,
+    )
+    assert result.stdout.strip() == "False"
+
+
+def test_default_settings_start_no_sandbox_workers():
+    """Expression sandbox processes are opt-in, not forked on every boot."""
+    from api.deps import Settings
+
+    assert Settings().expr_sandbox_workers == 0
@@ -0,0 +1,100 @@
+"""Tests for hot template reload."""
+
+import json
+import os
+import shutil
+from pathlib import Path
+
+from services.item_factory import ItemFactory
+from services.item_pool import ItemPool
+
+
+TEMPLATES = Path(__file__).parent.parent / "content" / "templates"
+TRAPEZOID = "6.8B_trapezoid_area"
+
+
+def _copy_templates(tmp_path: Path) -> Path:
+    target = tmp_path / "templates"
+    shutil.copytree(TEMPLATES, target)
+    return target
+
+
+def _rewrite(path: Path, **changes):
+    template = json.loads(path.read_text())
+    template.update(changes)
+    path.write_text(json.dumps(template))
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+def test_reload_only_changed_templates(tmp_path):
+    """Editing one file recompiles just that template and swaps it in."""
+    templates_dir = _copy_templates(tmp_path)
+    factory = ItemFactory(str(templates_dir))
+    untouched_kernel = factory.kernels["6.4_unit_rate"]
+    assert factory.reload_templates() == set()
+
+    path = templates_dir / "6.8B_area_trapezoid.json"
+    params = json.loads(path.read_text())["params"]
+    params.update({"b1_max": 6, "b2_max": 8, "h_max": 4})
+    _rewrite(path, params=params)
+
+    assert factory.reload_templates() == {TRAPEZOID}
+    assert factory.kernels["6.4_unit_rate"] is untouched_kernel
+    assert factory.generate_item(TRAPEZOID, 5)["params"]["b1"] <= 6
+
+
+def test_reload_invalidates_pool_and_cache(tmp_path):
+    """Pooled and cached items for a changed template are dropped."""
+    templates_dir = _copy_templates(tmp_path)
+    factory = ItemFactory(str(templates_dir))
+    pool = ItemPool(factory, target_size=3, low_water=1)
+    pool.prime([TRAPEZOID, "6.4_unit_rate"])
+    old = factory.generate_item(TRAPEZOID, 9)
+
+    _rewrite(templates_dir / "6.8B_area_trapezoid.json", difficulty=3)
+    factory.reload_templates()
+
+    assert f"{TRAPEZOID}@2" not in pool.depth() or pool.depth()[f"{TRAPEZOID}@2"] == 0
+    assert pool.depth()["6.4_unit_rate@2"] == 3
+    assert factory.generate_item(TRAPEZOID, 9) is not old
+
+
+def test_bad_edit_keeps_last_good_version(tmp_path):
+    """An invalid template is reported and the previous version stays live."""
+    templates_dir = _copy_templates(tmp_path)
+    factory = ItemFactory(str(templates_dir))
+    path = templates_dir / "6.8B_area_trapezoid.json"
+    _rewrite(path, compute="A = b1 * w")
+
+    assert factory.reload_templates() == set()
+    assert "6.8B_area_trapezoid.json" in factory.template_errors
+    assert factory.generate_item(TRAPEZOID, 1)["teks"] == "6.8B"
+
+
+def test_bad_edit_is_not_retried_until_it_changes(tmp_path, capsys):
+    """A failing file is reported once, then retried only after the next edit."""
+    templates_dir = _copy_templates(tmp_path)
+    factory = ItemFactory(str(templates_dir))
+    path = templates_dir / "6.8B_area_trapezoid.json"
+    _rewrite(path, compute="A = b1 * w")
+    broken = templates_dir / "new.json"
+    broken.write_text("{not json")
+
+    for _ in range(3):
+        factory.reload_templates()
+    assert capsys.readouterr().out.count("reload failed") == 2
+
+    _rewrite(path, compute="A = (b1 + b2)/2 * h")
+    broken.unlink()
+    assert factory.reload_templates() == {TRAPEZOID}
+    assert factory.template_errors == {}
+
+
+def test_removed_template(tmp_path):
+    """Deleting a file removes its template."""
+    templates_dir = _copy_templates(tmp_path)
+    factory = ItemFactory(str(templates_dir))
+    (templates_dir / "6.4_proportionality_unit_rate.json").unlink()
+    assert factory.reload_templates() == {"6.4_unit_rate"}
+    assert "6.4_unit_rate" not in factory.templates_cache
@@ -0,0 +1,29 @@
+"""Tests for the readiness warm-up."""
+
+import pytest
+from services.item_factory import ItemFactory
+from services.item_pool import ItemPool
+from services.warmup import Warmup
+
+
+def test_not_ready_until_run():
+    """Readiness flips only after every step ran, and reports timings."""
+    factory = ItemFactory()
+    warmup = Warmup(factory, ItemPool(factory, target_size=2, low_water=1), ["templates", "pool", "grading"])
+    assert warmup.status()["status"] == "warming_up"
+    warmup.run()
+    status = warmup.status()
+    assert status["status"] == "ready"
+    assert set(status["steps"]) == {"templates", "pool", "grading"}
+    assert status["warmup_seconds"] >= sum(status["steps"].values())
+
+
+def test_no_steps_is_ready():
+    factory = ItemFactory()
+    assert Warmup(factory, ItemPool(factory), []).ready
+
+
+def test_unknown_step_rejected():
+    factory = ItemFactory()
+    with pytest.raises(ValueError):
+        Warmup(factory, ItemPool(factory), ["coffee"])